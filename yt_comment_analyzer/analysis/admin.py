@@ -1,3 +1,27 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import AnalysisJob, AnalysisRun, Comment, Video
+
+
+@admin.register(Video)
+class VideoAdmin(admin.ModelAdmin):
+    list_display = ('video_id', 'last_fetched_at', 'is_complete')
+    search_fields = ('video_id',)
+
+
+@admin.register(Comment)
+class CommentAdmin(admin.ModelAdmin):
+    list_display = ('comment_id', 'video', 'published_at')
+    list_filter = ('video',)
+
+
+@admin.register(AnalysisRun)
+class AnalysisRunAdmin(admin.ModelAdmin):
+    list_display = ('video', 'kind', 'total_comments', 'vader_overall', 'textblob_overall', 'created_at')
+    list_filter = ('kind',)
+
+
+@admin.register(AnalysisJob)
+class AnalysisJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status')
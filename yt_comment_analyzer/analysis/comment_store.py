@@ -0,0 +1,168 @@
+from datetime import timedelta
+
+import numpy as np
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from analysis.models import Comment, Video
+from analysis.src.yt_module.records import CommentColumns
+
+# Comment fields `iter_columns` reads, in CommentColumns order
+COLUMN_FIELDS = ('comment_id', 'text', 'author', 'author_channel_id', 'published_at', 'like_count')
+
+
+class CommentStore:
+    """
+    Per-video comment store in front of a CommentFetcher.
+
+    The store always holds a contiguous, newest-first prefix of a video's
+    comment section. Within `max_age` seconds of the last fetch a request is
+    answered from the database alone; after that only threads newer than the
+    newest stored comment are fetched (commentThreads come newest first) and
+    the rest is read from disk. A full fetch happens when the store holds fewer
+    comments than requested. Edits and deletions of already stored comments
+    are not picked up by incremental refreshes.
+
+    `iter_pages` matches `CommentFetcher.iter_pages`, so the store can feed
+    the streaming pipeline directly; `iter_columns` matches
+    `CommentFetcher.iter_columns`. Like counts are as of when each comment
+    was stored.
+    """
+
+    def __init__(self, fetcher, max_age=600, page_size=100):
+        self.fetcher = fetcher
+        self.max_age = timedelta(seconds=max_age)
+        self.page_size = page_size
+
+    def fetch_comments(self, video_id, limit=100):
+        return [text for page in self.iter_pages(video_id, limit) for text in page]
+
+    def iter_pages(self, video_id, limit=100):
+        for rows in self._iter_rows(video_id, limit, ('text',)):
+            yield [text for text, in rows]
+
+    def iter_columns(self, video_id, limit=100):
+        """Pages as CommentColumns, with publish times, like counts and authors."""
+        for rows in self._iter_rows(video_id, limit, COLUMN_FIELDS):
+            ids, texts, authors, channels, published, likes = zip(*rows)
+            yield CommentColumns(
+                list(ids), list(texts), list(authors), list(channels),
+                np.array([int(when.timestamp()) for when in published], dtype=np.int64).astype('datetime64[s]'),
+                np.array(likes, dtype=np.int64),
+            )
+
+    def _iter_rows(self, video_id, limit, fields):
+        """Pages of `fields` tuples, newest comments first."""
+        video, _ = Video.objects.get_or_create(video_id=video_id)
+        if not (video.is_complete or video.comments.count() >= limit):
+            yield from self._fetch_all(video, limit, fields)
+            return
+
+        fetched = 0
+        if self._is_stale(video):
+            for rows in self._fetch_new(video, limit, fields):
+                fetched += len(rows)
+                yield rows
+        yield from self._stored_pages(video, fetched, limit, fields)
+
+    def _is_stale(self, video):
+        return video.last_fetched_at is None or timezone.now() - video.last_fetched_at >= self.max_age
+
+    def _fetch_all(self, video, limit, fields):
+        """Fetches the newest `limit` threads, re-saving any already stored ones."""
+        fetched = 0
+        oldest = None
+        reached_stored = False
+        for records in self.fetcher.iter_records(video.video_id, limit):
+            reached_stored = reached_stored or bool(self._stored_ids(video, records))
+            comments = self._save(video, records)
+            fetched += len(records)
+            if comments:
+                oldest = comments[-1].published_at
+            yield self._rows(comments, fields)
+
+        if not reached_stored and oldest is not None:
+            # The stored comments are all older than this fetch reached: drop
+            # them rather than leave a hole between them and the new ones
+            video.comments.filter(published_at__lt=oldest).delete()
+        video.is_complete = fetched < limit
+        video.last_fetched_at = timezone.now()
+        video.save(update_fields=['is_complete', 'last_fetched_at'])
+
+    def _fetch_new(self, video, limit, fields):
+        """Fetches threads until the first already stored one, at most `limit`."""
+        oldest_new = None
+        reached_stored = False
+        for records in self.fetcher.iter_records(video.video_id, limit):
+            stored_ids = self._stored_ids(video, records)
+            new_records = []
+            for record in records:
+                if record['id'] in stored_ids:
+                    reached_stored = True
+                    break
+                new_records.append(record)
+
+            if new_records:
+                comments = self._save(video, new_records)
+                oldest_new = comments[-1].published_at
+                yield self._rows(comments, fields)
+            if reached_stored:
+                break
+
+        if not reached_stored and oldest_new is not None:
+            # More than `limit` new threads: drop the older ones so the store
+            # stays a contiguous prefix of the comment section
+            video.comments.filter(published_at__lt=oldest_new).delete()
+            video.is_complete = False
+        video.last_fetched_at = timezone.now()
+        video.save(update_fields=['is_complete', 'last_fetched_at'])
+
+    def _stored_pages(self, video, offset, limit, fields):
+        """
+        Keyset pagination on (published_at, id): every page after the first
+        starts where the previous one ended, so reading N comments walks the
+        (video, -published_at) index once instead of re-skipping an OFFSET.
+        """
+        comments = video.comments.order_by('-published_at', 'id').values_list('published_at', 'id', *fields)
+        remaining = limit - offset
+        page = list(comments[offset:offset + min(self.page_size, remaining)]) if remaining > 0 else []
+        while page:
+            yield [row[2:] for row in page]
+            remaining -= len(page)
+            if remaining <= 0 or len(page) < self.page_size:
+                break
+            published_at, last_id = page[-1][:2]
+            size = min(self.page_size, remaining)
+            # Two range scans rather than one OR, which databases tend to answer with a scan
+            page = list(comments.filter(published_at=published_at, id__gt=last_id)[:size])
+            if len(page) < size:
+                page += comments.filter(published_at__lt=published_at)[:size - len(page)]
+
+    @staticmethod
+    def _stored_ids(video, records):
+        ids = [record['id'] for record in records]
+        return set(video.comments.filter(comment_id__in=ids).values_list('comment_id', flat=True))
+
+    def _save(self, video, records):
+        comments = [
+            Comment(
+                video=video,
+                comment_id=record['id'],
+                text=record['text'],
+                published_at=self._published_at(record),
+                author=record.get('author', ''),
+                author_channel_id=record.get('author_channel_id', ''),
+                like_count=record.get('like_count', 0),
+            )
+            for record in records
+        ]
+        Comment.objects.bulk_create(comments, ignore_conflicts=True)
+        return comments
+
+    @staticmethod
+    def _rows(comments, fields):
+        return [tuple(getattr(comment, field) for field in fields) for comment in comments]
+
+    @staticmethod
+    def _published_at(record):
+        return parse_datetime(record['published_at']) if record['published_at'] else timezone.now()
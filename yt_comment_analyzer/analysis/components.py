@@ -0,0 +1,212 @@
+"""
+Lazily built, process-wide analysis components.
+
+Nothing heavy is imported or loaded when this module (or views.py) is
+imported: each component is built on first `components.get(name)`, so
+`manage.py migrate` and friends never pay for RoBERTa, NLTK or the Google
+clients. Server workers call `warm_up()` once at start-up so the first
+request does not pay either.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class ComponentRegistry:
+    def __init__(self):
+        self._factories = {}
+        self._warmers = {}
+        self._instances = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self.load_times = {}
+
+    def register(self, name, factory, warm=None):
+        """`warm(instance)` optionally exercises a component once after loading it."""
+        self._factories[name] = factory
+        if warm is not None:
+            self._warmers[name] = warm
+        self._locks[name] = threading.Lock()
+
+    def get(self, name):
+        instance = self._instances.get(name, _MISSING)
+        if instance is not _MISSING:
+            return instance
+        # One lock per component: a slow model load does not block other components
+        with self._locks[name]:
+            instance = self._instances.get(name, _MISSING)
+            if instance is _MISSING:
+                start = time.perf_counter()
+                instance = self._factories[name]()
+                self.load_times[name] = time.perf_counter() - start
+                with self._lock:
+                    self._instances[name] = instance
+                logger.info("Loaded %s in %.2fs", name, self.load_times[name])
+        return instance
+
+    def override(self, name, instance):
+        """Replaces a component, e.g. with a fake client in tests and benchmarks."""
+        with self._lock:
+            self._instances[name] = instance
+
+    def is_loaded(self, name):
+        return name in self._instances
+
+    def warm_up(self, names=None):
+        """Builds (and exercises) the given components, all by default; returns load times."""
+        timings = {}
+        for name in names or self._factories:
+            start = time.perf_counter()
+            instance = self.get(name)
+            if name in self._warmers and instance is not None:
+                self._warmers[name](instance)
+            timings[name] = time.perf_counter() - start
+        return timings
+
+
+def _youtube_client():
+    from analysis.src.yt_module.api_client import HttpPool, YouTubeClient, api_keys
+    from analysis.src.yt_module.rate_limit import QuotaLimiter
+    rate_limiter = QuotaLimiter(
+        api_keys(),
+        daily_quota=settings.YOUTUBE_DAILY_QUOTA,
+        rate=settings.YOUTUBE_RATE_LIMIT or None,
+        burst=settings.YOUTUBE_RATE_BURST,
+    )
+    return YouTubeClient(http_pool=HttpPool(settings.YOUTUBE_HTTP_POOL_SIZE), rate_limiter=rate_limiter)
+
+
+def _fetcher():
+    from analysis.src.yt_module.api_client import CommentFetcher
+    return CommentFetcher(components.get('youtube_client'))
+
+
+def _comment_store():
+    from analysis.comment_store import CommentStore
+    return CommentStore(components.get('fetcher'), max_age=settings.COMMENT_STORE_MAX_AGE)
+
+
+def _analysis_history():
+    from analysis.history import AnalysisHistory
+    return AnalysisHistory(
+        retention_days=settings.ANALYSIS_RUN_RETENTION_DAYS,
+        max_runs_per_video=settings.ANALYSIS_RUNS_PER_VIDEO,
+    )
+
+
+def _score_cache():
+    from analysis.src.analysis.cache import ScoreCache
+    return ScoreCache(max_entries=settings.SCORE_CACHE_SIZE, path=settings.SCORE_CACHE_PATH)
+
+
+def _sentiment():
+    from analysis.src.analysis.sentiment import SentimentAnalyzer
+    return SentimentAnalyzer(
+        cache=components.get('score_cache'),
+        workers=settings.SENTIMENT_WORKERS,
+        vader_engine=settings.SENTIMENT_VADER_ENGINE,
+        textblob_engine=settings.SENTIMENT_TEXTBLOB_ENGINE,
+    )
+
+
+def _emoji_analyzer():
+    from analysis.src.analysis.emojis import EmojiAnalyzer
+    return EmojiAnalyzer()
+
+
+def _toxicity():
+    from analysis.src.analysis.ToxicityAnalyzer import BertToxicityAnalyzer
+    from analysis.src.analysis.toxicity_prefilter import ToxicityPrefilter
+    prefilter = None
+    if settings.TOXICITY_CASCADE:
+        if settings.TOXICITY_PREFILTER_PATH:
+            prefilter = ToxicityPrefilter.load(settings.TOXICITY_PREFILTER_PATH)
+        else:
+            prefilter = ToxicityPrefilter()
+    return BertToxicityAnalyzer(
+        batch_size=settings.TOXICITY_BATCH_SIZE,
+        backend=settings.TOXICITY_BACKEND,
+        backend_dir=settings.TOXICITY_BACKEND_DIR,
+        cache=components.get('score_cache'),
+        prefilter=prefilter,
+        cascade_threshold=settings.TOXICITY_CASCADE_THRESHOLD,
+    )
+
+
+def _gemini_model():
+    from analysis.src.analysis.geminiAnalyzer import create_model
+    return create_model(backend=settings.GEMINI_BACKEND)
+
+
+def _gemini_cache():
+    from analysis.src.analysis.cache import ResponseCache
+    return ResponseCache(
+        max_entries=settings.GEMINI_CACHE_ENTRIES,
+        max_bytes=settings.GEMINI_CACHE_BYTES,
+        ttl=settings.GEMINI_CACHE_TTL,
+    )
+
+
+def _pipeline():
+    from analysis.pipeline import StreamingAnalysisPipeline
+    return StreamingAnalysisPipeline(
+        components.get('comment_store'),
+        components.get('sentiment'),
+        components.get('toxicity'),
+        components.get('emoji_analyzer'),
+        dedup_threshold=settings.NEAR_DUPLICATE_THRESHOLD,
+        bounded_above=settings.BOUNDED_MEMORY_ABOVE,
+        state_store=components.get('analysis_history') if settings.INCREMENTAL_ANALYSIS else None,
+        score_batch_size=settings.SENTIMENT_POOL_BATCH if settings.SENTIMENT_WORKERS > 1 else None,
+    )
+
+
+def _job_manager():
+    from analysis.jobs import JobManager
+    return JobManager(
+        workers=settings.ANALYSIS_JOB_WORKERS,
+        max_queued=settings.ANALYSIS_JOB_QUEUE_SIZE,
+        result_ttl=settings.ANALYSIS_JOB_RESULT_TTL,
+        stale_after=settings.ANALYSIS_JOB_STALE_AFTER,
+    )
+
+
+def _warm_sentiment(sentiment):
+    # First calls load the VADER lexicon and TextBlob's pattern lexicon
+    sentiment._score_vader(["warm up"])
+    sentiment._score_textblob(["warm up"])
+    if sentiment.pool:
+        sentiment.pool.start()
+
+
+def _warm_toxicity(toxicity):
+    # Bypass the score cache so the model itself runs once
+    toxicity._score_batched(["warm up"], 1)
+
+
+components = ComponentRegistry()
+components.register('youtube_client', _youtube_client)
+components.register('fetcher', _fetcher)
+components.register('comment_store', _comment_store)
+components.register('analysis_history', _analysis_history)
+components.register('score_cache', _score_cache)
+components.register('sentiment', _sentiment, warm=_warm_sentiment)
+components.register('emoji_analyzer', _emoji_analyzer)
+components.register('toxicity', _toxicity, warm=_warm_toxicity)
+components.register('gemini_model', _gemini_model)
+components.register('gemini_cache', _gemini_cache)
+components.register('pipeline', _pipeline)
+components.register('job_manager', _job_manager)
+
+
+def warm_up(names=None):
+    """Start-up hook for server workers (see ANALYSIS_PREWARM in settings)."""
+    timings = components.warm_up(names)
+    logger.info("Analysis components warmed up in %.2fs", sum(timings.values()))
+    return timings
@@ -0,0 +1,146 @@
+import io
+import logging
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.utils import timezone
+
+from analysis.models import AnalysisRun, AnalysisState, Video
+
+logger = logging.getLogger(__name__)
+
+# Most toxic comments kept per run
+TOXIC_TOP_K = 20
+# Result keys stored in their own columns rather than in `aggregates`
+_COLUMNS = ('toxicity', 'emojis', 'total_comments')
+
+
+class AnalysisHistory:
+    """
+    Stores finished analyses as AnalysisRun rows and reads them back.
+
+    Retention: runs older than `retention_days` are deleted, and each video
+    keeps at most `max_runs_per_video`. A video's own runs are pruned as it
+    gets a new one; the age sweep over all videos runs at most once every
+    `sweep_interval` seconds per process (or via `prune()` from a cron job).
+    """
+
+    def __init__(self, retention_days=90, max_runs_per_video=200, sweep_interval=3600):
+        self.retention = timedelta(days=retention_days)
+        self.max_runs_per_video = max_runs_per_video
+        self.sweep_interval = sweep_interval
+        self._last_sweep = 0.0
+
+    def record(self, video_id, kind, comment_limit, result):
+        """Saves a result dict as returned by the analysis endpoints; returns the run."""
+        sentiment = result['sentiment']
+        toxicity = dict(result.get('toxicity', {}))
+        toxic = toxicity.pop('bert', [])
+        aggregates = {key: value for key, value in result.items() if key not in _COLUMNS}
+        # The pipeline counts every toxic comment, near-duplicates included, while
+        # `bert` lists only cluster representatives (or the top k)
+        toxicity.setdefault('toxic_count', len(toxic))
+        aggregates['toxicity'] = toxicity
+
+        video, _ = Video.objects.get_or_create(video_id=video_id)
+        run = AnalysisRun.objects.create(
+            video=video,
+            kind=kind,
+            comment_limit=comment_limit,
+            total_comments=result['total_comments'],
+            vader_overall=sentiment['vader']['overall'],
+            textblob_overall=sentiment['textblob']['overall'],
+            aggregates=aggregates,
+            toxic_comments=[
+                [comment, float(score)]
+                for comment, score in sorted(toxic, key=lambda item: item[1], reverse=True)[:TOXIC_TOP_K]
+            ],
+            emojis=[[emoji, count] for emoji, count in result.get('emojis', [])],
+        )
+        self._prune_video(video)
+        if time.monotonic() - self._last_sweep >= self.sweep_interval:
+            self.prune()
+        return run
+
+    def trend(self, video_id, days=30, limit=100):
+        """A video's runs of the last `days` days, oldest first, as compact dicts."""
+        since = timezone.now() - timedelta(days=days)
+        runs = (
+            AnalysisRun.objects
+            .filter(video__video_id=video_id, created_at__gte=since)
+            .order_by('-created_at')
+            .values('id', 'created_at', 'kind', 'total_comments', 'vader_overall', 'textblob_overall',
+                    'aggregates')[:limit]
+        )
+        return [
+            {
+                'run_id': run['id'],
+                'created_at': run['created_at'],
+                'kind': run['kind'],
+                'total_comments': run['total_comments'],
+                'vader_overall': run['vader_overall'],
+                'textblob_overall': run['textblob_overall'],
+                'breakdown': {
+                    engine: run['aggregates']['sentiment'][engine]['breakdown']
+                    for engine in ('vader', 'textblob')
+                },
+            }
+            for run in reversed(runs)
+        ]
+
+    def get(self, run_id):
+        """A stored run in the shape the analysis endpoint returned it (toxic comments truncated)."""
+        run = AnalysisRun.objects.select_related('video').filter(id=run_id).first()
+        if run is None:
+            return None
+        return {
+            **run.aggregates,
+            'toxicity': {**run.aggregates.get('toxicity', {}), 'bert': run.toxic_comments},
+            'emojis': run.emojis,
+            'total_comments': run.total_comments,
+            'run_id': run.id,
+            'video_id': run.video.video_id,
+            'kind': run.kind,
+            'created_at': run.created_at,
+        }
+
+    def load_state(self, video_id, comment_limit):
+        """(digest, comment count, aggregates, arrays) saved by the pipeline, or None."""
+        state = AnalysisState.objects.filter(video__video_id=video_id, comment_limit=comment_limit).first()
+        if state is None:
+            return None
+        with np.load(io.BytesIO(bytes(state.scores))) as arrays:
+            arrays = {name: arrays[name] for name in arrays.files}
+        return state.digest, state.comment_count, state.aggregates, arrays
+
+    def save_state(self, video_id, comment_limit, digest, comment_count, aggregates, arrays):
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **arrays)
+        video, _ = Video.objects.get_or_create(video_id=video_id)
+        AnalysisState.objects.update_or_create(
+            video=video,
+            comment_limit=comment_limit,
+            defaults={
+                'comment_count': comment_count,
+                'digest': digest,
+                'aggregates': aggregates,
+                'scores': buffer.getvalue(),
+            },
+        )
+
+    def prune(self):
+        """Deletes runs past the retention period, for every video; returns how many."""
+        self._last_sweep = time.monotonic()
+        deleted, _ = AnalysisRun.objects.filter(created_at__lt=timezone.now() - self.retention).delete()
+        if deleted:
+            logger.info("Pruned %d analysis runs older than %s", deleted, self.retention)
+        return deleted
+
+    def _prune_video(self, video):
+        runs = AnalysisRun.objects.filter(video=video)
+        runs.filter(created_at__lt=timezone.now() - self.retention).delete()
+        # Both queries walk the (video, -created_at) index
+        surplus = list(runs.order_by('-created_at').values_list('id', flat=True)[self.max_runs_per_video:])
+        if surplus:
+            AnalysisRun.objects.filter(id__in=surplus).delete()
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from analysis.models import AnalysisJob
+
+
+class JobQueueFull(Exception):
+    """Raised when the job queue already holds its maximum number of waiting jobs."""
+
+
+def job_key(key):
+    return hashlib.sha256(json.dumps(key, default=str).encode('utf-8')).hexdigest()
+
+
+class JobManager:
+    """
+    Runs long analyses on a fixed pool of worker threads instead of the
+    request thread.
+
+    Job state is stored as AnalysisJob rows, so under a multi-process server
+    a status request may land on any process, and deduplication holds across
+    processes: submitting a job whose key (kind, video, limit, options)
+    matches a queued or running job returns that job instead of starting a
+    duplicate. At most `max_queued` jobs may wait in total; beyond that
+    `submit` raises JobQueueFull. Finished jobs are kept for `result_ttl`
+    seconds for polling. A job still in flight after `stale_after` seconds
+    is assumed lost with its process (restart, crash) and marked failed.
+    """
+
+    def __init__(self, workers=2, max_queued=32, result_ttl=3600, stale_after=6 * 3600, poll_interval=0.5):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+        self.stale_after = stale_after
+        # Long-polls of jobs running in another process re-read the row this often
+        self.poll_interval = poll_interval
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='analysis-job')
+        # Completion events of the jobs running in this process, by job id
+        self._done = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind, key, func, *args):
+        """Returns (job, created); `created` is False when an identical job was already in flight."""
+        key = job_key(key)
+        self._prune()
+        existing = self._in_flight(key)
+        if existing is not None:
+            return existing, False
+
+        queued = AnalysisJob.objects.filter(status=AnalysisJob.QUEUED).count()
+        if queued >= self.max_queued:
+            raise JobQueueFull(f"{queued} analyses are already waiting")
+
+        try:
+            with transaction.atomic():
+                job = AnalysisJob.objects.create(id=uuid.uuid4().hex, kind=kind, key=key)
+        except IntegrityError:
+            # Another process submitted the same job since the check above
+            existing = self._in_flight(key)
+            if existing is None:
+                raise
+            return existing, False
+
+        with self._lock:
+            self._done[job.id] = threading.Event()
+        self._executor.submit(self._run, job.id, func, args)
+        return job, True
+
+    def get(self, job_id):
+        return AnalysisJob.objects.filter(id=job_id).first()
+
+    def wait(self, job, timeout):
+        """Blocks until `job` finishes or `timeout` seconds pass, for long-polling."""
+        with self._lock:
+            done = self._done.get(job.id)
+        if done is not None:
+            done.wait(timeout)
+        else:
+            deadline = time.monotonic() + timeout
+            while job.status in AnalysisJob.IN_FLIGHT and time.monotonic() < deadline:
+                time.sleep(min(self.poll_interval, max(deadline - time.monotonic(), 0)))
+                job.refresh_from_db()
+        job.refresh_from_db()
+        return job
+
+    def stats(self):
+        counts = {status: 0 for status in (AnalysisJob.QUEUED, AnalysisJob.RUNNING,
+                                           AnalysisJob.SUCCEEDED, AnalysisJob.FAILED)}
+        for row in AnalysisJob.objects.values('status').annotate(jobs=Count('id')):
+            counts[row['status']] = row['jobs']
+        return {'workers': self.workers, 'max_queued': self.max_queued, 'jobs': counts}
+
+    def _in_flight(self, key):
+        return AnalysisJob.objects.filter(key=key, status__in=AnalysisJob.IN_FLIGHT).first()
+
+    def _run(self, job_id, func, args):
+        try:
+            AnalysisJob.objects.filter(id=job_id).update(status=AnalysisJob.RUNNING, started_at=timezone.now())
+            try:
+                result = func(*args)
+            except Exception as e:
+                self._finish(job_id, status=AnalysisJob.FAILED, error=str(e))
+            else:
+                try:
+                    self._finish(job_id, status=AnalysisJob.SUCCEEDED, result=result)
+                except (TypeError, ValueError) as e:
+                    self._finish(job_id, status=AnalysisJob.FAILED, error=f"Result could not be stored: {e}")
+        finally:
+            with self._lock:
+                done = self._done.pop(job_id, None)
+            if done is not None:
+                done.set()
+            # Worker threads outlive requests, so release their DB connection
+            connection.close()
+
+    @staticmethod
+    def _finish(job_id, **fields):
+        AnalysisJob.objects.filter(id=job_id).update(finished_at=timezone.now(), **fields)
+
+    def _prune(self):
+        now = timezone.now()
+        AnalysisJob.objects.filter(finished_at__lt=now - timedelta(seconds=self.result_ttl)).delete()
+        AnalysisJob.objects.filter(
+            status__in=AnalysisJob.IN_FLIGHT, created_at__lt=now - timedelta(seconds=self.stale_after)
+        ).update(status=AnalysisJob.FAILED, error='Job was lost by its worker process', finished_at=now)
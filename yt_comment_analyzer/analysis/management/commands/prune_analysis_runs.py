@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from analysis.components import components
+
+
+class Command(BaseCommand):
+    help = "Deletes stored analysis runs older than ANALYSIS_RUN_RETENTION_DAYS."
+
+    def handle(self, *args, **options):
+        deleted = components.get('analysis_history').prune()
+        self.stdout.write(f"Deleted {deleted} analysis runs")
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Video',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('video_id', models.CharField(max_length=32, unique=True)),
+                ('last_fetched_at', models.DateTimeField(blank=True, null=True)),
+                ('is_complete', models.BooleanField(default=False)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Comment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('comment_id', models.CharField(max_length=64)),
+                ('text', models.TextField()),
+                ('published_at', models.DateTimeField()),
+                ('video', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='analysis.video')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['video', '-published_at'], name='comment_video_published_idx')],
+                'constraints': [models.UniqueConstraint(fields=('video', 'comment_id'), name='unique_video_comment')],
+            },
+        ),
+    ]
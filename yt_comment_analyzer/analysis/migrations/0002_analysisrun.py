@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:59
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalysisRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=16)),
+                ('comment_limit', models.PositiveIntegerField()),
+                ('total_comments', models.PositiveIntegerField()),
+                ('vader_overall', models.FloatField()),
+                ('textblob_overall', models.FloatField()),
+                ('aggregates', models.JSONField()),
+                ('toxic_comments', models.JSONField(default=list)),
+                ('emojis', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('video', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='analysis_runs', to='analysis.video')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['video', '-created_at'], name='run_video_created_idx'), models.Index(fields=['created_at'], name='run_created_idx')],
+            },
+        ),
+    ]
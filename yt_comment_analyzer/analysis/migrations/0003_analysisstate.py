@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0002_analysisrun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalysisState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('comment_limit', models.PositiveIntegerField()),
+                ('comment_count', models.PositiveIntegerField()),
+                ('digest', models.CharField(max_length=64)),
+                ('aggregates', models.JSONField()),
+                ('scores', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('video', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='analysis_states', to='analysis.video')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('video', 'comment_limit'), name='unique_video_state_limit')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:29
+
+from django.db import migrations, models
+
+
+def forget_stored_comments(apps, schema_editor):
+    # The store is a cache of the API: comments saved without authors and like
+    # counts are dropped so the next request fetches them again with both
+    apps.get_model('analysis', 'Comment').objects.all().delete()
+    apps.get_model('analysis', 'Video').objects.update(is_complete=False, last_fetched_at=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0005_analysisjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='author',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='author_channel_id',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(forget_stored_comments, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,145 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class Video(models.Model):
+    """A YouTube video whose comments are kept in the local comment store."""
+    video_id = models.CharField(max_length=32, unique=True)
+    last_fetched_at = models.DateTimeField(null=True, blank=True)
+    # True once a fetch reached the end of the comment section
+    is_complete = models.BooleanField(default=False)
+
+    def __str__(self):
+        return self.video_id
+
+
+class Comment(models.Model):
+    """A top-level comment of a stored video."""
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='comments')
+    comment_id = models.CharField(max_length=64)
+    text = models.TextField()
+    published_at = models.DateTimeField()
+    author = models.CharField(max_length=255, blank=True, default='')
+    author_channel_id = models.CharField(max_length=64, blank=True, default='')
+    # As of when the comment was stored: refreshes only fetch newer comments
+    like_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['video', 'comment_id'], name='unique_video_comment'),
+        ]
+        indexes = [
+            # Matches the store's ('-published_at', 'id') order, so pages are index range scans
+            models.Index(fields=['video', '-published_at', 'id'], name='comment_video_published_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.video.video_id} - {self.comment_id}"
+
+
+class AnalysisRun(models.Model):
+    """
+    The outcome of one analysis of a video, kept so history can be shown
+    without recomputing: overall scores as columns for trend queries, the
+    rest of the aggregates, the most toxic comments and emoji counts as JSON.
+    """
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='analysis_runs')
+    # 'sentiment' (full or bounded pipeline) or 'sample' (fast mode)
+    kind = models.CharField(max_length=16)
+    comment_limit = models.PositiveIntegerField()
+    total_comments = models.PositiveIntegerField()
+    vader_overall = models.FloatField()
+    textblob_overall = models.FloatField()
+    aggregates = models.JSONField()
+    toxic_comments = models.JSONField(default=list)
+    emojis = models.JSONField(default=list)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['video', '-created_at'], name='run_video_created_idx'),
+            # Retention pruning deletes by age across all videos
+            models.Index(fields=['created_at'], name='run_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.video.video_id} - {self.kind} - {self.created_at:%Y-%m-%d %H:%M}"
+
+
+class AnalysisState(models.Model):
+    """
+    Mergeable aggregates of the last full-pipeline analysis of a video's
+    newest `comment_limit` comments, so the next analysis only scores
+    comments posted since. `digest` identifies the analysed comment texts.
+    """
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='analysis_states')
+    comment_limit = models.PositiveIntegerField()
+    comment_count = models.PositiveIntegerField()
+    digest = models.CharField(max_length=64)
+    aggregates = models.JSONField()
+    # Per-comment VADER and TextBlob scores (NumPy .npz) for medians and quantiles
+    scores = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['video', 'comment_limit'], name='unique_video_state_limit'),
+        ]
+
+    def __str__(self):
+        return f"{self.video.video_id} - {self.comment_limit} - {self.comment_count} comments"
+
+
+class AnalysisJob(models.Model):
+    """
+    A background analysis (see analysis.jobs). Its state lives here rather
+    than in process memory, so any server process can report on it and
+    deduplicate against it; the work runs on a worker thread of the process
+    that accepted the job.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    IN_FLIGHT = (QUEUED, RUNNING)
+
+    id = models.CharField(max_length=32, primary_key=True)
+    kind = models.CharField(max_length=16)
+    # Digest of (kind, video, limit, options); identical requests share it
+    key = models.CharField(max_length=64)
+    status = models.CharField(max_length=16, default=QUEUED)
+    result = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            # At most one queued or running job per key, across processes
+            models.UniqueConstraint(
+                fields=['key'], condition=models.Q(status__in=['queued', 'running']), name='unique_in_flight_job'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='job_status_created_idx'),
+        ]
+
+    def to_dict(self):
+        data = {
+            'job_id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'created_at': self.created_at.timestamp(),
+            'started_at': self.started_at.timestamp() if self.started_at else None,
+            'finished_at': self.finished_at.timestamp() if self.finished_at else None,
+        }
+        if self.status == AnalysisJob.SUCCEEDED:
+            data['result'] = self.result
+        elif self.status == AnalysisJob.FAILED:
+            data['error'] = self.error
+        return data
+
+    def __str__(self):
+        return f"{self.kind} - {self.id} - {self.status}"
@@ -0,0 +1,395 @@
+import asyncio
+import hashlib
+from collections import Counter
+
+import numpy as np
+
+from analysis.src.analysis.aggregates import CappedCounter, TopK
+from analysis.src.processing.dedup import NearDuplicateIndex
+from analysis.src.processing.preprocess import preprocess
+
+
+# Bounded-memory limits: most toxic comments reported, distinct emoji
+# counted and near-duplicate clusters remembered
+TOXIC_TOP_K = 100
+EMOJI_KEYS = 1000
+MAX_CLUSTERS = 10_000
+# Comments per process_page call by default: one API page
+SCORE_BATCH_SIZE = 100
+
+
+def comment_hashes(texts):
+    """64-bit BLAKE2b hash of every comment text, in order, to find a saved window again."""
+    return np.array([
+        int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+        for text in texts
+    ], dtype=np.uint64)
+
+
+class PipelineState:
+    """
+    Aggregates maintained incrementally as pages flow through the stages.
+
+    With `bounded=True` nothing grows with the number of comments: sentiment
+    keeps histograms instead of score arrays, only the TOXIC_TOP_K most toxic
+    comments are kept, emoji counts are capped and near-duplicate clustering
+    stops opening clusters after MAX_CLUSTERS.
+
+    With `removable=True` (unbounded and unclustered only) each comment's
+    links, emoji and toxicity are also kept, so `truncate` can take the
+    oldest comments back out.
+    """
+
+    def __init__(self, sentiment, dedup_threshold=None, bounded=False, removable=False):
+        if removable and (bounded or dedup_threshold):
+            raise ValueError("only unbounded, unclustered states can remove comments")
+        self.bounded = bounded
+        self.removable = removable
+        # Near-duplicate clusters and their representatives' scores, by cluster id
+        self.dedup = NearDuplicateIndex(
+            dedup_threshold, max_clusters=MAX_CLUSTERS if bounded else None
+        ) if dedup_threshold else None
+        self.cluster_vader = []
+        self.cluster_textblob = []
+        self.cluster_toxic = []
+        self.vader = sentiment.accumulator(bounded)
+        self.textblob = sentiment.accumulator(bounded)
+        # Bounded: (score, -arrival, comment), so ties keep the earlier comment
+        self.toxic_comments = TopK(TOXIC_TOP_K) if bounded else []
+        self.toxic_seen = 0
+        # Every toxic comment, including cluster members and those past the top-k
+        self.toxic_count = 0
+        self.emoji_counter = CappedCounter(EMOJI_KEYS) if bounded else Counter()
+        self.urls = 0
+        self.mentions = 0
+        self.total_comments = 0
+        # Removable states: per comment, and the position of each listed toxic comment
+        self.comment_urls = []
+        self.comment_mentions = []
+        self.comment_emojis = []
+        self.toxic_positions = []
+
+    def add_toxic(self, toxic):
+        if not self.bounded:
+            self.toxic_comments.extend(toxic)
+            return
+        for comment, score in toxic:
+            self.toxic_comments.push((score, -self.toxic_seen, comment))
+            self.toxic_seen += 1
+
+    def add_rows(self, processed, cleaned_comments, toxic):
+        """Per-comment data of a batch arriving after the first `total_comments` comments."""
+        self.comment_urls.extend(p.urls for p in processed)
+        self.comment_mentions.extend(p.mentions for p in processed)
+        self.comment_emojis.extend(p.emojis for p in processed)
+        position = 0
+        for comment, _ in toxic:
+            # Toxic comments come back in input order
+            position = cleaned_comments.index(comment, position)
+            self.toxic_positions.append(self.total_comments + position)
+            position += 1
+
+    def toxic(self):
+        if not self.bounded:
+            return self.toxic_comments
+        return [(comment, score) for score, _, comment in self.toxic_comments.largest()]
+
+    def merge(self, other):
+        """
+        Appends `other`'s comments after this state's: the merged aggregates
+        equal those of one run over this state's comments followed by
+        `other`'s. Clustered states cannot be merged, since which comment
+        represents a cluster depends on the order comments arrive in.
+        """
+        if self.dedup is not None or other.dedup is not None:
+            raise ValueError("near-duplicate clustered states cannot be merged")
+        if self.bounded != other.bounded:
+            raise ValueError("cannot merge bounded and unbounded states")
+        if self.removable != other.removable:
+            raise ValueError("cannot merge removable and non-removable states")
+        self.vader.merge(other.vader)
+        self.textblob.merge(other.textblob)
+        if self.bounded:
+            # Keys hold -arrival; other's arrivals continue after ours
+            for score, key, comment in other.toxic_comments.heap:
+                self.toxic_comments.push((score, key - self.toxic_seen, comment))
+            self.toxic_seen += other.toxic_seen
+        else:
+            self.toxic_comments.extend(other.toxic_comments)
+        self.toxic_count += other.toxic_count
+        self.emoji_counter.update(other.emoji_counter)
+        self.urls += other.urls
+        self.mentions += other.mentions
+        if self.removable:
+            self.comment_urls.extend(other.comment_urls)
+            self.comment_mentions.extend(other.comment_mentions)
+            self.comment_emojis.extend(other.comment_emojis)
+            self.toxic_positions.extend(position + self.total_comments for position in other.toxic_positions)
+        self.total_comments += other.total_comments
+
+    def truncate(self, count):
+        """Removes every comment after the first `count`, leaving what adding only those would have."""
+        if not self.removable:
+            raise ValueError("only removable states can drop comments")
+        if count >= self.total_comments:
+            return
+        self.vader.truncate(count)
+        self.textblob.truncate(count)
+        kept = [i for i, position in enumerate(self.toxic_positions) if position < count]
+        self.toxic_comments = [self.toxic_comments[i] for i in kept]
+        self.toxic_positions = [self.toxic_positions[i] for i in kept]
+        self.toxic_count = len(kept)
+        for emojis in self.comment_emojis[count:]:
+            self.emoji_counter.subtract(emojis)
+        # Emoji only removed comments had go; the rest keep their first-seen order
+        self.emoji_counter = Counter({emoji: n for emoji, n in self.emoji_counter.items() if n > 0})
+        self.urls -= sum(self.comment_urls[count:])
+        self.mentions -= sum(self.comment_mentions[count:])
+        del self.comment_urls[count:], self.comment_mentions[count:], self.comment_emojis[count:]
+        self.total_comments = count
+
+    def to_state(self):
+        """(JSON-serializable aggregates, {name: array}) of a removable state."""
+        if not self.removable:
+            raise ValueError("only removable states can be saved")
+        vader, vader_scores = self.vader.state()
+        textblob, textblob_scores = self.textblob.state()
+        aggregates = {
+            'vader': vader,
+            'textblob': textblob,
+            'toxic': [[comment, float(score)] for comment, score in self.toxic_comments],
+            'toxic_count': self.toxic_count,
+            # A list, so the counter's first-seen key order survives JSON
+            'emojis': [[emoji, count] for emoji, count in self.emoji_counter.items()],
+            # Sparse: most comments have none
+            'comment_emojis': [[i, list(emojis)] for i, emojis in enumerate(self.comment_emojis) if emojis],
+            'urls': self.urls,
+            'mentions': self.mentions,
+            'total_comments': self.total_comments,
+        }
+        return aggregates, {
+            'vader': vader_scores,
+            'textblob': textblob_scores,
+            'urls': np.array(self.comment_urls, dtype=np.int32),
+            'mentions': np.array(self.comment_mentions, dtype=np.int32),
+            'toxic_positions': np.array(self.toxic_positions, dtype=np.int64),
+        }
+
+    @classmethod
+    def from_state(cls, sentiment, aggregates, arrays):
+        state = cls(sentiment, removable=True)
+        state.vader = type(state.vader).from_state(sentiment, aggregates['vader'], arrays['vader'])
+        state.textblob = type(state.textblob).from_state(sentiment, aggregates['textblob'], arrays['textblob'])
+        state.toxic_comments = [(comment, score) for comment, score in aggregates['toxic']]
+        state.toxic_count = aggregates['toxic_count']
+        state.emoji_counter = Counter(dict(aggregates['emojis']))
+        state.urls = aggregates['urls']
+        state.mentions = aggregates['mentions']
+        state.total_comments = aggregates['total_comments']
+        state.comment_urls = arrays['urls'].tolist()
+        state.comment_mentions = arrays['mentions'].tolist()
+        state.toxic_positions = arrays['toxic_positions'].tolist()
+        state.comment_emojis = [()] * state.total_comments
+        for i, emojis in aggregates['comment_emojis']:
+            state.comment_emojis[i] = tuple(emojis)
+        return state
+
+
+class StreamingAnalysisPipeline:
+    """
+    Fetches comment pages and pushes each one through
+    preprocess -> sentiment -> toxicity -> emoji while the next page downloads.
+
+    Fetching and analysis run in worker threads connected by a small queue,
+    so network and CPU time overlap instead of adding up. The final result
+    has the same shape and values as analysing the full comment list at once.
+
+    With a `state_store`, unclustered unbounded runs are incremental: the
+    aggregates of the last analysed window are saved per (video, limit) with
+    per-comment hashes and data. When the new window is newer comments on top
+    of the saved one, less any of its oldest comments the limit pushed out,
+    only the new comments are scored; the pushed-out ones are subtracted from
+    the saved state, which is then merged in after them.
+    """
+
+    def __init__(self, fetcher, sentiment, toxicity, emoji_analyzer, prefetch_pages=2, dedup_threshold=None,
+                 bounded_above=None, state_store=None, score_batch_size=None):
+        # Anything with `iter_pages(video_id, limit)`: a CommentFetcher or a CommentStore
+        self.fetcher = fetcher
+        self.sentiment = sentiment
+        self.toxicity = toxicity
+        self.emoji_analyzer = emoji_analyzer
+        self.prefetch_pages = prefetch_pages
+        # Near-duplicates (estimated Jaccard >= threshold) share one scored representative
+        self.dedup_threshold = dedup_threshold
+        # Requests for more comments than this run in bounded-memory mode
+        self.bounded_above = bounded_above
+        # Anything with load_state(video_id, limit) -> (digest, count, aggregates, arrays) or None,
+        # and save_state(video_id, limit, digest, count, aggregates, arrays)
+        self.state_store = state_store
+        # Consecutive pages are scored together in batches of at least this many
+        # comments, so a sentiment process pool gets lists big enough to shard
+        self.score_batch_size = score_batch_size or SCORE_BATCH_SIZE
+
+    async def run(self, video_id, comment_limit, top_emojis=5, bounded=None):
+        if bounded is None:
+            bounded = self.bounded_above is not None and comment_limit > self.bounded_above
+        removable = self.state_store is not None and not self.dedup_threshold and not bounded
+        state = PipelineState(self.sentiment, self.dedup_threshold, bounded, removable)
+        incremental = None
+        if removable:
+            state, incremental = await self._run_incremental(video_id, comment_limit, state)
+        else:
+            await self._consume(video_id, comment_limit, lambda page: self.process_page(page, state))
+
+        return {
+            'sentiment': {
+                'vader': state.vader.result(),
+                'textblob': state.textblob.result()
+            },
+            'toxicity': {
+                'bert': state.toxic(),
+                'toxic_count': state.toxic_count,
+            },
+            'emojis': state.emoji_counter.most_common(top_emojis),
+            'links': {'urls': state.urls, 'mentions': state.mentions},
+            'clusters': state.dedup.summary() if state.dedup else None,
+            'total_comments': state.total_comments,
+            'bounded_memory': state.bounded,
+            'incremental': incremental,
+        }
+
+    async def _consume(self, video_id, comment_limit, handle_page):
+        queue = asyncio.Queue(maxsize=self.prefetch_pages)
+        producer = asyncio.create_task(self._produce(video_id, comment_limit, queue))
+        try:
+            batch = []
+            while True:
+                page = await queue.get()
+                if page is None:
+                    break
+                batch.extend(page)
+                if len(batch) >= self.score_batch_size:
+                    await asyncio.to_thread(handle_page, batch)
+                    batch = []
+            if batch:
+                await asyncio.to_thread(handle_page, batch)
+            await producer  # re-raises fetch errors
+        finally:
+            producer.cancel()
+
+    async def _run_incremental(self, video_id, comment_limit, state):
+        """
+        Returns (state, {'reused', 'scored'}). The window is newest first, so
+        new comments come before the saved ones and comments evicted by the
+        limit are at the saved window's tail.
+        """
+        saved = await asyncio.to_thread(self.state_store.load_state, video_id, comment_limit)
+        texts = []
+        if saved is None:
+            def handle_page(page):
+                texts.extend(page)
+                self.process_page(page, state)
+        else:
+            handle_page = texts.extend
+        await self._consume(video_id, comment_limit, handle_page)
+        hashes = comment_hashes(texts)
+
+        reused = 0
+        if saved is not None:
+            _, _, aggregates, arrays = saved
+            fresh = self._fresh_comments(hashes, arrays.get('hashes'))
+            previous = None
+            if fresh is None:
+                fresh = len(texts)
+            else:
+                previous = PipelineState.from_state(self.sentiment, aggregates, arrays)
+                previous.truncate(len(texts) - fresh)
+                reused = previous.total_comments
+            await asyncio.to_thread(self._process_texts, texts[:fresh], state)
+            if previous is not None:
+                state.merge(previous)
+
+        aggregates, arrays = state.to_state()
+        await asyncio.to_thread(
+            self.state_store.save_state, video_id, comment_limit, hashlib.sha256(hashes.tobytes()).hexdigest(),
+            len(texts), aggregates, {**arrays, 'hashes': hashes}
+        )
+        return state, {'reused': reused, 'scored': len(texts) - reused}
+
+    @staticmethod
+    def _fresh_comments(hashes, saved_hashes):
+        """
+        How many comments lead the window before the saved window picks up
+        again (possibly missing its tail), or None if it does not.
+        """
+        if saved_hashes is None or not len(saved_hashes):
+            return None
+        # Most comments reused first; a repeated text can match more than once
+        for fresh in np.flatnonzero(hashes == saved_hashes[0]).tolist():
+            kept = len(hashes) - fresh
+            if kept <= len(saved_hashes) and np.array_equal(hashes[fresh:], saved_hashes[:kept]):
+                return fresh
+        return None
+
+    def _process_texts(self, texts, state):
+        for start in range(0, len(texts), self.score_batch_size):
+            self.process_page(texts[start:start + self.score_batch_size], state)
+
+    async def _produce(self, video_id, comment_limit, queue):
+        pages = self.fetcher.iter_pages(video_id, comment_limit)
+        try:
+            while True:
+                page = await asyncio.to_thread(next, pages, None)
+                if page is None:
+                    break
+                await queue.put(page)
+        finally:
+            await queue.put(None)
+
+    def process_page(self, raw_comments, state):
+        processed = [preprocess(c) for c in raw_comments]
+        cleaned_comments = [p.cleaned for p in processed]
+        if state.dedup is None:
+            state.vader.update(self.sentiment.score_vader(cleaned_comments))
+            state.textblob.update(self.sentiment.score_textblob(cleaned_comments))
+            toxic = self.toxicity.analyze(cleaned_comments)
+            state.add_toxic(toxic)
+            state.toxic_count += len(toxic)
+            if state.removable:
+                state.add_rows(processed, cleaned_comments, toxic)
+        else:
+            self._process_clustered(cleaned_comments, state)
+        state.emoji_counter.update(self.emoji_analyzer.count_extracted(p.emojis for p in processed))
+        state.urls += sum(p.urls for p in processed)
+        state.mentions += sum(p.mentions for p in processed)
+        state.total_comments += len(cleaned_comments)
+
+    def _process_clustered(self, cleaned_comments, state):
+        """Scores only new cluster representatives; every member counts with its representative's scores."""
+        clusters = state.dedup.add_many(cleaned_comments)
+        representatives = [text for text, (_, is_new) in zip(cleaned_comments, clusters) if is_new]
+        fresh_vader = iter(self.sentiment.score_vader(representatives))
+        fresh_textblob = iter(self.sentiment.score_textblob(representatives))
+        toxic = self.toxicity.analyze(representatives)
+        state.add_toxic(toxic)
+        toxic_texts = {comment for comment, _ in toxic}
+        vader, textblob = [], []
+        for text, (cluster_id, is_new) in zip(cleaned_comments, clusters):
+            if is_new:
+                v, t, is_toxic = next(fresh_vader), next(fresh_textblob), text in toxic_texts
+                # Cluster ids are handed out in order, so new scores append at their ids;
+                # unclustered comments (id None) are scored but not remembered
+                if cluster_id is not None:
+                    state.cluster_vader.append(v)
+                    state.cluster_textblob.append(t)
+                    state.cluster_toxic.append(is_toxic)
+            else:
+                v, t = state.cluster_vader[cluster_id], state.cluster_textblob[cluster_id]
+                is_toxic = state.cluster_toxic[cluster_id]
+            vader.append(v)
+            textblob.append(t)
+            # Toxicity counts per member, though only representatives are listed
+            state.toxic_count += is_toxic
+        state.vader.update(vader)
+        state.textblob.update(textblob)
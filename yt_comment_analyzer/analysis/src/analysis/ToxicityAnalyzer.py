@@ -1,25 +1,120 @@
-import torch
-from transformers import AutoModelForSequenceClassification, AutoTokenizer
-import torch.nn.functional as F
-import matplotlib.pyplot as plt
+import time
+from transformers import AutoTokenizer
+from .cache import score_unique
+from .toxicity_backends import load_backend
 
 class BertToxicityAnalyzer:
-    def __init__(self):
-        self.model_name = "cardiffnlp/twitter-roberta-base-offensive"
-        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-        self.model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
-    
-    def analyze(self, comments):
-        toxic_comments = []
-        for comment in comments:
-            inputs = self.tokenizer(comment, return_tensors="pt", truncation=True, padding=True, max_length=512)
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                probs = F.softmax(outputs.logits, dim=-1)
-                toxicity_score = probs[0][1].item()
-                if toxicity_score > 0.5:  # Filtering only toxic comments
-                    toxic_comments.append((comment, toxicity_score))
-        return toxic_comments
+    def __init__(self, model_name="cardiffnlp/twitter-roberta-base-offensive", batch_size=32, max_length=512,
+                 backend="torch", backend_dir=None, cache=None, prefilter=None, cascade_threshold=0.3):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.tokenizer = AutoTokenizer.from_pretrained(backend_dir or self.model_name)
+        self.backend = load_backend(backend, self.model_name, backend_dir)
+        self.cache = cache
+        self.cache_namespace = f"toxicity:{self.model_name}:{self.backend.name}"
+        # Cascade mode: only comments the cheap prefilter finds suspicious reach the model
+        self.prefilter = prefilter
+        self.cascade_threshold = cascade_threshold
+        self.last_run_stats = {}
+
+    def analyze(self, comments, batch_size=None):
+        return [(comment, score) for _, comment, score in self._toxic(list(comments), batch_size)]
+
+    def toxic_indices(self, comments, batch_size=None):
+        """Input positions of the comments `analyze` would return."""
+        return [i for i, _, _ in self._toxic(list(comments), batch_size)]
+
+    def analyze_many(self, comment_lists, batch_size=None):
+        """
+        `analyze` for several comment lists at once: all comments share one
+        pooled pass (so batches stay full), and the toxic ones are split back
+        out per list.
+        """
+        comment_lists = [list(comments) for comments in comment_lists]
+        pooled = [comment for comments in comment_lists for comment in comments]
+        owners = [owner for owner, comments in enumerate(comment_lists) for _ in comments]
+        results = [[] for _ in comment_lists]
+        for i, comment, score in self._toxic(pooled, batch_size):
+            results[owners[i]].append((comment, score))
+        return results
+
+    def _toxic(self, comments, batch_size):
+        """(index, comment, score) of every toxic comment, in input order."""
+        indices = range(len(comments))
+        if self.prefilter is not None:
+            suspicion = self.prefilter.suspicion(comments)
+            indices = [i for i, s in enumerate(suspicion) if s >= self.cascade_threshold]
+            scores = self.score([comments[i] for i in indices], batch_size)
+            self.last_run_stats['prefiltered'] = len(comments) - len(indices)
+        else:
+            scores = self.score(comments, batch_size)
+        # Filtering only toxic comments
+        return [(i, comments[i], score) for i, score in zip(indices, scores) if score > 0.5]
+
+    def score(self, comments, batch_size=None):
+        """
+        Returns the offensive-class probability of every comment, in input order.
+
+        Duplicate and cached comments are scored once; the rest are sorted by
+        token length and run through the model in batches padded only to the
+        longest comment of each batch.
+        """
+        comments = list(comments)
+        batch_size = batch_size or self.batch_size
+        self.last_run_stats = self._throughput_stats(0, 0, 0, 0, batch_size, 0.0)
+        scores = score_unique(
+            comments,
+            lambda unique_comments: self._score_batched(unique_comments, batch_size),
+            self.cache,
+            self.cache_namespace,
+        )
+        self.last_run_stats['requested'] = len(comments)
+        return scores
+
+    def _score_batched(self, comments, batch_size):
+        start_time = time.perf_counter()
+        scores = [0.0] * len(comments)
+        if not comments:
+            return scores
+
+        input_ids = self.tokenizer(comments, truncation=True, max_length=self.max_length)["input_ids"]
+        order = sorted(range(len(comments)), key=lambda i: len(input_ids[i]))
+
+        batches = 0
+        real_tokens = 0
+        padded_tokens = 0
+        for offset in range(0, len(order), batch_size):
+            indices = order[offset:offset + batch_size]
+            inputs = self.tokenizer.pad(
+                {"input_ids": [input_ids[i] for i in indices]},
+                return_tensors=self.backend.tensor_type,
+            )
+            probs = self.backend.predict(inputs)
+            for i, toxicity_score in zip(indices, probs):
+                scores[i] = toxicity_score
+
+            batches += 1
+            real_tokens += int(inputs["attention_mask"].sum())
+            padded_tokens += inputs["input_ids"].shape[0] * inputs["input_ids"].shape[1]
+
+        elapsed = time.perf_counter() - start_time
+        self.last_run_stats = self._throughput_stats(
+            len(comments), batches, real_tokens, padded_tokens, batch_size, elapsed
+        )
+        return scores
+
+    def _throughput_stats(self, total, batches, real_tokens, padded_tokens, batch_size, elapsed):
+        return {
+            'comments': total,
+            'batches': batches,
+            'batch_size': batch_size,
+            'backend': self.backend.name,
+            'seconds': elapsed,
+            'comments_per_sec': total / elapsed if elapsed else 0.0,
+            'tokens_per_sec': real_tokens / elapsed if elapsed else 0.0,
+            'padding_efficiency': real_tokens / padded_tokens if padded_tokens else 1.0,
+        }
 
 # Function to classify toxicity levels
 def classify_toxicity(comments):
@@ -0,0 +1,160 @@
+import heapq
+import random
+from collections import Counter
+from fractions import Fraction
+
+import numpy as np
+
+# Every finite double is an integer multiple of 2**-1074
+_EXACT_SHIFT = 1074
+# Mantissas are summed as two halves of this many bits, in float64 bincounts:
+# exact while a batch holds fewer than 2**(53 - 27) values
+_HALF_BITS = 26
+_EXACT_BATCH = 1 << 25
+
+
+class ExactSum:
+    """
+    Order-independent running sum of floats, kept as an exact integer multiple
+    of 2**-1074. Its mean is correctly rounded, i.e. identical to
+    `statistics.mean` over the same values however they were batched.
+    """
+
+    def __init__(self, value=0):
+        self.value = value
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if not np.isfinite(values).all():
+            raise ValueError("cannot sum NaN or infinite scores exactly")
+        for start in range(0, len(values), _EXACT_BATCH):
+            self.value += self._exact_total(values[start:start + _EXACT_BATCH])
+
+    @staticmethod
+    def _exact_total(values):
+        """
+        Each value is mantissa * 2**exponent with a 53-bit integer mantissa.
+        Mantissas sharing an exponent are summed in NumPy, so Python integers
+        are only touched once per distinct exponent, not once per value.
+        """
+        fractions, exponents = np.frexp(values)
+        mantissas = (fractions * 2.0 ** 53).astype(np.int64)
+        high, low = np.divmod(mantissas, 1 << _HALF_BITS)
+        distinct, index = np.unique(exponents, return_inverse=True)
+        high_sums = np.bincount(index, weights=high, minlength=len(distinct))
+        low_sums = np.bincount(index, weights=low, minlength=len(distinct))
+        total = 0
+        for exponent, high_sum, low_sum in zip(distinct.tolist(), high_sums.tolist(), low_sums.tolist()):
+            mantissa_sum = (int(high_sum) << _HALF_BITS) + int(low_sum)
+            shift = int(exponent) - 53 + _EXACT_SHIFT
+            # Negative only for subnormals, whose mantissas end in enough zero bits
+            total += mantissa_sum << shift if shift >= 0 else mantissa_sum >> -shift
+        return total
+
+    def merge(self, other):
+        self.value += other.value
+
+    def mean(self, count):
+        if not count:
+            return 0.0
+        return float(Fraction(self.value, count << _EXACT_SHIFT))
+
+
+class ScoreHistogram:
+    """
+    Fixed-width histogram of scores in [low, high]. Quantiles read from it are
+    within half a bin of `np.quantile` over the same scores, and it never
+    grows with the number of scores.
+    """
+
+    def __init__(self, bins=20000, low=-1.0, high=1.0):
+        self.low = low
+        self.high = high
+        self.width = (high - low) / bins
+        self.counts = np.zeros(bins, dtype=np.int64)
+
+    def add(self, scores):
+        bins = ((np.clip(scores, self.low, self.high) - self.low) / self.width).astype(np.int64)
+        self.counts += np.bincount(np.minimum(bins, len(self.counts) - 1), minlength=len(self.counts))
+
+    def quantiles(self, qs):
+        total = int(self.counts.sum())
+        if not total:
+            return [0.0] * len(qs)
+        cumulative = np.cumsum(self.counts)
+        centers = self.low + (np.arange(len(self.counts)) + 0.5) * self.width
+
+        def value(rank):
+            return centers[np.searchsorted(cumulative, rank, side='right')]
+
+        # Linear interpolation between neighbouring ranks, as np.quantile does
+        result = []
+        for q in qs:
+            rank = q * (total - 1)
+            below = int(rank)
+            result.append(float(value(below) + (value(min(below + 1, total - 1)) - value(below)) * (rank - below)))
+        return result
+
+
+class TopK:
+    """The `k` largest items pushed so far, kept in a min-heap of at most `k` entries."""
+
+    def __init__(self, k):
+        self.k = k
+        self.heap = []
+
+    def push(self, item):
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, item)
+        elif item > self.heap[0]:
+            heapq.heapreplace(self.heap, item)
+
+    def extend(self, items):
+        for item in items:
+            self.push(item)
+
+    def merge(self, other):
+        self.extend(other.heap)
+
+    def largest(self):
+        return sorted(self.heap, reverse=True)
+
+
+class CappedCounter(Counter):
+    """
+    Counter that keeps at most about `max_keys` keys: past twice that, only
+    the `max_keys` most common survive. Frequent keys keep exact counts; a
+    rare key may be dropped and later counted again from zero.
+    """
+
+    def __init__(self, max_keys=1000):
+        # Counter.__init__ calls update(), which needs max_keys
+        self.max_keys = max_keys
+        super().__init__()
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        if len(self) > 2 * self.max_keys:
+            kept = self.most_common(self.max_keys)
+            self.clear()
+            super().update(dict(kept))
+
+
+class Reservoir:
+    """Uniform random sample of at most `size` items from a stream of unknown length."""
+
+    def __init__(self, size, seed=None):
+        self.size = size
+        self.items = []
+        self.seen = 0
+        self.rng = random.Random(seed)
+
+    def extend(self, items):
+        for item in items:
+            self.seen += 1
+            if len(self.items) < self.size:
+                self.items.append(item)
+            else:
+                slot = self.rng.randrange(self.seen)
+                if slot < self.size:
+                    self.items[slot] = item
@@ -0,0 +1,87 @@
+"""
+Pooled scoring of several videos' comments.
+
+Analysing videos one by one runs many small model passes, each with its own
+half-empty last batch and its own pool/NumPy overhead. `score_comment_sets`
+concatenates every video's cleaned comments, runs VADER, TextBlob and the
+toxicity model once over the pooled list, and splits the scores back out by
+offset, so each video gets exactly what analysing it alone would give.
+
+With a `new_index` (a callable returning an empty near-duplicate index,
+e.g. `functools.partial(NearDuplicateIndex, threshold)`), each video's
+comments are clustered first (per video, in order, as the streaming pipeline
+clusters them) and only cluster representatives go into the pool; members
+count with their representative's scores. The index is passed in rather
+than imported, so this module works from both the Django app and the CLI.
+"""
+
+
+def score_comment_sets(comment_sets, sentiment, toxicity, new_index=None):
+    """
+    `comment_sets` is a list of cleaned comment lists; returns, per list,
+    {'sentiment': {'vader', 'textblob'}, 'toxicity': {'bert', 'toxic_count'}, 'clusters'}.
+    """
+    scored_sets, positions, indexes = [], [], []
+    for comments in comment_sets:
+        if new_index is None:
+            scored_sets.append(comments)
+            positions.append(None)
+            indexes.append(None)
+            continue
+        index, representatives, members = _collapse(comments, new_index())
+        scored_sets.append(representatives)
+        positions.append(members)
+        indexes.append(index)
+
+    pooled = [comment for comments in scored_sets for comment in comments]
+    vader = sentiment.score_vader(pooled)
+    textblob = sentiment.score_textblob(pooled)
+    toxic = toxicity.analyze_many(scored_sets)
+
+    results = []
+    start = 0
+    for comments, members, index, toxic_comments in zip(scored_sets, positions, indexes, toxic):
+        end = start + len(comments)
+        video_vader, video_textblob = vader[start:end], textblob[start:end]
+        toxic_count = len(toxic_comments)
+        if members is not None:
+            # Back from one score per representative to one per comment
+            video_vader = [video_vader[i] for i in members]
+            video_textblob = [video_textblob[i] for i in members]
+            toxic_texts = {comment for comment, _ in toxic_comments}
+            is_toxic = [comment in toxic_texts for comment in comments]
+            toxic_count = sum(is_toxic[i] for i in members)
+        results.append({
+            'sentiment': {
+                'vader': _sentiment_result(sentiment, video_vader),
+                'textblob': _sentiment_result(sentiment, video_textblob),
+            },
+            'toxicity': {
+                'bert': toxic_comments,
+                'toxic_count': toxic_count,
+            },
+            'clusters': index.summary() if index is not None else None,
+        })
+        start = end
+    return results
+
+
+def _collapse(comments, index):
+    """(index, representatives, per comment the position of its representative)."""
+    representatives, members, position = [], [], {}
+    for comment, (cluster_id, is_new) in zip(comments, index.add_many(comments)):
+        if is_new:
+            # Unclustered comments (id None) are their own representative
+            if cluster_id is not None:
+                position[cluster_id] = len(representatives)
+            members.append(len(representatives))
+            representatives.append(comment)
+        else:
+            members.append(position[cluster_id])
+    return index, representatives, members
+
+
+def _sentiment_result(sentiment, scores):
+    accumulator = sentiment.accumulator()
+    accumulator.update(scores)
+    return accumulator.result()
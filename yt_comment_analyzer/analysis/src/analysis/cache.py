@@ -0,0 +1,210 @@
+import atexit
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+
+def normalize_text(text):
+    """
+    Canonical form used for cache keys: NFC unicode and collapsed whitespace.
+    Case and punctuation are kept because VADER scores depend on both.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def text_key(text):
+    return hashlib.blake2b(normalize_text(text).encode("utf-8"), digest_size=16).digest()
+
+
+class ScoreCache:
+    """
+    Bounded, thread-safe LRU of per-comment scores keyed by (namespace, text hash).
+
+    A namespace identifies the scorer (e.g. 'vader', 'textblob' or a toxicity
+    model), so the same comment can hold one score per scorer. When `path` is
+    given the cache is loaded from it on start-up and written back at exit.
+    """
+
+    def __init__(self, max_entries=200_000, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self._entries = OrderedDict()
+        self._stats = {}
+        self._lock = threading.Lock()
+        if path:
+            self.load()
+            atexit.register(self.save)
+
+    def get_many(self, namespace, keys, duplicates=0):
+        """
+        Returns {key: score} for the keys that are cached and counts hits/misses.
+        `duplicates` is the number of in-batch copies already folded into `keys`.
+        """
+        found = {}
+        with self._lock:
+            for key in keys:
+                score = self._entries.get((namespace, key))
+                if score is not None:
+                    self._entries.move_to_end((namespace, key))
+                    found[key] = score
+            stats = self._stats.setdefault(namespace, {'hits': 0, 'misses': 0, 'duplicates': 0})
+            stats['hits'] += len(found)
+            stats['duplicates'] += duplicates
+            stats['misses'] += len(keys) - len(found)
+        return found
+
+    def put_many(self, namespace, items):
+        with self._lock:
+            for key, score in items:
+                self._entries[(namespace, key)] = score
+                self._entries.move_to_end((namespace, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def hit_rates(self):
+        with self._lock:
+            namespaces = {
+                namespace: {
+                    **stats,
+                    'hit_rate': stats['hits'] / (stats['hits'] + stats['misses'])
+                    if stats['hits'] + stats['misses'] else 0.0,
+                }
+                for namespace, stats in self._stats.items()
+            }
+            return {'entries': len(self._entries), 'max_entries': self.max_entries, 'namespaces': namespaces}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            items = pickle.load(f)
+        with self._lock:
+            self._entries = OrderedDict(items[-self.max_entries:])
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            items = list(self._entries.items())
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(items, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+
+
+class ResponseCache:
+    """
+    Thread-safe cache of LLM responses with a time-to-live and two size
+    bounds: number of entries and total serialized bytes. Least recently used
+    entries are evicted first; expired ones are dropped when touched or when
+    room is needed.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=16 * 2 ** 20, ttl=24 * 3600):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model_name, prompt, comments=()):
+        """
+        Hash of the model name, the prompt template and the comment set. The
+        comment set is order-insensitive, so a re-fetch that returns the same
+        comments in a different order still hits.
+        """
+        digest = hashlib.sha256()
+        for part in (model_name, prompt):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        for key in sorted(text_key(comment) for comment in comments):
+            digest.update(key)
+        return digest.hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                self._remove(key)
+                self._stats['expirations'] += 1
+                entry = None
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry[2]
+
+    def put(self, key, value):
+        size = len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, size, value)
+            self._bytes += size
+            self._evict()
+
+    def get_or_create(self, key, create):
+        value = self.get(key)
+        if value is None:
+            value = create()
+            self.put(key, value)
+        return value
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, 'entries': len(self._entries), 'bytes': self._bytes}
+
+    def _evict(self):
+        now = time.monotonic()
+        for key in [key for key, (expires_at, _, _) in self._entries.items() if expires_at <= now]:
+            self._remove(key)
+            self._stats['expirations'] += 1
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self._stats['evictions'] += 1
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+def score_unique(texts, scorer, cache=None, namespace=None):
+    """
+    Scores `texts` in order while running `scorer` only once per distinct
+    normalized text, and only for texts the cache does not already hold.
+
+    `scorer` takes a list of texts and returns a list of scores.
+    """
+    keys = [text_key(text) for text in texts]
+    unique = {}
+    for key, text in zip(keys, texts):
+        unique.setdefault(key, text)
+
+    scores = cache.get_many(namespace, list(unique), len(keys) - len(unique)) if cache is not None else {}
+    missing = [key for key in unique if key not in scores]
+    if missing:
+        computed = scorer([unique[key] for key in missing])
+        new_scores = list(zip(missing, computed))
+        scores.update(new_scores)
+        if cache is not None:
+            cache.put_many(namespace, new_scores)
+    return [scores[key] for key in keys]
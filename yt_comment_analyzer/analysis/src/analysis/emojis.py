@@ -5,8 +5,8 @@ class EmojiAnalyzer:
 
     @staticmethod
     def extract_emojis(text):
-       
-        return [char for char in text if char in emoji.EMOJI_DATA]
+        # Whole sequences, so ZWJ families and skin tones are not split into parts
+        return [token.value.emoji for token in emoji.analyze(text)]
 
     @staticmethod
     def count_emojis(texts):
@@ -17,6 +17,14 @@ class EmojiAnalyzer:
             emoji_counter.update(emojis)
         return emoji_counter
 
+    @staticmethod
+    def count_extracted(emoji_lists):
+        # For emoji already extracted by the preprocessing pass
+        emoji_counter = Counter()
+        for emojis in emoji_lists:
+            emoji_counter.update(emojis)
+        return emoji_counter
+
     @staticmethod
     def top_emojis(texts, top_n=5):
        
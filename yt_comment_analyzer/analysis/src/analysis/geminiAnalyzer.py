@@ -1,60 +1,196 @@
 import google.generativeai as genai
 from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
+import json
 import os
+from .cache import ResponseCache
+from .local_model import LocalGenerativeModel
 
-# Load API key from .env
-load_dotenv()
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+_configured = False
 
-# Configure Google Generative AI
-genai.configure(api_key=GEMINI_API_KEY)
+# Prompt tokens allowed per request before switching to chunked map-reduce
+DEFAULT_TOKEN_BUDGET = 100_000
+# Rough English/emoji average for Gemini's tokenizer
+CHARS_PER_TOKEN = 4
+
+REPORT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "array", "items": {"type": "string"}},
+        "public_demands": {"type": "array", "items": {"type": "string"}},
+        "suggestions": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["summary", "public_demands", "suggestions"],
+}
+
+REPORT_INSTRUCTIONS = """
+        Return a JSON object with three lists of short strings:
+        - "summary": a concise pointwise summary in 5 points.
+        - "public_demands": 1 to 5 key public demands, based on recurring themes and requests.
+        - "suggestions": only 5 constructive suggestions for the YouTuber to improve their content.
+"""
+
+
+def estimate_tokens(text):
+    """Cheap, offline estimate of how many tokens `text` costs in a prompt."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def configure():
+    """Configures Google Generative AI on first use rather than at import."""
+    global _configured
+    if not _configured:
+        # Load API key from .env
+        load_dotenv()
+        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+        _configured = True
+
+
+def create_model(model_name="gemini-2.0-flash", backend="gemini"):
+    """`backend='local'` returns the offline stand-in used for load tests."""
+    if backend == "local":
+        return LocalGenerativeModel(model_name=f"local/{model_name}")
+    configure()
+    return genai.GenerativeModel(model_name)
+
+
+def format_comments(comments):
+    """One comment per line, so the prompt carries no Python list syntax."""
+    return "\n".join("- " + " ".join(comment.split()) for comment in comments if comment.strip())
 
 
 class YouTubeCommentAnalyzerWithAI:
-    def __init__(self, comments):
+    def __init__(self, comments, model_name="gemini-2.0-flash", token_budget=DEFAULT_TOKEN_BUDGET,
+                 max_concurrency=4, model=None, cache=None):
         """
-        Initializes the analyzer with a list of comments.
+        Initializes the analyzer with a list of comments. `model` can be any
+        object with genai's `generate_content`; `cache` is a ResponseCache.
         """
         self.comments = comments
-        self.model = genai.GenerativeModel("gemini-2.0-flash")
+        self.model = model or create_model(model_name)
+        self.model_name = getattr(self.model, "model_name", model_name)
+        self.token_budget = token_budget
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        self._report = None
 
-    def get_summary(self):
+    def analyze(self):
         """
-        Generates a pointwise summary of the given comments in 10 lines.
+        Produces the summary, public demands and suggestions in a single
+        structured-output request. Comment sets over the token budget are
+        summarized chunk by chunk, concurrently, and the partial reports merged.
         """
-        prompt = f"""
-        You are an AI assistant analyzing YouTube comments. Given the following comments:
-        {self.comments}
-        
-        Provide a concise **pointwise summary** in 5 lines.
+        if self._report is None:
+            if self.cache is None:
+                self._report = self._build_report()
+            else:
+                key = ResponseCache.make_key(
+                    self.model_name, f"{REPORT_INSTRUCTIONS}budget={self.token_budget}", self.comments
+                )
+                self._report = self.cache.get_or_create(key, self._build_report)
+        return self._report
+
+    def _build_report(self):
+        lines = format_comments(self.comments).splitlines()
+        if estimate_tokens("\n".join(lines)) <= self.token_budget:
+            report = self._report_for(lines)
+        else:
+            report = self._reduce(self._map(lines))
+        return {
+            'summary': self._as_points(report.get('summary', [])),
+            'public_demands': self._as_numbered(report.get('public_demands', [])),
+            'suggestions': self._as_numbered(report.get('suggestions', [])),
+        }
+
+    def get_summary(self):
+        """
+        Generates a pointwise summary of the given comments in 5 lines.
         """
-        response = self.model.generate_content(prompt)
-        return response.text.strip()
+        return self.analyze()['summary']
 
     def get_public_demand(self):
         """
         Analyzes comments to extract public demands (1 to 5 points).
         """
-        prompt = f"""
-        Analyze the following YouTube comments:
-        {self.comments}
-        
-        Identify **public demands** based on recurring themes and requests. 
-        Provide **1 to 5 key demands** in a numbered list.
-        """
-        response = self.model.generate_content(prompt)
-        return response.text.strip()
+        return self.analyze()['public_demands']
 
     def get_suggestions(self):
         """
         Provides constructive suggestions for the YouTuber based on comments.
         """
+        return self.analyze()['suggestions']
+
+    def _report_for(self, lines):
+        comments = "\n".join(lines)
+        prompt = f"""
+        You are an AI assistant analyzing YouTube comments. Given the following {len(lines)} comments:
+        {comments}
+        {REPORT_INSTRUCTIONS}
+        """
+        return self._generate(prompt)
+
+    def _map(self, lines):
+        chunks = self._chunk(lines)
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            return list(pool.map(self._report_for, chunks))
+
+    def _reduce(self, partials):
+        notes = [json.dumps(partial, ensure_ascii=False) for partial in partials]
+        if len(partials) > 1 and estimate_tokens("\n".join(notes)) > self.token_budget:
+            chunks = self._chunk(notes)
+            if len(chunks) == len(notes):
+                # Each note takes over half the budget: merge them in pairs,
+                # over budget, so every round still halves the count
+                chunks = [notes[i:i + 2] for i in range(0, len(notes), 2)]
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+                return self._reduce(list(pool.map(self._merge, chunks)))
+        return self._merge(notes)
+
+    def _merge(self, notes):
+        reports = "\n".join(notes)
         prompt = f"""
-        Based on the following YouTube comments:
-        {self.comments}
-        
-        Generate ** Only 5  constructive suggestions** for the YouTuber to improve their content.
+        You are an AI assistant analyzing YouTube comments. The comments were too many
+        for one request, so each of the following JSON reports covers one part of them:
+        {reports}
+
+        Merge them into a single report for the whole comment section, keeping the
+        points that recur most across parts.
+        {REPORT_INSTRUCTIONS}
         """
-        response = self.model.generate_content(prompt)
-        return response.text.strip()
+        return self._generate(prompt)
+
+    def _chunk(self, lines):
+        """Greedily packs lines into chunks that each fit the token budget."""
+        chunks, current, current_tokens = [], [], 0
+        for line in lines:
+            tokens = estimate_tokens(line)
+            if current and current_tokens + tokens > self.token_budget:
+                chunks.append(current)
+                current, current_tokens = [], 0
+            current.append(line)
+            current_tokens += tokens
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _generate(self, prompt):
+        response = self.model.generate_content(
+            prompt,
+            generation_config=genai.GenerationConfig(
+                response_mime_type="application/json",
+                response_schema=REPORT_SCHEMA,
+            ),
+        )
+        try:
+            return json.loads(response.text)
+        except ValueError:
+            # Keep whatever the model said rather than failing the whole report
+            return {'summary': [response.text.strip()], 'public_demands': [], 'suggestions': []}
+
+    @staticmethod
+    def _as_points(items):
+        return "\n".join(f"- {item.strip()}" for item in items)
 
+    @staticmethod
+    def _as_numbered(items):
+        return "\n".join(f"{i}. {item.strip()}" for i, item in enumerate(items, start=1))
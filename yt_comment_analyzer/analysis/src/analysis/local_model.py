@@ -0,0 +1,73 @@
+"""
+Offline stand-in for `genai.GenerativeModel`, for load tests and benchmarks.
+
+It answers `generate_content` with a deterministic, schema-shaped JSON report
+built from the most frequent words of the prompt, after sleeping for a
+latency modelled on a hosted LLM: a fixed round trip, a prefill cost per
+input token and a decode cost per output token, with some jitter.
+"""
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+
+WORD_PATTERN = re.compile(r"[a-zA-Z']{4,}")
+STOPWORDS = {
+    "this", "that", "with", "have", "from", "your", "they", "them", "what", "were",
+    "just", "like", "more", "about", "would", "there", "their", "been", "into",
+    "comments", "youtube", "following", "return", "summary", "suggestions",
+    "public", "demands", "object", "lists", "short", "strings", "points",
+}
+
+
+class LocalResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class LocalGenerativeModel:
+    def __init__(self, model_name="local-stand-in", round_trip=0.35, prefill_per_1k_tokens=0.02,
+                 decode_tokens_per_sec=150, jitter=0.15, chars_per_token=4, seed=None):
+        self.model_name = model_name
+        self.round_trip = round_trip
+        self.prefill_per_1k_tokens = prefill_per_1k_tokens
+        self.decode_tokens_per_sec = decode_tokens_per_sec
+        self.jitter = jitter
+        self.chars_per_token = chars_per_token
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def generate_content(self, contents, generation_config=None, **kwargs):
+        prompt = contents if isinstance(contents, str) else str(contents)
+        text = json.dumps(self._report(prompt))
+        time.sleep(self.simulated_latency(prompt, text))
+        with self._lock:
+            self.calls += 1
+        return LocalResponse(text)
+
+    def simulated_latency(self, prompt, output):
+        input_tokens = len(prompt) / self.chars_per_token
+        output_tokens = len(output) / self.chars_per_token
+        latency = (
+            self.round_trip
+            + input_tokens / 1000 * self.prefill_per_1k_tokens
+            + output_tokens / self.decode_tokens_per_sec
+        )
+        with self._lock:
+            factor = 1 + self._random.uniform(-self.jitter, self.jitter)
+        return latency * factor
+
+    @staticmethod
+    def _report(prompt):
+        words = Counter(
+            word for word in (w.lower() for w in WORD_PATTERN.findall(prompt)) if word not in STOPWORDS
+        )
+        themes = [word for word, _ in words.most_common(5)] or ["the video"]
+        return {
+            'summary': [f"Viewers frequently mention '{theme}'." for theme in themes],
+            'public_demands': [f"More content about '{theme}'." for theme in themes[:3]],
+            'suggestions': [f"Address the '{theme}' feedback in the next video." for theme in themes],
+        }
@@ -0,0 +1,63 @@
+"""
+Sample sizes and confidence intervals for approximate ("fast mode") analysis.
+
+A sentiment breakdown is a set of proportions, so the sample is sized for
+the worst case p = 0.5: n0 = z² / (4 e²) comments estimate every proportion
+to within ±e at the given confidence, fewer once the finite population
+correction for a section of N comments is applied. The cost of scoring then
+depends on `e`, not on N.
+"""
+import math
+from statistics import NormalDist
+
+
+def z_score(confidence):
+    """Two-sided standard normal quantile, e.g. 1.96 for 0.95."""
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def fpc(sample, population):
+    """Finite population correction of the variance, (N - n) / (N - 1)."""
+    if not population or population <= 1:
+        return 1.0
+    return max(population - sample, 0) / (population - 1)
+
+
+def sample_size(error_bound, confidence=0.95, population=None):
+    """Comments needed to estimate any proportion to within ±`error_bound`."""
+    n0 = z_score(confidence) ** 2 * 0.25 / error_bound ** 2
+    if population:
+        n0 = n0 / (1 + (n0 - 1) / population)
+        return min(math.ceil(n0), population)
+    return math.ceil(n0)
+
+
+def margin(sample, confidence=0.95, population=None):
+    """Worst-case (p = 0.5) half-width a sample of this size achieves."""
+    if not sample:
+        return 1.0
+    return z_score(confidence) * math.sqrt(0.25 / sample * fpc(sample, population))
+
+
+def wilson_interval(successes, sample, confidence=0.95, population=None):
+    """
+    Wilson score interval for a proportion, with the finite population
+    correction folded into z. Unlike the normal approximation it stays inside
+    [0, 1] and is sensible for proportions near 0 or 1.
+    """
+    if not sample:
+        return 0.0, 1.0
+    z = z_score(confidence) * math.sqrt(fpc(sample, population))
+    p = successes / sample
+    denominator = 1 + z * z / sample
+    center = (p + z * z / (2 * sample)) / denominator
+    half = z * math.sqrt(p * (1 - p) / sample + z * z / (4 * sample * sample)) / denominator
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def mean_interval(mean, std, sample, confidence=0.95, population=None):
+    """Normal-approximation interval for a mean score."""
+    if not sample:
+        return mean, mean
+    half = z_score(confidence) * std / math.sqrt(sample) * math.sqrt(fpc(sample, population))
+    return mean - half, mean + half
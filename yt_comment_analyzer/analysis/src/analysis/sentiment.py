@@ -1,10 +1,29 @@
+import numpy as np
 from nltk.sentiment import SentimentIntensityAnalyzer
 from textblob import TextBlob
-import statistics
+from .aggregates import ExactSum, ScoreHistogram, TopK
+from .cache import score_unique
+from .sentiment_pool import SentimentProcessPool
+from .textblob_batch import TextBlobBatchScorer
+from .vader_batch import VaderBatchScorer
+
+# Upper edges of the right-closed score bins; exact zeros are counted as neutral
+BUCKET_EDGES = np.array([-0.6, -0.3, 0.0, 0.3, 0.6])
+BUCKETS = ['snegative', 'negative', 'wnegative', 'wpositive', 'positive', 'spositive', 'neutral']
+QUANTILES = (0.1, 0.25, 0.75, 0.9)
+# Most positive / most negative comment indices reported
+TOP_K = 5
 
 class SentimentAnalyzer:
-    def __init__(self):
+    def __init__(self, cache=None, workers=1, vader_engine='batch', textblob_engine='batch'):
         self.sid = SentimentIntensityAnalyzer()
+        self.cache = cache
+        # 'batch' scores whole lists with NumPy; 'nltk' calls polarity_scores per comment
+        self.vader_batch = VaderBatchScorer(self.sid.lexicon) if vader_engine == 'batch' else None
+        # 'batch' reads pattern's lexicon once and skips TextBlob objects; 'textblob' builds one per comment
+        self.textblob_batch = TextBlobBatchScorer() if textblob_engine == 'batch' else None
+        # More than one worker shards large comment lists across processes
+        self.pool = SentimentProcessPool(workers) if workers > 1 else None
         self.categories = [
             'positive', 'wpositive', 'spositive',
             'neutral',
@@ -17,43 +36,205 @@ class SentimentAnalyzer:
     def analyze_textblob(self, comments):
         return self._analyze(comments, 'textblob')
     
+    def accumulator(self, bounded=False):
+        return SentimentAccumulator(self, bounded)
+    
+    def score_vader(self, comments):
+        return self._scores(comments, 'vader')
+    
+    def score_textblob(self, comments):
+        return self._scores(comments, 'textblob')
+    
     def _analyze(self, comments, engine):
-        results = {category: 0 for category in self.categories}
-        scores = []
-        
-        for comment in comments:
-            if engine == 'vader':
-                score = self.sid.polarity_scores(comment)['compound']
-            else:
-                score = TextBlob(comment).sentiment.polarity
-            
-            scores.append(score)
-            self._categorize(results, score)
-        
-        return self._format_results(results, scores, len(comments))
-    
-    def _categorize(self, results, score):
-        if score == 0:
-            results['neutral'] += 1
-        elif 0 < score <= 0.3:
-            results['wpositive'] += 1
-        elif 0.3 < score <= 0.6:
-            results['positive'] += 1
-        elif 0.6 < score <= 1:
-            results['spositive'] += 1
-        elif -0.3 < score <= 0:
-            results['wnegative'] += 1
-        elif -0.6 < score <= -0.3:
-            results['negative'] += 1
-        elif -1 <= score <= -0.6:
-            results['snegative'] += 1
-    
-    def _format_results(self, results, scores, total):
+        accumulator = self.accumulator()
+        accumulator.update(self._scores(comments, engine))
+        return accumulator.result()
+    
+    def _scores(self, comments, engine):
+        scorer = self._score_vader if engine == 'vader' else self._score_textblob
+        return score_unique(comments, scorer, self.cache, engine)
+    
+    def _score_vader(self, comments):
+        if self.pool and self.pool.should_use(comments):
+            return self.pool.score('vader_batch' if self.vader_batch else 'vader', comments)
+        if self.vader_batch is not None:
+            return self.vader_batch.score(comments)
+        return [self.sid.polarity_scores(comment)['compound'] for comment in comments]
+    
+    def _score_textblob(self, comments):
+        if self.pool and self.pool.should_use(comments):
+            return self.pool.score('textblob_batch' if self.textblob_batch else 'textblob', comments)
+        if self.textblob_batch is not None:
+            return self.textblob_batch.score(comments)
+        return [TextBlob(comment).sentiment.polarity for comment in comments]
+    
+    @staticmethod
+    def _bucket_counts(scores):
+        """Category counts in BUCKETS order, as one histogram over the score array."""
+        # searchsorted(side='left') gives the right-closed bins of the original if/elif chain
+        in_range = scores[(scores >= -1) & (scores <= 1)]
+        buckets = np.searchsorted(BUCKET_EDGES, in_range, side='left')
+        buckets[in_range == 0] = len(BUCKETS) - 1
+        return np.bincount(buckets, minlength=len(BUCKETS))
+    
+    @staticmethod
+    def _score_stats(scores, top_k=TOP_K):
+        if not len(scores):
+            return {
+                'median': 0.0, 'std': 0.0,
+                'quantiles': {f'p{round(q * 100)}': 0.0 for q in QUANTILES},
+                'most_positive': [], 'most_negative': [],
+            }
+        quantiles = np.quantile(scores, (0.5,) + QUANTILES)
+        # Ties keep the earlier comment first
+        order = np.lexsort((np.arange(len(scores)), -scores))
+        reverse = np.lexsort((np.arange(len(scores)), scores))
+        return {
+            'median': float(quantiles[0]),
+            'std': float(scores.std()),
+            'quantiles': {f'p{round(q * 100)}': float(v) for q, v in zip(QUANTILES, quantiles[1:])},
+            'most_positive': order[:top_k].tolist(),
+            'most_negative': reverse[:top_k].tolist(),
+        }
+    
+    def _format_results(self, results, overall, total, stats=None):
         return {
-            'overall': statistics.mean(scores),
+            'overall': overall,
             'breakdown': {
-                category: round((count / total) * 100, 2)
+                category: round((count / total) * 100, 2) if total else 0.0
                 for category, count in results.items()
             },
-            'samples': len(scores)
-        }
\ No newline at end of file
+            'samples': total,
+            **(stats or {}),
+        }
+
+
+class SentimentAccumulator:
+    """
+    Running bucket counts, score sum and score array, so scores can be fed
+    page by page and still produce exactly what `SentimentAnalyzer._analyze`
+    returns for the whole list at once. Comment indices in the result count
+    across all updates.
+
+    With `bounded=True` no scores are kept: the median and quantiles come
+    from a fine histogram (within 0.00005 of the exact values), the standard
+    deviation from a running sum of squares and the extremes from top-k heaps,
+    so memory stays the same however many comments are fed. Counts, overall
+    mean and extremes are still exact.
+    """
+    
+    def __init__(self, analyzer, bounded=False):
+        self.analyzer = analyzer
+        self.counts = np.zeros(len(BUCKETS), dtype=np.int64)
+        self.chunks = None if bounded else []
+        self.total = ExactSum()
+        self.count = 0
+        if bounded:
+            self.histogram = ScoreHistogram()
+            self.sum_squares = 0.0
+            # (score, -index) pairs, so ties keep the earlier comment
+            self.most_positive = TopK(TOP_K)
+            self.most_negative = TopK(TOP_K)
+    
+    @property
+    def results(self):
+        counts = dict(zip(BUCKETS, self.counts.tolist()))
+        return {category: counts[category] for category in self.analyzer.categories}
+    
+    def update(self, scores):
+        scores = np.asarray(scores, dtype=np.float64)
+        self.counts += self.analyzer._bucket_counts(scores)
+        self.total.add(scores.tolist())
+        if self.chunks is not None:
+            self.chunks.append(scores)
+        elif len(scores):
+            self._update_bounded(scores)
+        self.count += len(scores)
+    
+    def merge(self, other):
+        """
+        Adds another accumulator's scores after this one's, exactly as if they
+        had been fed to it: counts and sums add up, and `other`'s comment
+        indices continue after this accumulator's.
+        """
+        if (self.chunks is None) != (other.chunks is None):
+            raise ValueError("cannot merge bounded and unbounded accumulators")
+        self.counts += other.counts
+        self.total.merge(other.total)
+        if self.chunks is not None:
+            self.chunks.extend(other.chunks)
+        else:
+            self.histogram.counts += other.histogram.counts
+            self.sum_squares += other.sum_squares
+            # Keys hold -index, so shifting indices by `count` subtracts it
+            for score, key in other.most_positive.heap:
+                self.most_positive.push((score, key - self.count))
+            for score, key in other.most_negative.heap:
+                self.most_negative.push((score, key - self.count))
+        self.count += other.count
+    
+    def truncate(self, count):
+        """
+        Drops every score after the first `count`, as if they had never been
+        fed: their buckets and (exact) sum are subtracted. Unbounded
+        accumulators only.
+        """
+        scores = self.scores()
+        removed = scores[count:]
+        self.counts -= self.analyzer._bucket_counts(removed)
+        self.total.add((-removed).tolist())
+        self.chunks = [scores[:count]]
+        self.count = len(self.chunks[0])
+    
+    def state(self):
+        """(JSON-serializable aggregates, score array) for `from_state`; unbounded accumulators only."""
+        return {
+            'counts': self.counts.tolist(),
+            'total': str(self.total.value),
+            'count': self.count,
+        }, self.scores()
+    
+    @classmethod
+    def from_state(cls, analyzer, aggregates, scores):
+        accumulator = cls(analyzer)
+        accumulator.counts = np.array(aggregates['counts'], dtype=np.int64)
+        accumulator.total = ExactSum(int(aggregates['total']))
+        accumulator.count = aggregates['count']
+        accumulator.chunks = [np.asarray(scores, dtype=np.float64)]
+        return accumulator
+    
+    def scores(self):
+        if self.chunks is None:
+            raise ValueError("a bounded accumulator does not keep scores")
+        return np.concatenate(self.chunks) if self.chunks else np.zeros(0)
+    
+    def result(self):
+        return self.analyzer._format_results(
+            self.results,
+            self.total.mean(self.count),
+            self.count,
+            self.analyzer._score_stats(self.scores()) if self.chunks is not None else self._bounded_stats(),
+        )
+    
+    def _update_bounded(self, scores):
+        self.histogram.add(scores)
+        self.sum_squares += float(np.dot(scores, scores))
+        # Only a page's own extremes can enter the running top-k
+        indices = np.arange(self.count, self.count + len(scores))
+        for i in np.lexsort((indices, -scores))[:TOP_K]:
+            self.most_positive.push((scores[i], -indices[i]))
+        for i in np.lexsort((indices, scores))[:TOP_K]:
+            self.most_negative.push((-scores[i], -indices[i]))
+    
+    def _bounded_stats(self):
+        if not self.count:
+            return self.analyzer._score_stats(np.zeros(0))
+        quantiles = self.histogram.quantiles((0.5,) + QUANTILES)
+        mean = self.total.mean(self.count)
+        return {
+            'median': quantiles[0],
+            'std': max(self.sum_squares / self.count - mean * mean, 0.0) ** 0.5,
+            'quantiles': {f'p{round(q * 100)}': v for q, v in zip(QUANTILES, quantiles[1:])},
+            'most_positive': [int(-index) for _, index in self.most_positive.largest()],
+            'most_negative': [int(-index) for _, index in self.most_negative.largest()],
+        }
@@ -0,0 +1,85 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Per-worker analyzers, built once by the pool initializer
+_sid = None
+_vader_batch = None
+_textblob = None
+_textblob_batch = None
+
+
+def _init_worker():
+    global _sid, _vader_batch, _textblob, _textblob_batch
+    from nltk.sentiment import SentimentIntensityAnalyzer
+    from textblob import TextBlob
+    from .textblob_batch import TextBlobBatchScorer
+    from .vader_batch import VaderBatchScorer
+
+    _sid = SentimentIntensityAnalyzer()
+    _vader_batch = VaderBatchScorer(_sid.lexicon)
+    _textblob = TextBlob
+    _textblob_batch = TextBlobBatchScorer()
+    # Force the lazily loaded pattern lexicon in now rather than on the first shard
+    _textblob("warm up").sentiment
+
+
+def _score_shard(engine, comments):
+    if engine == 'vader_batch':
+        return _vader_batch.score(comments)
+    if engine == 'vader':
+        return [_sid.polarity_scores(comment)['compound'] for comment in comments]
+    if engine == 'textblob_batch':
+        return _textblob_batch.score(comments)
+    return [_textblob(comment).sentiment.polarity for comment in comments]
+
+
+class SentimentProcessPool:
+    """
+    Persistent pool of worker processes that score comment shards with VADER
+    or TextBlob, sidestepping the GIL for these pure-Python loops.
+
+    Workers are spawned (not forked, which is unsafe in a threaded server) on
+    first use and load their lexicons once. Lists shorter than
+    `min_parallel` are cheaper to score in-process and are left to the caller.
+    """
+
+    def __init__(self, workers=None, min_parallel=200):
+        self.workers = workers or os.cpu_count() or 1
+        self.min_parallel = min_parallel
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def should_use(self, comments):
+        return self.workers > 1 and len(comments) >= self.min_parallel
+
+    def score(self, engine, comments):
+        """Scores `comments` across the pool; results keep input order."""
+        comments = list(comments)
+        shard_size = -(-len(comments) // self.workers)
+        shards = [comments[i:i + shard_size] for i in range(0, len(comments), shard_size)]
+        scores = []
+        for shard_scores in self._pool().map(_score_shard, [engine] * len(shards), shards):
+            scores.extend(shard_scores)
+        return scores
+
+    def start(self):
+        """Spawns the workers and waits until each one has loaded its lexicons."""
+        list(self._pool().map(_score_shard, ['vader_batch'] * self.workers, [["warm up"]] * self.workers))
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                )
+            return self._executor
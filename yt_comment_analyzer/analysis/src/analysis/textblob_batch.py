@@ -0,0 +1,208 @@
+"""
+TextBlob polarity without TextBlob objects.
+
+`TextBlobBatchScorer.score(comments)` returns the same values as
+`TextBlob(c).sentiment.polarity` for each comment. It reads pattern's
+`en-sentiment.xml` once into a flat `{word: (polarity, intensity,
+is_modifier)}` table and runs pattern's tokenizer and assessment rules
+directly on each comment, skipping the blob, its word lists and the nested
+per-part-of-speech dictionaries of `textblob.en.sentiment`.
+"""
+import os
+import re
+from xml.etree import ElementTree
+
+import textblob.en
+from textblob._text import (
+    ABBREVIATIONS, EMOTICONS, EOS, PUNCTUATION, RE_ABBR1, RE_ABBR2, RE_ABBR3,
+    RE_EMOTICONS, RE_SARCASM, replacements,
+)
+
+LEXICON_PATH = os.path.join(os.path.dirname(textblob.en.__file__), "en-sentiment.xml")
+
+NEGATIONS = frozenset(("no", "not", "n't", "never"))
+# pattern splits these off words; the period is handled separately
+_LEADING = tuple(PUNCTUATION.replace(".", ""))
+_TRAILING = _LEADING + (".",)
+_BOUNDARY = frozenset(PUNCTUATION)
+_REPLACEMENTS = re.compile("|".join(re.escape(r) for r in replacements))
+_QUOTES = str.maketrans({q: f" {q} " for q in "“”‘’'\""})
+_LINEBREAKS = re.compile(r"\n{2,}")
+_WHITESPACE = re.compile(r"\s+")
+_TERMINATORS = ("...", ".", "!", "?", EOS)
+_CLOSERS = ("'", '"', "”", "’", "...", ".", "!", "?", ")", EOS)
+
+
+def load_lexicon(path=LEXICON_PATH):
+    """
+    Reads pattern's sentiment XML the way `textblob.en.Sentiment.load` does
+    (averaging repeated entries, deriving "-ly" adverbs from adjectives) and
+    keeps only what polarity needs: {word: (polarity, intensity, is_modifier)}.
+    """
+    words = {}
+    for w in ElementTree.parse(path).getroot().findall("word"):
+        form = w.attrib.get("form")
+        if form:
+            psi = (
+                float(w.attrib.get("polarity", 0.0)),
+                float(w.attrib.get("subjectivity", 0.0)),
+                float(w.attrib.get("intensity", 1.0)),
+            )
+            words.setdefault(form, {}).setdefault(w.attrib.get("pos"), []).append(psi)
+    for form, by_pos in words.items():
+        averaged = {pos: [_avg(each) for each in zip(*psi)] for pos, psi in by_pos.items()}
+        averaged[None] = [_avg(each) for each in zip(*averaged.values())]
+        words[form] = averaged
+    for form, by_pos in list(words.items()):
+        if "JJ" in by_pos:
+            if form.endswith("y"):
+                form = form[:-1] + "i"
+            if form.endswith("le"):
+                form = form[:-2]
+            entry = words.setdefault(form + "ly", {})
+            entry["RB"] = entry[None] = tuple(by_pos["JJ"])
+    return {
+        form: (by_pos[None][0], by_pos[None][2], "RB" in by_pos)
+        for form, by_pos in words.items()
+    }
+
+
+def _avg(values):
+    return sum(values) / float(len(values) or 1)
+
+
+class TextBlobBatchScorer:
+    def __init__(self, lexicon=None):
+        self.lexicon = lexicon if lexicon is not None else load_lexicon()
+        # First matching mood wins, as in pattern's EMOTICONS loop
+        self.emoticons = {}
+        for (_, polarity), forms in EMOTICONS.items():
+            for form in forms:
+                self.emoticons.setdefault(form.lower(), polarity)
+
+    def score(self, comments):
+        """Returns one polarity per comment, in order."""
+        return [self.polarity(comment) for comment in comments]
+
+    def polarity(self, text):
+        return self._average(self._assessments(tokenize(str(text)).lower().split()))
+
+    def _assessments(self, words):
+        """pattern's `Sentiment.assessments`, tracking only [polarity, intensity, negated]."""
+        lexicon = self.lexicon
+        a = []
+        m = None  # preceding modifier word
+        n = None  # preceding negation
+        for w in words:
+            entry = lexicon.get(w)
+            if entry is not None:
+                p, i, is_modifier = entry
+                if m is None:
+                    a.append([p, i, False])
+                else:
+                    last = a[-1]
+                    last[0] = max(-1.0, min(p * last[1], +1.0))
+                    last[1] = i
+                if n is not None:
+                    last = a[-1]
+                    last[1] = 1.0 / last[1]
+                    last[2] = True
+                m = w if is_modifier else None
+                n = w if w in NEGATIONS else None
+                continue
+            if w in NEGATIONS:
+                n = w
+            elif n and len(w.strip("'")) > 1:
+                n = None
+            if n is not None and m is not None and m.endswith("ly"):
+                a[-1][2] = True
+                n = None
+            elif m and len(w) > 2:
+                m = None
+            if w == "!" and a:
+                a[-1][0] = max(-1.0, min(a[-1][0] * 1.25, +1.0))
+            if w == "(!)":
+                a.append([0.0, 1.0, False])
+            if not w.isalpha() and len(w) <= 5 and w not in PUNCTUATION:
+                polarity = self.emoticons.get(w)
+                if polarity is not None:
+                    a.append([polarity, 1.0, False])
+        return a
+
+    @staticmethod
+    def _average(assessments):
+        total = 0
+        for p, _, negated in assessments:
+            # "not good" = slightly bad, "not bad" = slightly good
+            total += p * -0.5 if negated else p
+        return total / float(len(assessments) or 1)
+
+
+def tokenize(text):
+    """
+    pattern's `find_tokens`, returned as one space-separated string rather
+    than a list of sentences.
+    """
+    text = _REPLACEMENTS.sub(lambda match: " " + match.group(0), text)
+    text = text.translate(_QUOTES).replace("\r\n", "\n")
+    text = _LINEBREAKS.sub(f" {EOS} ", text)
+    tokens = []
+    for t in _WHITESPACE.sub(" ", text).split():
+        if t[0] not in _BOUNDARY and t[-1] not in _BOUNDARY:
+            tokens.append(t)
+        else:
+            _split_punctuation(t, tokens)
+    joined = " ".join(tokens)
+    if EOS not in joined and not RE_SARCASM.search(joined) and not RE_EMOTICONS.search(joined):
+        return joined
+    # Rare: the regexes pattern applies per sentence may need sentence boundaries
+    sentences = _sentences(tokens)
+    sentences = (RE_SARCASM.sub("(!)", s) for s in sentences)
+    return " ".join(
+        RE_EMOTICONS.sub(lambda match: match.group(1).replace(" ", "") + match.group(2), s)
+        for s in sentences
+    )
+
+
+def _split_punctuation(t, tokens):
+    tail = []
+    while t.startswith(_LEADING) and t not in replacements:
+        tokens.append(t[0])
+        t = t[1:]
+    while t.endswith(_TRAILING) and t not in replacements:
+        if t.endswith(_LEADING):
+            tail.append(t[-1])
+            t = t[:-1]
+        if t.endswith("..."):
+            tail.append("...")
+            t = t[:-3].rstrip(".")
+        if t.endswith("."):
+            if (
+                t in ABBREVIATIONS
+                or RE_ABBR1.match(t) is not None
+                or RE_ABBR2.match(t) is not None
+                or RE_ABBR3.match(t) is not None
+            ):
+                break
+            tail.append(t[-1])
+            t = t[:-1]
+    if t != "":
+        tokens.append(t)
+    tokens.extend(reversed(tail))
+
+
+def _sentences(tokens):
+    sentences, i, j = [[]], 0, 0
+    while j < len(tokens):
+        if tokens[j] in _TERMINATORS:
+            # Citations, trailing parentheses and repeated punctuation (!?) stay with the sentence
+            while j < len(tokens) and tokens[j] in _CLOSERS:
+                if tokens[j] in ("'", '"') and sentences[-1].count(tokens[j]) % 2 == 0:
+                    break
+                j += 1
+            sentences[-1].extend(t for t in tokens[i:j] if t != EOS)
+            sentences.append([])
+            i = j
+        j += 1
+    sentences[-1].extend(tokens[i:j])
+    return [" ".join(s) for s in sentences if len(s) > 0]
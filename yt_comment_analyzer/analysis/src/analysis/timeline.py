@@ -0,0 +1,115 @@
+"""
+Sentiment and toxicity over time.
+
+`TimelineAccumulator` buckets comments by publish hour or day and aggregates
+each page in one vectorized pass: `np.unique` maps timestamps to bucket
+numbers and `np.bincount` sums scores, flags and likes per bucket, so there
+is no Python loop over comments, only over the (few) buckets. Pages are
+folded into running per-bucket sums, so memory grows with the number of
+buckets, not comments. Like-weighted means count each comment 1 + its like
+count times, so comments many viewers agreed with weigh more while unliked
+ones still count once.
+"""
+import numpy as np
+
+BUCKET_SECONDS = {'hour': 3600, 'day': 86400}
+
+
+class TimelineAccumulator:
+    def __init__(self, bucket='day', like_weighted=False):
+        if bucket not in BUCKET_SECONDS:
+            raise ValueError(f"bucket must be one of: {', '.join(BUCKET_SECONDS)}")
+        self.bucket = bucket
+        self.width = BUCKET_SECONDS[bucket]
+        self.like_weighted = like_weighted
+        # Sorted bucket numbers, and per statistic one running sum per bucket
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.sums = {}
+        self.engines = []
+
+    def update(self, published, scores, toxic=None, likes=None):
+        """
+        `published` is a datetime64 array of publish times; `scores` maps engine
+        names to score arrays aligned with it, `toxic` is a boolean array and
+        `likes` holds like counts. Comments without a publish time are left out.
+        """
+        if self.like_weighted and likes is None:
+            raise ValueError("like-weighted sentiment needs like counts")
+
+        published = np.asarray(published, dtype='datetime64[s]')
+        known = ~np.isnat(published)
+        keys, index = np.unique(published[known].astype(np.int64) // self.width, return_inverse=True)
+
+        def per_bucket(values):
+            return np.bincount(index, weights=np.asarray(values, dtype=np.float64)[known], minlength=len(keys))
+
+        page = {'comments': np.bincount(index, minlength=len(keys)).astype(np.float64)}
+        if likes is not None:
+            likes = np.asarray(likes, dtype=np.float64)
+            page['likes'] = per_bucket(likes)
+            if self.like_weighted:
+                weights = likes + 1
+                page['weights'] = per_bucket(weights)
+        for name, values in scores.items():
+            values = np.asarray(values, dtype=np.float64)
+            page[f'{name}:sum'] = per_bucket(values)
+            page[f'{name}:negative'] = per_bucket(values < 0)
+            if self.like_weighted:
+                page[f'{name}:weighted'] = per_bucket(values * weights)
+            if name not in self.engines:
+                self.engines.append(name)
+        if toxic is not None:
+            page['toxic'] = per_bucket(toxic)
+        self._add(keys, page)
+
+    def rows(self):
+        """One dict per non-empty bucket, oldest first."""
+        if not len(self.keys):
+            return []
+        counts = self.sums['comments']
+        # Columns are built whole and turned into rows once at the end
+        columns = {
+            'start': [
+                f"{start}Z"
+                for start in np.datetime_as_string((self.keys * self.width).astype('datetime64[s]'), unit='s').tolist()
+            ],
+            'comments': counts.astype(np.int64).tolist(),
+        }
+        if 'likes' in self.sums:
+            columns['likes'] = self.sums['likes'].astype(np.int64).tolist()
+
+        for name in self.engines:
+            stats = {
+                'mean': self.sums[f'{name}:sum'] / counts,
+                'negative_share': self.sums[f'{name}:negative'] / counts,
+            }
+            if self.like_weighted:
+                stats['weighted_mean'] = self.sums[f'{name}:weighted'] / self.sums['weights']
+            names = list(stats)
+            columns[name] = [dict(zip(names, row)) for row in zip(*(np.round(stat, 4).tolist() for stat in stats.values()))]
+
+        if 'toxic' in self.sums:
+            toxic_counts = self.sums['toxic']
+            columns['toxic'] = toxic_counts.astype(np.int64).tolist()
+            columns['toxic_share'] = np.round(toxic_counts / counts, 4).tolist()
+        return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+    def _add(self, keys, page):
+        merged_keys = np.union1d(self.keys, keys)
+        old = np.searchsorted(merged_keys, self.keys)
+        new = np.searchsorted(merged_keys, keys)
+        for name in self.sums.keys() | page.keys():
+            sums = np.zeros(len(merged_keys))
+            if name in self.sums:
+                sums[old] = self.sums[name]
+            if name in page:
+                sums[new] += page[name]
+            self.sums[name] = sums
+        self.keys = merged_keys
+
+
+def sentiment_timeline(published, scores, toxic=None, likes=None, bucket='day', like_weighted=False):
+    """The timeline of one set of comments; see `TimelineAccumulator.update` for the arguments."""
+    timeline = TimelineAccumulator(bucket, like_weighted)
+    timeline.update(published, scores, toxic=toxic, likes=likes)
+    return timeline.rows()
@@ -0,0 +1,186 @@
+"""
+Inference backends for BertToxicityAnalyzer.
+
+  - `torch`: the fp32 PyTorch model, exactly as downloaded.
+  - `quantized`: the same model with its Linear layers dynamically
+    quantized to int8 (torch.ao.quantization).
+  - `onnx`: the model exported to ONNX (optionally int8-quantized) and run
+    with ONNX Runtime on CPU.
+
+Every backend takes the padded tokenizer output of one batch and returns
+the offensive-class probability of each row.
+
+Export a backend once, then point TOXICITY_BACKEND/TOXICITY_BACKEND_DIR at it:
+    python -m analysis.src.analysis.toxicity_backends --backend onnx --out models/toxicity-onnx
+"""
+import argparse
+import os
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+from transformers import AutoConfig, AutoModelForSequenceClassification, AutoTokenizer
+
+QUANTIZED_WEIGHTS = "quantized_state_dict.pt"
+ONNX_MODEL = "model.onnx"
+ONNX_QUANTIZED_MODEL = "model.int8.onnx"
+
+
+class TorchBackend:
+    name = "torch"
+    tensor_type = "pt"
+
+    def __init__(self, model_name, model_dir=None):
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_dir or model_name)
+        self.model.eval()
+
+    def predict(self, inputs):
+        with torch.inference_mode():
+            logits = self.model(**inputs).logits
+            return F.softmax(logits, dim=-1)[:, 1].tolist()
+
+
+class QuantizedTorchBackend(TorchBackend):
+    """Dynamic int8 quantization of every nn.Linear; activations stay fp32."""
+    name = "quantized"
+
+    def __init__(self, model_name, model_dir=None):
+        weights = os.path.join(model_dir, QUANTIZED_WEIGHTS) if model_dir else None
+        if weights and os.path.exists(weights):
+            # Rebuild the quantized module layout, then load the exported int8
+            # weights: a plain state_dict, so nothing else gets unpickled
+            config = AutoConfig.from_pretrained(model_dir)
+            model = self._quantize(AutoModelForSequenceClassification.from_config(config))
+            model.load_state_dict(torch.load(weights, weights_only=True))
+        else:
+            model = self._quantize(AutoModelForSequenceClassification.from_pretrained(model_name))
+        self.model = model
+        self.model.eval()
+
+    @staticmethod
+    def _quantize(model):
+        model.eval()
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    @classmethod
+    def export(cls, model_name, out_dir):
+        model = cls._quantize(AutoModelForSequenceClassification.from_pretrained(model_name))
+        model.config.save_pretrained(out_dir)
+        torch.save(model.state_dict(), os.path.join(out_dir, QUANTIZED_WEIGHTS))
+
+
+class OnnxBackend:
+    """Runs an exported ONNX graph with ONNX Runtime's CPU execution provider."""
+    name = "onnx"
+    tensor_type = "np"
+
+    def __init__(self, model_name, model_dir=None, quantized=True, threads=None):
+        import onnxruntime as ort
+
+        if not model_dir:
+            raise ValueError("The onnx backend needs TOXICITY_BACKEND_DIR; export it first")
+        path = os.path.join(model_dir, ONNX_QUANTIZED_MODEL if quantized else ONNX_MODEL)
+        if quantized and not os.path.exists(path):
+            path = os.path.join(model_dir, ONNX_MODEL)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def predict(self, inputs):
+        feed = {name: np.asarray(inputs[name], dtype=np.int64) for name in self.input_names}
+        logits = self.session.run(None, feed)[0]
+        logits = logits - logits.max(axis=-1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=-1, keepdims=True)
+        return probs[:, 1].tolist()
+
+    @classmethod
+    def export(cls, model_name, out_dir, quantize=True):
+        model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        model.eval()
+        model.config.return_dict = False
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        sample = tokenizer(["export sample", "a slightly longer export sample"], padding=True, return_tensors="pt")
+
+        path = os.path.join(out_dir, ONNX_MODEL)
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"]),
+            path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "logits": {0: "batch"},
+            },
+            opset_version=17,
+            dynamo=False,
+        )
+        if quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            quantize_dynamic(path, os.path.join(out_dir, ONNX_QUANTIZED_MODEL), weight_type=QuantType.QInt8)
+
+
+BACKENDS = {
+    TorchBackend.name: TorchBackend,
+    QuantizedTorchBackend.name: QuantizedTorchBackend,
+    OnnxBackend.name: OnnxBackend,
+}
+
+
+def load_backend(name, model_name, model_dir=None):
+    try:
+        backend_cls = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown toxicity backend '{name}', expected one of {sorted(BACKENDS)}")
+    return backend_cls(model_name, model_dir)
+
+
+def export_backend(name, model_name, out_dir):
+    """Writes everything `load_backend(name, model_name, out_dir)` needs, plus the tokenizer."""
+    backend_cls = BACKENDS[name]
+    if not hasattr(backend_cls, "export"):
+        raise ValueError(f"The '{name}' backend loads straight from the hub and has nothing to export")
+    os.makedirs(out_dir, exist_ok=True)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(out_dir)
+    backend_cls.export(model_name, out_dir)
+
+
+def check_parity(expected, actual, atol=0.05, threshold=0.5):
+    """
+    Compares the scores a candidate backend gave the same comments as a
+    reference one. `passed` requires every score within `atol`;
+    `label_agreement` is the share of comments that land on the same side of
+    `threshold`.
+    """
+    expected, actual = np.asarray(expected), np.asarray(actual)
+    diff = np.abs(expected - actual)
+    agreement = float(np.mean((expected > threshold) == (actual > threshold))) if len(expected) else 1.0
+    return {
+        'comments': len(expected),
+        'max_abs_diff': float(diff.max()) if len(expected) else 0.0,
+        'mean_abs_diff': float(diff.mean()) if len(expected) else 0.0,
+        'label_agreement': agreement,
+        'passed': bool((diff <= atol).all()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a toxicity backend for offline CPU inference.")
+    parser.add_argument("--backend", choices=["quantized", "onnx"], required=True)
+    parser.add_argument("--model", default="cardiffnlp/twitter-roberta-base-offensive")
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+
+    export_backend(args.backend, args.model, args.out)
+    print(f"✅ Exported {args.backend} backend of {args.model} to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Cheap first stage for cascade toxicity scoring.
+
+`ToxicityPrefilter` is a logistic model over hashed word unigrams and
+bigrams. Out of the box its weights come from a small lexicon of insults and
+profanity; `fit` refines them on comments labelled by the transformer (or by
+hand), and `save`/`load` keep the result. `suspicion(comments)` scores a whole
+list with NumPy, and the cascade in `BertToxicityAnalyzer.analyze` only sends
+comments at or above its threshold on to the transformer.
+"""
+import re
+import zlib
+
+import numpy as np
+
+# Seed weights: one occurrence is enough to escalate under the default threshold
+OFFENSIVE_TERMS = {
+    "idiot": 3.0, "idiots": 3.0, "stupid": 3.0, "dumb": 2.5, "moron": 3.0, "morons": 3.0,
+    "loser": 2.5, "losers": 2.5, "pathetic": 2.5, "disgusting": 2.5, "ugly": 2.0,
+    "trash": 2.0, "garbage": 2.0, "clown": 2.0, "fool": 2.0, "hate": 2.0, "sucks": 2.0,
+    "suck": 2.0, "worst": 1.5, "shut up": 3.0, "kill yourself": 4.0, "die": 2.0,
+    "fuck": 3.5, "fucking": 3.5, "fucked": 3.5, "shit": 3.0, "bullshit": 3.0, "bitch": 3.5,
+    "ass": 2.5, "asshole": 3.5, "damn": 1.5, "crap": 2.0, "wtf": 2.0, "stfu": 3.0,
+    "scam": 1.5, "fake": 1.0, "clickbait": 1.0,
+}
+BIAS = -2.0
+CAPS_FEATURE = "__shouting__"
+
+_WORD = re.compile(r"[a-z0-9']+")
+# Undo common obfuscations: "1d10t", "stuuupid", "$hit"
+_DELEET = str.maketrans({"0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "@": "a", "$": "s"})
+_REPEATS = re.compile(r"(.)\1{2,}")
+
+
+def _hash(feature, n_features):
+    # crc32 rather than hash(): stable across processes, so saved weights stay valid
+    return zlib.crc32(feature.encode("utf-8")) % n_features
+
+
+class ToxicityPrefilter:
+    def __init__(self, n_features=2**18, weights=None, bias=BIAS, lexicon=None):
+        self.n_features = n_features
+        self.bias = bias
+        if weights is None:
+            weights = np.zeros(n_features)
+            for term, weight in (OFFENSIVE_TERMS if lexicon is None else lexicon).items():
+                weights[_hash(term, n_features)] = weight
+            weights[_hash(CAPS_FEATURE, n_features)] = 0.5
+        self.weights = weights
+
+    def features(self, text):
+        """Hashed feature indices of one comment: words, word pairs and a shouting flag."""
+        letters = [c for c in text if c.isalpha()]
+        words = _WORD.findall(_REPEATS.sub(r"\1", text.lower().translate(_DELEET)))
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        if len(letters) >= 8 and sum(c.isupper() for c in letters) > 0.7 * len(letters):
+            features.append(CAPS_FEATURE)
+        return [_hash(feature, self.n_features) for feature in features]
+
+    def suspicion(self, comments):
+        """Probability-like suspicion score in [0, 1] for every comment, in order."""
+        return self._predict(*self._design(comments), len(comments))
+
+    def fit(self, comments, targets, epochs=5, learning_rate=0.5, l2=1e-4, batch_size=256, seed=0):
+        """
+        Refines the weights by logistic regression on `targets` in [0, 1], e.g.
+        the transformer's own scores on a sample, so the prefilter learns what
+        the full model escalates on.
+        """
+        comments = list(comments)
+        targets = np.asarray(targets, dtype=np.float64)
+        rng = np.random.default_rng(seed)
+        for _ in range(epochs):
+            order = rng.permutation(len(comments))
+            for offset in range(0, len(order), batch_size):
+                batch = order[offset:offset + batch_size]
+                indices, owners = self._design([comments[i] for i in batch])
+                error = self._predict(indices, owners, len(batch)) - targets[batch]
+                gradient = np.zeros(self.n_features)
+                np.add.at(gradient, indices, error[owners])
+                self.weights -= learning_rate * (gradient / len(batch) + l2 * self.weights)
+                self.bias -= learning_rate * float(error.mean())
+        return self
+
+    def save(self, path):
+        np.savez_compressed(path, weights=self.weights, bias=self.bias)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        weights = data["weights"]
+        return cls(n_features=len(weights), weights=weights, bias=float(data["bias"]))
+
+    def _predict(self, indices, owners, count):
+        logits = np.full(count, self.bias)
+        logits += np.bincount(owners, weights=self.weights[indices], minlength=count)
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def _design(self, comments):
+        """Flattened (feature index, comment index) pairs for a list of comments."""
+        rows = [self.features(comment) for comment in comments]
+        indices = np.fromiter((i for row in rows for i in row), dtype=np.int64)
+        owners = np.repeat(np.arange(len(rows)), [len(row) for row in rows])
+        return indices, owners
+
+
+def evaluate_cascade(suspicion, reference_scores, thresholds, toxic_above=0.5):
+    """
+    Precision/recall of escalation at each threshold, against the full
+    model's labels (`reference_scores > toxic_above`) on a labelled sample.
+
+    Recall is the share of truly toxic comments that reach the transformer,
+    which is also the cascade's recall: everything escalated gets the full
+    model's score. Precision is the share of escalated comments that are toxic.
+    """
+    suspicion = np.asarray(suspicion)
+    toxic = np.asarray(reference_scores) > toxic_above
+    report = []
+    for threshold in thresholds:
+        escalated = suspicion >= threshold
+        caught = int((escalated & toxic).sum())
+        report.append({
+            'threshold': threshold,
+            'escalation_rate': float(escalated.mean()) if len(escalated) else 0.0,
+            'precision': caught / int(escalated.sum()) if escalated.any() else 1.0,
+            'recall': caught / int(toxic.sum()) if toxic.any() else 1.0,
+        })
+    return report
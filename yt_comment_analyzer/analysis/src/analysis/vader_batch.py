@@ -0,0 +1,247 @@
+"""
+Batch VADER scoring with NumPy.
+
+`VaderBatchScorer.score(comments)` returns the same compound scores as
+calling NLTK's `SentimentIntensityAnalyzer.polarity_scores(c)['compound']`
+for each comment, but tokenizes the whole list in one pass, maps tokens to
+lexicon rows through a precomputed vocabulary index and applies VADER's
+caps, booster, negation, idiom, "least" and "but" rules as array operations
+over every token of every comment at once.
+
+The rules, including NLTK's quirks (a repeated word is always scored at its
+first occurrence; "never so"/idioms compare case-sensitively), are
+reproduced exactly. The only difference is the order in which token
+valences are summed, so compound scores agree with NLTK to within
+`TOLERANCE` before rounding to 4 decimals and are almost always identical
+after it.
+"""
+import re
+import string
+from itertools import repeat
+
+import numpy as np
+from nltk.sentiment.vader import SentimentIntensityAnalyzer, VaderConstants
+
+# Largest expected difference from NLTK's compound score
+TOLERANCE = 1e-4
+
+_C = VaderConstants
+_PUNCT_CHARS = string.punctuation
+_PUNCT_RE = re.compile(f"[{re.escape(string.punctuation)}]")
+_PUNC_LIST = set(_C.PUNC_LIST)
+_SO_THIS = ("so", "this")
+
+# Rows 0 and 1 of the vocabulary: unknown words, and unknown words containing "n't"
+_UNKNOWN, _NOT_CONTRACTION = 0, 1
+
+
+class VaderBatchScorer:
+    def __init__(self, lexicon=None):
+        if lexicon is None:
+            lexicon = SentimentIntensityAnalyzer().lexicon
+        self._build_vocabulary(lexicon)
+        self._build_idioms()
+
+    def score(self, comments):
+        """Returns one compound score per comment, in order."""
+        texts = [c if isinstance(c, str) else str(c.encode("utf-8")) for c in comments]
+        tokens, lengths = self._tokenize(texts)
+        compound = np.zeros(len(texts))
+        if tokens:
+            lengths = np.asarray(lengths)
+            compound = self._compound(self._token_sums(tokens, lengths, len(texts)), lengths, texts)
+        # Python's round() so values match NLTK's round(compound, 4) exactly
+        return [round(c, 4) for c in compound.tolist()]
+
+    def _build_vocabulary(self, lexicon):
+        words = set(lexicon) | set(_C.BOOSTER_DICT) | set(_C.NEGATE)
+        words |= {"kind", "of", "least", "at", "very", "but"}
+        words = sorted(words)
+        self.vocabulary = {word: row for row, word in enumerate(words, start=2)}
+        size = len(words) + 2
+        self.valence = np.zeros(size)
+        self.in_lexicon = np.zeros(size, dtype=bool)
+        self.booster = np.zeros(size)
+        self.negation = np.zeros(size, dtype=bool)
+        self.negation[_NOT_CONTRACTION] = True
+        for word, row in self.vocabulary.items():
+            if word in lexicon:
+                self.valence[row] = lexicon[word]
+                self.in_lexicon[row] = True
+            self.booster[row] = _C.BOOSTER_DICT.get(word, 0.0)
+            self.negation[row] = word in _C.NEGATE or "n't" in word
+        self.is_booster = self.booster != 0
+        self._rows = {name: self.vocabulary[name] for name in ("kind", "of", "least", "at", "very", "but")}
+
+    def _build_idioms(self):
+        # Idiom and multi-word booster matching is case-sensitive in NLTK, so
+        # their words get their own exact-case ids (0 = none of them)
+        multiword_boosters = [w for w in _C.BOOSTER_DICT if " " in w]
+        phrases = list(_C.SPECIAL_CASE_IDIOMS) + multiword_boosters
+        words = sorted({w for phrase in phrases for w in phrase.split()} | {"never", *_SO_THIS})
+        self.exact_ids = {word: i for i, word in enumerate(words, start=1)}
+        k = self._k = len(words) + 1
+        self.idiom_2 = np.full(k * k, np.nan)
+        self.idiom_3 = np.full(k * k * k, np.nan)
+        for phrase, value in _C.SPECIAL_CASE_IDIOMS.items():
+            ids = [self.exact_ids[w] for w in phrase.split()]
+            table = self.idiom_2 if len(ids) == 2 else self.idiom_3
+            table[self._code(*ids)] = value
+        self.booster_2 = np.zeros(k * k, dtype=bool)
+        for phrase in multiword_boosters:
+            self.booster_2[self._code(*(self.exact_ids[w] for w in phrase.split()))] = True
+
+    def _code(self, *ids):
+        code = 0
+        for i in ids:
+            code = code * self._k + i
+        return code
+
+    @staticmethod
+    def _tokenize(texts):
+        """NLTK's SentiText tokenization, without its per-comment product dictionaries."""
+        tokens, lengths = [], []
+        for text in texts:
+            words = [w for w in text.split() if len(w) > 1]
+            plain = None
+            for k, word in enumerate(words):
+                if word[0] in _PUNCT_CHARS or word[-1] in _PUNCT_CHARS:
+                    if plain is None:
+                        plain = {w for w in _PUNCT_RE.sub("", text).split() if len(w) > 1}
+                    words[k] = _strip_punctuation(word, plain)
+            tokens.extend(words)
+            lengths.append(len(words))
+        return tokens, lengths
+
+    def _token_sums(self, tokens, lengths, n_docs):
+        n = len(tokens)
+        doc = np.repeat(np.arange(n_docs), lengths)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        pos = np.arange(n) - starts[doc]
+        ends = starts[doc] + lengths[doc]
+
+        # Lower-casing one joined string is far cheaper than per token
+        lowered = "\n".join(tokens).lower().split("\n")
+        rows = np.fromiter(map(self.vocabulary.get, lowered, repeat(_UNKNOWN)), dtype=np.int64, count=n)
+        rows[(rows == _UNKNOWN) & self._contains_nt(lowered)] = _NOT_CONTRACTION
+        exact = np.fromiter(map(self.exact_ids.get, tokens, repeat(0)), dtype=np.int64, count=n)
+        upper = np.fromiter(map(str.isupper, tokens), dtype=bool, count=n)
+        uppers = np.bincount(doc, weights=upper, minlength=n_docs)
+        cap_diff = ((lengths - uppers > 0) & (uppers > 0))[doc]
+
+        lex = self.in_lexicon[rows]
+        negated = self.negation[rows]
+        so_this = (exact == self.exact_ids["so"]) | (exact == self.exact_ids["this"])
+        never = exact == self.exact_ids["never"]
+
+        # Valence of every lexicon word, as if it were at its own position
+        i = np.flatnonzero(lex)
+        i_pos = pos[i]
+        v = self.valence[rows[i]]
+        caps = upper[i] & cap_diff[i]
+        v = np.where(caps, v + np.where(v > 0, _C.C_INCR, -_C.C_INCR), v)
+        for start_i in range(3):
+            j = np.maximum(i - (start_i + 1), 0)
+            applies = (i_pos > start_i) & ~lex[j]
+            scalar = self.booster[rows[j]]
+            scalar = np.where(v < 0, -scalar, scalar)
+            boosted_caps = (scalar != 0) & upper[j] & cap_diff[i]
+            scalar = np.where(boosted_caps, scalar + np.where(v > 0, _C.C_INCR, -_C.C_INCR), scalar)
+            scalar = scalar * (1.0, 0.95, 0.9)[start_i]
+            v = np.where(applies, v + scalar, v)
+            v = self._never_check(v, applies, start_i, i, negated, never, so_this)
+            if start_i == 2:
+                v = self._idioms_check(v, applies, i, exact, ends)
+        v = self._least_check(v, i, i_pos, rows, lex)
+
+        raw = np.zeros(n)
+        raw[i] = v
+        kind_of = (rows == self._rows["kind"]) & (pos + 1 < lengths[doc])
+        kind_of &= rows[np.minimum(np.arange(n) + 1, n - 1)] == self._rows["of"]
+        raw[self.is_booster[rows] | kind_of] = 0.0
+
+        # NLTK scores each occurrence of a word at the index of its first one
+        exact_word = {}
+        word_ids = np.fromiter((exact_word.setdefault(t, len(exact_word)) for t in tokens), dtype=np.int64, count=n)
+        _, first, inverse = np.unique(doc * len(exact_word) + word_ids, return_index=True, return_inverse=True)
+        sentiments = raw[first[inverse]]
+
+        # "but": halve what precedes the first one, boost what follows it
+        but_pos = np.full(n_docs, np.iinfo(np.int64).max)
+        is_but = rows == self._rows["but"]
+        np.minimum.at(but_pos, doc[is_but], pos[is_but])
+        but_pos = but_pos[doc]
+        has_but = but_pos != np.iinfo(np.int64).max
+        sentiments = np.where(has_but & (pos < but_pos), sentiments * 0.5, sentiments)
+        sentiments = np.where(has_but & (pos > but_pos), sentiments * 1.5, sentiments)
+        return np.bincount(doc, weights=sentiments, minlength=n_docs)
+
+    @staticmethod
+    def _contains_nt(lowered):
+        return np.fromiter(("n't" in w for w in lowered), dtype=bool, count=len(lowered))
+
+    @staticmethod
+    def _never_check(v, applies, start_i, i, negated, never, so_this):
+        # Clamped like the other look-backs; `applies` masks the clamped positions
+        back = lambda offset: np.maximum(i - offset, 0)
+        if start_i == 0:
+            return np.where(applies & negated[back(1)], v * _C.N_SCALAR, v)
+        if start_i == 1:
+            emphasis = never[back(2)] & so_this[back(1)]
+        else:
+            emphasis = (never[back(3)] & so_this[back(2)]) | so_this[back(1)]
+        v = np.where(applies & emphasis, v * (1.5 if start_i == 1 else 1.25), v)
+        return np.where(applies & ~emphasis & negated[back(start_i + 1)], v * _C.N_SCALAR, v)
+
+    def _idioms_check(self, v, applies, i, exact, ends):
+        w = lambda offset: exact[np.clip(i + offset, 0, len(exact) - 1)]
+        preceding = [
+            self.idiom_2[self._code(w(-1), w(0))],
+            self.idiom_3[self._code(w(-2), w(-1), w(0))],
+            self.idiom_2[self._code(w(-2), w(-1))],
+            self.idiom_3[self._code(w(-3), w(-2), w(-1))],
+            self.idiom_2[self._code(w(-3), w(-2))],
+        ]
+        # The first matching preceding idiom wins; following ones override it
+        idiom = np.full(len(i), np.nan)
+        for value in reversed(preceding):
+            idiom = np.where(np.isnan(value), idiom, value)
+        following_2 = np.where(i + 1 < ends[i], self.idiom_2[self._code(w(0), w(1))], np.nan)
+        following_3 = np.where(i + 2 < ends[i], self.idiom_3[self._code(w(0), w(1), w(2))], np.nan)
+        idiom = np.where(np.isnan(following_2), idiom, following_2)
+        idiom = np.where(np.isnan(following_3), idiom, following_3)
+        v = np.where(applies & ~np.isnan(idiom), idiom, v)
+        dampened = self.booster_2[self._code(w(-3), w(-2))] | self.booster_2[self._code(w(-2), w(-1))]
+        return np.where(applies & dampened, v + _C.B_DECR, v)
+
+    def _least_check(self, v, i, i_pos, rows, lex):
+        before = np.maximum(i - 1, 0)
+        two_before = rows[np.maximum(i - 2, 0)]
+        least = (i_pos > 0) & ~lex[before] & (rows[before] == self._rows["least"])
+        not_at_least = (i_pos == 1) | ((two_before != self._rows["at"]) & (two_before != self._rows["very"]))
+        return np.where(least & not_at_least, v * _C.N_SCALAR, v)
+
+    @staticmethod
+    def _compound(sums, lengths, texts):
+        exclamations = np.minimum([t.count("!") for t in texts], 4) * 0.292
+        questions = np.array([t.count("?") for t in texts])
+        questions = np.where(questions > 3, 0.96, np.where(questions > 1, questions * 0.18, 0.0))
+        emphasis = exclamations + questions
+        sums = np.where(sums > 0, sums + emphasis, np.where(sums < 0, sums - emphasis, sums))
+        compound = sums / np.sqrt(sums * sums + 15)
+        return np.where(lengths > 0, compound, 0.0)
+
+
+def _strip_punctuation(word, plain):
+    """
+    NLTK maps "cat," and ",cat" to "cat" when the bare word also appears in the
+    comment with all punctuation removed and the stripped affix is one of
+    VADER's punctuation marks.
+    """
+    trailing = len(word) - len(word.rstrip(_PUNCT_CHARS))
+    if trailing and word[-trailing:] in _PUNC_LIST and word[:-trailing] in plain:
+        return word[:-trailing]
+    leading = len(word) - len(word.lstrip(_PUNCT_CHARS))
+    if leading and word[:leading] in _PUNC_LIST and word[leading:] in plain:
+        return word[leading:]
+    return word
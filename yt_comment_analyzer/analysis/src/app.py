@@ -2,13 +2,16 @@ import asyncio
 import time
 import sys
 import os
+from functools import partial
 
 # Add the project root directory to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from yt_module.api_client import YouTubeClient, CommentFetcher
 from yt_module.parser import YouTubeURLParser
-from processing.cleaners import clean_text
+from processing.dedup import NearDuplicateIndex
+from processing.preprocess import preprocess
+from analysis.batch import score_comment_sets
 from analysis.sentiment import SentimentAnalyzer
 from analysis.emojis import EmojiAnalyzer
 from analysis.ToxicityAnalyzer import BertToxicityAnalyzer
@@ -17,6 +20,9 @@ import nltk
 
 nltk.download('vader_lexicon')
 
+# Same variable and default as the Django setting, so the CLI and the API cluster alike
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv('NEAR_DUPLICATE_THRESHOLD', 0))
+
 class YouTubeCommentAnalyzer:
     def __init__(self):
         self.client = YouTubeClient()
@@ -25,18 +31,20 @@ class YouTubeCommentAnalyzer:
         self.emoji = EmojiAnalyzer()
         self.toxicity_bert = BertToxicityAnalyzer()
 
-    async def analyze(self, video_url, comment_limit=100):
+    async def analyze(self, video_url, comment_limit=100, replies=False):
         video_id = YouTubeURLParser().extract_video_id(video_url)
         if not video_id:
             raise ValueError("Invalid YouTube URL")
 
         # Fetch comments
         start_time = time.time()
-        raw_comments = self.fetcher.fetch_comments(video_id, comment_limit)
+        # Replies count towards comment_limit and are fetched concurrently
+        raw_comments = self.fetcher.fetch_comments(video_id, comment_limit, replies)
         fetch_time = time.time() - start_time
 
         start_time = time.time()
-        cleaned_comments = [clean_text(c) for c in raw_comments]
+        processed = [preprocess(c) for c in raw_comments]
+        cleaned_comments = [p.cleaned for p in processed]
         clean_time = time.time() - start_time
 
         # Perform sentiment analysis
@@ -53,14 +61,11 @@ class YouTubeCommentAnalyzer:
         toxic_comments = self.toxicity_bert.analyze(cleaned_comments)  # Get toxic comments
         toxicity_bert_time = time.time() - start_time
 
-        top_emojis = self.emoji.top_emojis(raw_comments)
+        top_emojis = self.emoji.count_extracted(p.emojis for p in processed).most_common(5)
 
         # Perform Gemini analysis
         start_time = time.time()
-        gemini_analyzer = GeminiAnalyzer(raw_comments)
-        gemini_summary = gemini_analyzer.get_summary()
-        gemini_demands = gemini_analyzer.get_public_demand()
-        gemini_suggestions = gemini_analyzer.get_suggestions()
+        gemini_report = GeminiAnalyzer(raw_comments).analyze()
         gemini_time = time.time() - start_time
 
         return {
@@ -73,9 +78,9 @@ class YouTubeCommentAnalyzer:
             },
             'emojis': top_emojis,
             'gemini': {
-                'summary': gemini_summary,
-                'demands': gemini_demands,
-                'suggestions': gemini_suggestions
+                'summary': gemini_report['summary'],
+                'demands': gemini_report['public_demands'],
+                'suggestions': gemini_report['suggestions']
             },
             'total_comments': len(cleaned_comments),
             'time_complexity': {
@@ -88,6 +93,57 @@ class YouTubeCommentAnalyzer:
             }
         }
 
+    async def analyze_many(self, video_urls, comment_limit=100, max_concurrency=8,
+                           dedup_threshold=NEAR_DUPLICATE_THRESHOLD):
+        """
+        Sentiment, toxicity and emoji results for several videos (no Gemini
+        report). Comments are fetched concurrently and scored in pooled model
+        batches; a video that fails gets {'error': ...} instead of results.
+        Near-duplicates are collapsed per video as /api/sentiment/batch/ does.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        def fetch(video_id):
+            return [text for page in self.fetcher.iter_pages(video_id, comment_limit) for text in page]
+
+        async def fetch_video(video_url):
+            video_id = YouTubeURLParser().extract_video_id(video_url)
+            if not video_id:
+                raise ValueError("Invalid YouTube URL")
+            async with semaphore:
+                return await asyncio.to_thread(fetch, video_id)
+
+        start_time = time.time()
+        fetched = await asyncio.gather(*(fetch_video(url) for url in video_urls), return_exceptions=True)
+        fetch_time = time.time() - start_time
+
+        start_time = time.time()
+        ok = [i for i, comments in enumerate(fetched) if not isinstance(comments, BaseException)]
+        processed = {i: [preprocess(c) for c in fetched[i]] for i in ok}
+        scored = dict(zip(ok, score_comment_sets(
+            [[p.cleaned for p in processed[i]] for i in ok], self.sentiment, self.toxicity_bert,
+            partial(NearDuplicateIndex, dedup_threshold) if dedup_threshold else None,
+        )))
+        analysis_time = time.time() - start_time
+
+        results = {}
+        for i, video_url in enumerate(video_urls):
+            if i not in processed:
+                results[video_url] = {'error': str(fetched[i])}
+                continue
+            results[video_url] = {
+                **scored[i],
+                'emojis': self.emoji.count_extracted(p.emojis for p in processed[i]).most_common(5),
+                'total_comments': len(processed[i]),
+            }
+        return {
+            'videos': results,
+            'time_complexity': {
+                'fetch_comments': fetch_time,
+                'pooled_analysis': analysis_time,
+            }
+        }
+
 # Function to neatly print results
 def print_results(results):
     print("\n📊 ------------- YouTube Comment Analysis ------------- 📊\n")
@@ -140,9 +196,10 @@ async def main():
     analyzer = YouTubeCommentAnalyzer()
     video_url = input("🔗 Enter YouTube video URL: ")
     comment_limit = int(input("📝 Number of comments to analyze (max 5000): "))
+    replies = input("💬 Include replies? (y/N): ").strip().lower() in ("y", "yes")
 
     print("\n⏳ Analyzing comments... Please wait...\n")
-    results = await analyzer.analyze(video_url, comment_limit)
+    results = await analyzer.analyze(video_url, comment_limit, replies)
 
     print_results(results)
 
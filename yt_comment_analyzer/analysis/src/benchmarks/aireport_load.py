@@ -0,0 +1,77 @@
+"""
+Offline load test of the /api/aireport/ endpoint.
+
+YouTube is replaced by FakeYouTubeClient and Gemini by LocalGenerativeModel
+(GEMINI_BACKEND=local), so the whole request path - routing, comment store,
+cleaning, prompt building, response cache - runs with realistic latency and
+no network. Run from the `yt_comment_analyzer` directory:
+    python -m analysis.src.benchmarks.aireport_load --requests 200 --concurrency 8 --videos 10
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def setup_django(database):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "yt_comment_analyzer.settings")
+    os.environ["GEMINI_BACKEND"] = "local"
+
+    import django
+    from django.conf import settings
+
+    django.setup()
+    settings.DATABASES["default"]["NAME"] = database
+    from django.core.management import call_command
+    call_command("migrate", verbosity=0, skip_checks=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--videos", type=int, default=10, help="distinct videos; repeats hit the caches")
+    parser.add_argument("--comment-limit", type=int, default=500)
+    parser.add_argument("--youtube-latency", type=float, default=0.15)
+    parser.add_argument("--no-cache", action="store_true", help="disable the Gemini response cache")
+    args = parser.parse_args()
+
+    setup_django(os.path.join(tempfile.mkdtemp(), "aireport_load.sqlite3"))
+
+    from django.test import Client
+    from analysis.components import components
+    from analysis.src.benchmarks.fakes import FakeYouTubeClient
+
+    youtube = FakeYouTubeClient(args.comment_limit * 2, latency=args.youtube_latency)
+    components.override('youtube_client', youtube)
+    if args.no_cache:
+        components.override('gemini_cache', None)
+
+    def request(i):
+        payload = {"video_url": f"https://www.youtube.com/watch?v=video{i % args.videos:06d}",
+                   "comment_limit": args.comment_limit}
+        start = time.perf_counter()
+        response = Client().post("/api/aireport/", payload, content_type="application/json")
+        return response.status_code, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(request, range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for _, latency in results)
+    errors = sum(1 for code, _ in results if code != 200)
+    print(f"⏳ {args.requests} requests, concurrency {args.concurrency}, {args.videos} videos\n")
+    print(f"   Throughput: {args.requests / elapsed:.1f} req/s ({errors} errors)")
+    print(f"   Latency p50: {statistics.median(latencies) * 1000:.0f} ms, "
+          f"p95: {latencies[int(len(latencies) * 0.95) - 1] * 1000:.0f} ms")
+    print(f"   Model calls: {components.get('gemini_model').calls}")
+    print(f"   YouTube calls: {youtube.calls}")
+    if components.get('gemini_cache') is not None:
+        print(f"   Response cache: {components.get('gemini_cache').stats()}")
+
+
+if __name__ == "__main__":
+    main()
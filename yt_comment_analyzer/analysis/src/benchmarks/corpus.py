@@ -0,0 +1,35 @@
+import random
+
+WORDS = [
+    "this", "video", "is", "so", "good", "great", "love", "the", "song", "music",
+    "first", "wow", "amazing", "bad", "terrible", "worst", "hate", "boring", "not",
+    "really", "very", "best", "ever", "please", "make", "more", "part", "2", "lol",
+    "who", "is", "watching", "in", "2025", "idiot", "stupid", "trash", "awesome",
+    "thanks", "for", "sharing", "you", "are", "legend", "bro", "this", "deserves",
+    "views", "underrated", "content", "keep", "going", "fake", "clickbait",
+]
+DUPLICATES = ["first!", "❤️❤️❤️", "Who's here in 2025?", "W video", "👍", "lol"]
+EMOJIS = ["😂", "🔥", "❤️", "👍", "😍", "👨‍👩‍👧", "👍🏽", "💯"]
+
+
+def synthetic_comments(n, seed=0, duplicate_rate=0.2, max_words=60):
+    """
+    Generates `n` YouTube-like comments with a realistic length spread,
+    a share of exact duplicates and a sprinkling of emojis and links.
+    """
+    rng = random.Random(seed)
+    comments = []
+    for _ in range(n):
+        if rng.random() < duplicate_rate:
+            comments.append(rng.choice(DUPLICATES))
+            continue
+        length = min(max_words, int(rng.expovariate(1 / 12)) + 1)
+        words = [rng.choice(WORDS) for _ in range(length)]
+        if rng.random() < 0.3:
+            words.append(rng.choice(EMOJIS))
+        if rng.random() < 0.05:
+            words.append("https://example.com/watch")
+        if rng.random() < 0.1:
+            words[0] = words[0].upper()
+        comments.append(" ".join(words) + rng.choice(["", "", "!", "!!", "?", "."]))
+    return comments
@@ -0,0 +1,95 @@
+import datetime
+import threading
+import time
+import zlib
+
+from analysis.src.benchmarks.corpus import synthetic_comments
+
+
+class FakeYouTubeClient:
+    """
+    Offline stand-in for YouTubeClient. Every video id maps to a deterministic
+    comment section of `comments_per_video` threads, served newest first in
+    pages shaped like commentThreads.list responses, after `latency` seconds.
+    With `max_replies`, some threads also get up to that many replies, served
+    by `get_comment_replies` like comments.list(parentId=...).
+    """
+
+    def __init__(self, comments_per_video=1000, latency=0.15, max_replies=0):
+        self.comments_per_video = comments_per_video
+        self.latency = latency
+        self.max_replies = max_replies
+        self.calls = 0
+        self._threads = {}
+        self._lock = threading.Lock()
+
+    def threads(self, video_id):
+        with self._lock:
+            if video_id not in self._threads:
+                self._threads[video_id] = self._make_threads(video_id)
+            return self._threads[video_id]
+
+    def get_comment_threads(self, video_id, limit=100, page_token=None, max_retries=3):
+        time.sleep(self.latency)
+        with self._lock:
+            self.calls += 1
+        threads = self.threads(video_id)
+        start = int(page_token or 0)
+        end = start + limit
+        response = {"items": threads[start:end]}
+        if end < len(threads):
+            response["nextPageToken"] = str(end)
+        return response
+
+    def get_comment_replies(self, parent_id, limit=100, page_token=None, max_retries=3):
+        time.sleep(self.latency)
+        with self._lock:
+            self.calls += 1
+        replies = self.replies(parent_id)
+        start = int(page_token or 0)
+        end = start + limit
+        response = {"items": replies[start:end]}
+        if end < len(replies):
+            response["nextPageToken"] = str(end)
+        return response
+
+    def replies(self, parent_id):
+        count = self._reply_count(parent_id)
+        texts = synthetic_comments(count, seed=zlib.crc32(parent_id.encode("utf-8")))
+        return [
+            {"id": f"{parent_id}.r{i}", "snippet": {"parentId": parent_id, "textDisplay": text}}
+            for i, text in enumerate(texts)
+        ]
+
+    def _reply_count(self, parent_id):
+        # Most threads have no replies, a few have long discussions
+        seed = zlib.crc32(parent_id.encode("utf-8"))
+        if not self.max_replies or seed % 3:
+            return 0
+        return 1 + seed // 3 % self.max_replies
+
+    def _make_threads(self, video_id):
+        seed = zlib.crc32(video_id.encode("utf-8"))
+        texts = synthetic_comments(self.comments_per_video, seed=seed)
+        newest = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+        threads = []
+        for i, text in enumerate(texts):
+            comment_id = f"{video_id}.{len(texts) - i}"
+            published = (newest - datetime.timedelta(minutes=7 * i)).strftime("%Y-%m-%dT%H:%M:%SZ")
+            threads.append({
+                "id": comment_id,
+                "snippet": {
+                    "videoId": video_id,
+                    "totalReplyCount": self._reply_count(comment_id),
+                    "topLevelComment": {
+                        "id": comment_id,
+                        "snippet": {
+                            "textDisplay": text,
+                            "authorDisplayName": f"user{seed % 997 + i}",
+                            "likeCount": (seed + i * 31) % 50 if i % 4 else 0,
+                            "publishedAt": published,
+                        },
+                    },
+                },
+            })
+        return threads
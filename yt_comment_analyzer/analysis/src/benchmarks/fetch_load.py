@@ -0,0 +1,125 @@
+"""
+Load test of concurrent comment fetching: correctness and throughput.
+
+A local HTTP/1.1 server answers commentThreads.list like the YouTube API
+(pages from FakeYouTubeClient, plus `--latency` per response), so the real
+googleapiclient request path runs with no network. Every fetch is checked
+against the video's expected comments. Two setups are compared:
+
+  per-client  a fresh `build()` and httplib2 transport for every fetch
+  pooled      one shared CommentFetcher over a cached service and HttpPool
+
+Run from the `yt_comment_analyzer` directory:
+    python -m analysis.src.benchmarks.fetch_load --fetches 200 --concurrency 16
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from googleapiclient.discovery import build
+
+from analysis.src.benchmarks.fakes import FakeYouTubeClient
+from analysis.src.yt_module.api_client import CommentFetcher, HttpPool, YouTubeClient
+
+
+QUOTA_ERROR = {"error": {"code": 403, "message": "quota exceeded", "errors": [{"reason": "quotaExceeded"}]}}
+
+
+def serve(youtube, latency, key_quota=None):
+    """Local keep-alive API stand-in; with `key_quota`, each API key gets that many calls, then 403 quotaExceeded."""
+    connections = []
+    calls = {}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def setup(self):
+            super().setup()
+            connections.append(self.client_address)
+
+        def do_GET(self):
+            query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+            time.sleep(latency)
+            with lock:
+                calls[query.get("key")] = calls.get(query.get("key"), 0) + 1
+                over_quota = key_quota is not None and calls[query.get("key")] > key_quota
+            code, payload = (403, QUOTA_ERROR) if over_quota else (200, youtube.get_comment_threads(
+                query["videoId"], int(query["maxResults"]), query.get("pageToken")
+            ))
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, connections
+
+
+def run(fetch, fetches, concurrency, videos, limit, expected):
+    def one(i):
+        video_id = f"video{i % videos:06d}"
+        return fetch(video_id, limit) == expected[video_id]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        correct = sum(pool.map(one, range(fetches)))
+    return time.perf_counter() - start, correct
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fetches", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--videos", type=int, default=20)
+    parser.add_argument("--comment-limit", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.02, help="server-side seconds per page")
+    args = parser.parse_args()
+
+    youtube = FakeYouTubeClient(args.comment_limit, latency=0)
+    expected = {
+        f"video{v:06d}": [t["snippet"]["topLevelComment"]["snippet"]["textDisplay"]
+                          for t in youtube.threads(f"video{v:06d}")]
+        for v in range(args.videos)
+    }
+    server, connections = serve(youtube, args.latency)
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}/"
+
+    class PerClient(YouTubeClient):
+        def __init__(self):
+            super().__init__("load-test", HttpPool(1), endpoint)
+            self._service = build("youtube", "v3", developerKey="load-test", static_discovery=True,
+                                  client_options={"api_endpoint": endpoint})
+
+        def service(self, key):
+            return self._service
+
+    def per_client(video_id, limit):
+        return CommentFetcher(PerClient()).fetch_comments(video_id, limit)
+
+    shared = CommentFetcher(YouTubeClient("load-test", HttpPool(args.concurrency), endpoint))
+
+    print(f"⏳ {args.fetches} fetches of {args.comment_limit} comments, concurrency {args.concurrency}, "
+          f"{args.latency * 1000:.0f} ms per page\n")
+    print(f"{'setup':>11} {'seconds':>8} {'fetches/s':>10} {'correct':>8} {'connections':>12}")
+    for name, fetch in (("per-client", per_client), ("pooled", shared.fetch_comments)):
+        opened = len(connections)
+        elapsed, correct = run(fetch, args.fetches, args.concurrency, args.videos, args.comment_limit, expected)
+        print(f"{name:>11} {elapsed:>8.2f} {args.fetches / elapsed:>10.1f} "
+              f"{correct:>4}/{args.fetches:<3} {len(connections) - opened:>12}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
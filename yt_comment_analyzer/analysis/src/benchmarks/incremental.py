@@ -0,0 +1,108 @@
+"""
+Incremental re-analysis versus a full recompute after new comments arrive.
+
+A synthetic section of `--comments` comments is analysed once, then `--new`
+newer comments are added on top and it is analysed again, both from scratch
+and incrementally from the saved state. With the default `--limit` (the
+section's original size) the new comments push as many old ones out of the
+window, and those are subtracted from the saved state. The saved state goes
+through JSON and .npz like the database store, and the two results must be
+identical. Run from the `yt_comment_analyzer` directory:
+    python -m analysis.src.benchmarks.incremental --comments 20000 --new 500
+"""
+import argparse
+import asyncio
+import io
+import json
+import time
+
+import numpy as np
+
+from analysis.pipeline import StreamingAnalysisPipeline
+from analysis.src.analysis.emojis import EmojiAnalyzer
+from analysis.src.analysis.sentiment import SentimentAnalyzer
+from analysis.src.benchmarks.corpus import synthetic_comments
+from analysis.src.benchmarks.streaming_memory import KeywordToxicity
+
+
+class GrowingSection:
+    """A newest-first comment section that `grow()` adds newer comments to."""
+
+    def __init__(self, comments):
+        self.texts = self._generate(comments, seed=0)
+        self.generation = 0
+
+    def grow(self, comments):
+        self.generation += 1
+        self.texts = self._generate(comments, seed=self.generation) + self.texts
+
+    def iter_pages(self, video_id, limit):
+        texts = self.texts[:limit]
+        for start in range(0, len(texts), 100):
+            yield texts[start:start + 100]
+
+    @staticmethod
+    def _generate(comments, seed):
+        return [f"{text} #{seed}.{i}" for i, text in enumerate(synthetic_comments(comments, seed=seed))]
+
+
+class MemoryStateStore:
+    """The pipeline's state store, serialized the way AnalysisHistory stores it."""
+
+    def __init__(self):
+        self.states = {}
+
+    def load_state(self, video_id, comment_limit):
+        saved = self.states.get((video_id, comment_limit))
+        if saved is None:
+            return None
+        digest, count, aggregates, blob = saved
+        with np.load(io.BytesIO(blob)) as arrays:
+            arrays = {name: arrays[name] for name in arrays.files}
+        return digest, count, json.loads(aggregates), arrays
+
+    def save_state(self, video_id, comment_limit, digest, comment_count, aggregates, arrays):
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **arrays)
+        self.states[(video_id, comment_limit)] = (digest, comment_count, json.dumps(aggregates), buffer.getvalue())
+
+
+def timed(pipeline, limit):
+    start = time.perf_counter()
+    result = asyncio.run(pipeline.run("benchmark", limit))
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--comments", type=int, default=20000)
+    parser.add_argument("--new", type=int, default=500)
+    parser.add_argument("--limit", type=int, help="comment limit (default: --comments)")
+    args = parser.parse_args()
+
+    sentiment = SentimentAnalyzer()
+    sentiment._score_vader(["warm up"])
+    sentiment._score_textblob(["warm up"])
+    section = GrowingSection(args.comments)
+    limit = args.limit or args.comments
+    full = StreamingAnalysisPipeline(section, sentiment, KeywordToxicity(), EmojiAnalyzer())
+    incremental = StreamingAnalysisPipeline(
+        section, sentiment, KeywordToxicity(), EmojiAnalyzer(), state_store=MemoryStateStore()
+    )
+
+    _, first = timed(incremental, limit)
+    print(f"⏳ first analysis of {args.comments} comments: {first:.2f}s")
+    section.grow(args.new)
+    expected, full_seconds = timed(full, limit)
+    result, incremental_seconds = timed(incremental, limit)
+
+    print(f"📊 after {args.new} new comments:")
+    print(f"   full recompute  {full_seconds:>6.2f}s  ({expected['total_comments']} scored)")
+    print(f"   incremental     {incremental_seconds:>6.2f}s  ({result['incremental']['scored']} scored, "
+          f"{result['incremental']['reused']} reused)")
+    identical = {**result, 'incremental': None} == expected
+    print(f"{'✅' if identical else '❌'} results identical: {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Measures the quota-aware rate limiter: throughput per number of API keys,
+and how fast requests fail once every key's quota is spent.
+
+Runs the real YouTubeClient against fetch_load's local API stand-in. Run
+from the `yt_comment_analyzer` directory:
+    python -m analysis.src.benchmarks.quota_limiter --rate 20 --keys 1 2 4
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from analysis.src.benchmarks.fakes import FakeYouTubeClient
+from analysis.src.benchmarks.fetch_load import serve
+from analysis.src.yt_module.api_client import HttpPool, YouTubeClient
+from analysis.src.yt_module.rate_limit import QuotaExceeded, QuotaLimiter
+
+
+def call_all(client, requests, concurrency):
+    def one(i):
+        start = time.perf_counter()
+        try:
+            client.get_comment_threads(f"video{i % 10}", 20)
+            return True, time.perf_counter() - start
+        except QuotaExceeded:
+            return False, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(requests)))
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rate", type=float, default=20, help="requests per second per key")
+    parser.add_argument("--keys", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--key-quota", type=int, default=40, help="calls per key before the server says quotaExceeded")
+    args = parser.parse_args()
+
+    youtube = FakeYouTubeClient(100, latency=0)
+    server, _ = serve(youtube, latency=0.005)
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}/"
+
+    print(f"⏳ {args.requests} requests, concurrency {args.concurrency}, {args.rate:g} req/s per key\n")
+    print(f"{'keys':>5} {'seconds':>8} {'req/s':>7} {'throttled':>10}")
+    for count in args.keys:
+        limiter = QuotaLimiter([f"key-{count}-{i}" for i in range(count)], rate=args.rate, burst=1)
+        client = YouTubeClient(http_pool=HttpPool(args.concurrency), api_endpoint=endpoint, rate_limiter=limiter)
+        elapsed, _ = call_all(client, args.requests, args.concurrency)
+        print(f"{count:>5} {elapsed:>8.2f} {args.requests / elapsed:>7.1f} {limiter.stats()['throttled']:>10}")
+    server.shutdown()
+
+    # The server enforces the quota the limiter does not know about
+    server, _ = serve(youtube, latency=0.005, key_quota=args.key_quota)
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}/"
+    limiter = QuotaLimiter(["quota-a", "quota-b"])
+    client = YouTubeClient(http_pool=HttpPool(args.concurrency), api_endpoint=endpoint, rate_limiter=limiter)
+    _, results = call_all(client, args.requests, args.concurrency)
+    failed = [seconds for ok, seconds in results if not ok]
+    stats = limiter.stats()
+    print(f"\n🚫 2 keys x {args.key_quota} calls of quota: {len(results) - len(failed)} succeeded, "
+          f"{len(failed)} raised QuotaExceeded (slowest failure {max(failed, default=0) * 1000:.0f} ms)")
+    print(f"   quota errors: {stats['quota_errors']}, retries: {stats['retries']}, "
+          f"remaining: {stats['remaining']}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Measures fetching comments with replies at different reply concurrency levels.
+
+FakeYouTubeClient serves thread and reply pages after `--latency` seconds
+each, so wall time is dominated by round trips, as against the real API.
+Every run must return the same comments as the sequential one. Run from the
+`yt_comment_analyzer` directory:
+    python -m analysis.src.benchmarks.reply_fetching --comments 2000 --workers 1 2 4 8 16
+"""
+import argparse
+import time
+from collections import Counter
+
+from analysis.src.benchmarks.fakes import FakeYouTubeClient
+from analysis.src.yt_module.api_client import CommentFetcher
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--comments", type=int, default=2000, help="budget: top-level comments plus replies")
+    parser.add_argument("--threads", type=int, default=1000, help="top-level threads in the fake video")
+    parser.add_argument("--max-replies", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    client = FakeYouTubeClient(args.threads, latency=args.latency, max_replies=args.max_replies)
+    print(f"⏳ Budget {args.comments} comments, {args.latency * 1000:.0f} ms per API call\n")
+    print(f"{'workers':>8} {'comments':>9} {'calls':>6} {'seconds':>8} {'speedup':>8}")
+
+    reference = baseline = None
+    for workers in args.workers:
+        fetcher = CommentFetcher(client, reply_workers=workers)
+        calls = client.calls
+        start = time.perf_counter()
+        comments = fetcher.fetch_comments("benchmark", args.comments, replies=True)
+        elapsed = time.perf_counter() - start
+        # Reply pages may interleave differently; the comments themselves may not differ
+        if reference is None:
+            reference, baseline = Counter(comments), elapsed
+        assert Counter(comments) == reference, "comments differ from the first run"
+        print(f"{workers:>8} {len(comments):>9} {client.calls - calls:>6} {elapsed:>8.2f} "
+              f"{baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
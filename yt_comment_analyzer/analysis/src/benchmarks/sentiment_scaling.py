@@ -0,0 +1,105 @@
+"""
+Measures VADER and TextBlob scoring throughput from 1 to N worker processes.
+
+The same comments are then run through the streaming pipeline, page by page
+as the API delivers them, once with one page per scoring call and once
+batched (`score_batch_size`). The pool counts how many lists it received.
+
+Run from the `yt_comment_analyzer` directory:
+    python -m analysis.src.benchmarks.sentiment_scaling --comments 20000 --workers 1 2 4 8
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from analysis.pipeline import StreamingAnalysisPipeline
+from analysis.src.analysis.emojis import EmojiAnalyzer
+from analysis.src.analysis.sentiment import SentimentAnalyzer
+from analysis.src.benchmarks.corpus import synthetic_comments
+from analysis.src.benchmarks.streaming_memory import KeywordToxicity
+from analysis.src.processing.preprocess import preprocess
+
+
+class ListPages:
+    def __init__(self, comments):
+        self.comments = comments
+
+    def iter_pages(self, video_id, limit):
+        for start in range(0, min(limit, len(self.comments)), 100):
+            yield self.comments[start:start + 100]
+
+
+def run_pipeline(comments, workers, score_batch_size):
+    """(seconds, lists sent to the pool, result) of one pipeline run."""
+    analyzer = SentimentAnalyzer(workers=workers)
+    analyzer._score_vader(["warm up"])  # in-process lexicons, as for the pool workers
+    analyzer._score_textblob(["warm up"])
+    pool_calls = 0
+    if analyzer.pool:
+        analyzer.pool.start()
+        score = analyzer.pool.score
+
+        def counted(engine, shard_comments):
+            nonlocal pool_calls
+            pool_calls += 1
+            return score(engine, shard_comments)
+        analyzer.pool.score = counted
+    pipeline = StreamingAnalysisPipeline(ListPages(comments), analyzer, KeywordToxicity(), EmojiAnalyzer(),
+                                         score_batch_size=score_batch_size)
+    preprocess.cache_clear()  # every run cleans every comment
+    start = time.perf_counter()
+    result = asyncio.run(pipeline.run("benchmark", len(comments)))
+    elapsed = time.perf_counter() - start
+    if analyzer.pool:
+        analyzer.pool.shutdown()
+    return elapsed, pool_calls, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--comments", type=int, default=20000)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--batch", type=int, default=1000, help="pipeline score_batch_size")
+    args = parser.parse_args()
+
+    # No duplicates, so every comment is really scored
+    comments = synthetic_comments(args.comments, duplicate_rate=0)
+    comments = [f"{comment} #{i}" for i, comment in enumerate(comments)]
+    print(f"⏳ {len(comments)} comments on a {os.cpu_count()}-core machine\n")
+    print(f"{'workers':>8} {'engine':>9} {'seconds':>8} {'comments/s':>11} {'speedup':>8}")
+
+    baseline = {}
+    reference = {}
+    for workers in args.workers:
+        analyzer = SentimentAnalyzer(workers=workers)
+        if analyzer.pool:
+            analyzer.pool.start()  # exclude process start-up from the timings
+        for engine in ("vader", "textblob"):
+            start = time.perf_counter()
+            result = analyzer._analyze(comments, engine)
+            elapsed = time.perf_counter() - start
+            baseline.setdefault(engine, elapsed)
+            assert reference.setdefault(engine, result) == result, "results differ from 1 worker"
+            print(f"{workers:>8} {engine:>9} {elapsed:>8.2f} {len(comments) / elapsed:>11.0f} "
+                  f"{baseline[engine] / elapsed:>7.2f}x")
+        if analyzer.pool:
+            analyzer.pool.shutdown()
+
+    print(f"\n{'workers':>8} {'pipeline':>9} {'seconds':>8} {'comments/s':>11} {'pool lists':>11} {'speedup':>8}")
+    run_pipeline(comments[:1000], 1, None)  # one-off imports and emoji tables
+    pipeline_baseline = None
+    expected = None
+    for workers in args.workers:
+        for mode, batch in (("per page", None), ("batched", args.batch)):
+            elapsed, pool_calls, result = run_pipeline(comments, workers, batch)
+            pipeline_baseline = pipeline_baseline or elapsed
+            expected = expected or result
+            assert result == expected, "pipeline results differ"
+            print(f"{workers:>8} {mode:>9} {elapsed:>8.2f} {len(comments) / elapsed:>11.0f} {pool_calls:>11} "
+                  f"{pipeline_baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
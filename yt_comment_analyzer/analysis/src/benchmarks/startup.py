@@ -0,0 +1,67 @@
+"""
+Measures what importing the analysis app costs a fresh process.
+
+`lazy` imports analysis.views the way every manage.py command does now;
+`eager` additionally calls warm_up(), which is what each import used to do
+when views.py built the YouTube client, VADER and RoBERTa at module level.
+Each mode runs in its own interpreter. Run from the `yt_comment_analyzer` directory:
+    python -m analysis.src.benchmarks.startup --repeat 3
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+CHILD = r"""
+import json, os, resource, sys, time
+start = time.perf_counter()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "yt_comment_analyzer.settings")
+import django
+django.setup()
+import analysis.views
+imported = time.perf_counter() - start
+timings = {}
+if sys.argv[1] == "eager":
+    from analysis.components import warm_up
+    timings = warm_up()
+total = time.perf_counter() - start
+print(json.dumps({
+    "import": imported,
+    "total": total,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "modules": len(sys.modules),
+    "components": timings,
+}))
+"""
+
+
+def run(mode):
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, mode],
+        capture_output=True, text=True, check=True, cwd=os.getcwd(),
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'mode':>6} {'import s':>9} {'total s':>8} {'peak RSS MB':>12} {'modules':>8}")
+    for mode in ("lazy", "eager"):
+        runs = [run(mode) for _ in range(args.repeat)]
+        print(f"{mode:>6} {statistics.median(r['import'] for r in runs):>9.2f} "
+              f"{statistics.median(r['total'] for r in runs):>8.2f} "
+              f"{statistics.median(r['rss_mb'] for r in runs):>12.0f} "
+              f"{statistics.median(r['modules'] for r in runs):>8.0f}")
+
+    print("\n⏳ Component load times (eager, last run):")
+    for name, seconds in runs[-1]["components"].items():
+        print(f"   🔹 {name}: {seconds:.2f} seconds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Measures the pipeline's peak memory per comment limit, full versus bounded mode.
+
+Pages are generated on the fly and toxicity is a keyword stand-in, so the
+numbers are the pipeline's own aggregates and nothing else. Run from the
+`yt_comment_analyzer` directory:
+    python -m analysis.src.benchmarks.streaming_memory --limits 10000 50000 200000
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from analysis.pipeline import StreamingAnalysisPipeline
+from analysis.src.analysis.emojis import EmojiAnalyzer
+from analysis.src.analysis.sentiment import SentimentAnalyzer
+from analysis.src.benchmarks.corpus import synthetic_comments
+
+
+class GeneratedPages:
+    """`iter_pages` over a synthetic comment section that is never held in memory."""
+
+    def iter_pages(self, video_id, limit):
+        for page, offset in enumerate(range(0, limit, 100)):
+            texts = synthetic_comments(min(100, limit - offset), seed=page)
+            yield [f"{text} #{offset + i}" for i, text in enumerate(texts)]
+
+
+class KeywordToxicity:
+    def analyze(self, comments):
+        return [(comment, 0.9) for comment in comments if "idiot" in comment]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--limits", type=int, nargs="+", default=[10000, 50000, 200000])
+    parser.add_argument("--dedup-threshold", type=float, default=0.8)
+    args = parser.parse_args()
+
+    sentiment = SentimentAnalyzer()
+    sentiment._score_vader(["warm up"])  # load lexicons before tracing
+    sentiment._score_textblob(["warm up"])
+    pipeline = StreamingAnalysisPipeline(
+        GeneratedPages(), sentiment, KeywordToxicity(), EmojiAnalyzer(),
+        dedup_threshold=args.dedup_threshold,
+    )
+
+    print(f"{'comments':>9} {'mode':>8} {'peak MiB':>9} {'seconds':>8}")
+    for limit in args.limits:
+        for bounded in (False, True):
+            tracemalloc.start()
+            start = time.perf_counter()
+            asyncio.run(pipeline.run("benchmark", limit, bounded=bounded))
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            mode = "bounded" if bounded else "full"
+            print(f"{limit:>9} {mode:>8} {peak / 2**20:>9.1f} {elapsed:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
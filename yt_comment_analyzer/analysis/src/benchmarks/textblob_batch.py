@@ -0,0 +1,76 @@
+"""
+Compares `TextBlob(c).sentiment.polarity` per comment with the batch
+polarity engine: lexicon memory, peak scoring memory and throughput.
+
+Each engine runs in its own interpreter so lexicon memory is measured from
+a cold start. Run from the `yt_comment_analyzer` directory:
+    python -m analysis.src.benchmarks.textblob_batch --comments 20000
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from analysis.src.benchmarks.corpus import synthetic_comments
+
+
+def measure(engine, n):
+    comments = synthetic_comments(n)
+    # Imports are shared by both engines, so only the lexicon itself is traced
+    from textblob import TextBlob
+    from textblob.en import sentiment
+    from analysis.src.analysis.textblob_batch import TextBlobBatchScorer
+
+    tracemalloc.start()
+    if engine == "textblob":
+        len(sentiment)  # loads the lexicon
+        score = lambda batch: [TextBlob(comment).sentiment.polarity for comment in batch]
+    else:
+        score = TextBlobBatchScorer().score
+    lexicon_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    score(comments[:1000])
+    peak_bytes = tracemalloc.get_traced_memory()[1] - lexicon_bytes
+    tracemalloc.stop()
+
+    # Timed without tracing, which slows allocation-heavy code unevenly
+    start = time.perf_counter()
+    scores = score(comments)
+    seconds = time.perf_counter() - start
+    return {'lexicon_mb': lexicon_bytes / 2**20, 'peak_mb': peak_bytes / 2**20,
+            'seconds': seconds, 'scores': scores}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--comments", type=int, default=20000)
+    parser.add_argument("--engine", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.engine:
+        print(json.dumps(measure(args.engine, args.comments)))
+        return
+
+    print(f"⏳ Scoring {args.comments} comments\n")
+    results = {}
+    for engine in ("textblob", "batch"):
+        output = subprocess.run(
+            [sys.executable, "-m", __spec__.name, "--engine", engine, "--comments", str(args.comments)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results[engine] = json.loads(output.strip().splitlines()[-1])
+
+    print(f"{'engine':>9} {'lexicon MB':>11} {'peak MB/1k':>11} {'seconds':>8} {'comments/s':>11}")
+    for engine, r in results.items():
+        print(f"{engine:>9} {r['lexicon_mb']:>11.1f} {r['peak_mb']:>11.2f} {r['seconds']:>8.2f} "
+              f"{args.comments / r['seconds']:>11.0f}")
+    speedup = results['textblob']['seconds'] / results['batch']['seconds']
+    identical = results['textblob']['scores'] == results['batch']['scores']
+    print(f"\n⚡ Speed-up: {speedup:.1f}x")
+    print(f"{'✅' if identical else '❌'} Polarity identical: {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Cost of building comment columns and the sentiment timeline at scale.
+
+Comment pages come from FakeYouTubeClient (no network) and scores are
+random, so the numbers are the columnar parsing and the bucketing alone. The
+vectorized timeline is checked against a plain per-comment loop. Run from
+the `yt_comment_analyzer` directory:
+    python -m analysis.src.benchmarks.timeline --comments 200000 --bucket hour
+"""
+import argparse
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from analysis.src.analysis.timeline import BUCKET_SECONDS, sentiment_timeline
+from analysis.src.benchmarks.fakes import FakeYouTubeClient
+from analysis.src.yt_module.api_client import CommentFetcher
+
+
+def loop_timeline(published, vader, toxic, likes, bucket):
+    """Per-comment reference: (start, comments, likes, vader mean, weighted mean, toxic) per bucket."""
+    width = BUCKET_SECONDS[bucket]
+    sums = defaultdict(lambda: [0, 0, 0.0, 0.0, 0.0, 0])
+    for when, score, is_toxic, like in zip(published.astype(np.int64).tolist(), vader, toxic, likes.tolist()):
+        row = sums[when // width]
+        row[0] += 1
+        row[1] += like
+        row[2] += score
+        row[3] += score * (like + 1)
+        row[4] += like + 1
+        row[5] += is_toxic
+    return [
+        (comments, like_total, round(total / comments, 4), round(weighted / weights, 4), toxic_count)
+        for _, (comments, like_total, total, weighted, weights, toxic_count) in sorted(sums.items())
+    ]
+
+
+def best_of(runs, build):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = build()
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--comments", type=int, default=200000)
+    parser.add_argument("--bucket", choices=sorted(BUCKET_SECONDS), default="hour")
+    args = parser.parse_args()
+
+    fetcher = CommentFetcher(FakeYouTubeClient(args.comments, latency=0))
+    start = time.perf_counter()
+    columns = fetcher.fetch_columns("benchmark", args.comments)
+    columns_seconds = time.perf_counter() - start
+
+    rng = np.random.default_rng(0)
+    vader = rng.uniform(-1, 1, len(columns))
+    toxic = rng.random(len(columns)) < 0.05
+
+    timeline, vectorized_seconds = best_of(3, lambda: sentiment_timeline(
+        columns.published, {'vader': vader}, toxic=toxic, likes=columns.likes, bucket=args.bucket, like_weighted=True
+    ))
+    expected, loop_seconds = best_of(3, lambda: loop_timeline(
+        columns.published, vader.tolist(), toxic.tolist(), columns.likes, args.bucket
+    ))
+
+    got = [
+        (row['comments'], row['likes'], row['vader']['mean'], row['vader']['weighted_mean'], row['toxic'])
+        for row in timeline
+    ]
+    numeric = np.array(got, dtype=np.float64)
+    reference = np.array(expected, dtype=np.float64)
+    matches = numeric.shape == reference.shape and np.allclose(numeric, reference, atol=1e-4)
+
+    print(f"⏳ {len(columns)} comments, {len(timeline)} {args.bucket} buckets")
+    print(f"   fetch into columns      {columns_seconds:>7.3f}s  "
+          f"({(columns.published.nbytes + columns.likes.nbytes) / 2**20:.1f} MiB of numeric columns)")
+    print(f"   vectorized timeline     {vectorized_seconds:>7.3f}s  (best of 3)")
+    print(f"   per-comment loop        {loop_seconds:>7.3f}s  (best of 3)")
+    print(f"{'✅' if matches else '❌'} timelines match: {matches}")
+
+
+if __name__ == "__main__":
+    main()
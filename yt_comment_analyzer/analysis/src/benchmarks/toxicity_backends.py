@@ -0,0 +1,107 @@
+"""
+Compares latency, throughput and memory of the toxicity backends.
+
+Each backend is loaded in its own process so RSS numbers are not polluted by
+the others. Export the quantized/onnx backends first (see toxicity_backends.py),
+then run from the `yt_comment_analyzer` directory:
+    python -m analysis.src.benchmarks.toxicity_backends --backend-dir quantized=models/tox-q onnx=models/tox-onnx
+"""
+import argparse
+import multiprocessing
+import statistics
+import time
+
+from analysis.src.benchmarks.corpus import synthetic_comments
+
+
+def rss_mb():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2 ** 20
+    except ImportError:
+        import resource
+        # ru_maxrss is the peak, in KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(backend, backend_dir, model_name, comments, batch_size, latency_samples):
+    from analysis.src.analysis.ToxicityAnalyzer import BertToxicityAnalyzer
+
+    baseline = rss_mb()
+    start = time.perf_counter()
+    analyzer = BertToxicityAnalyzer(model_name=model_name, batch_size=batch_size,
+                                    backend=backend, backend_dir=backend_dir)
+    load_time = time.perf_counter() - start
+    loaded = rss_mb()
+
+    analyzer.score(comments[:batch_size])  # warm-up
+    latencies = []
+    for comment in comments[:latency_samples]:
+        start = time.perf_counter()
+        analyzer.score([comment])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    scores = analyzer.score(comments)
+    stats = analyzer.last_run_stats
+    latencies.sort()
+    return {
+        'backend': backend,
+        'load_seconds': load_time,
+        'model_rss_mb': loaded - baseline,
+        'peak_rss_mb': rss_mb(),
+        'p50_ms': statistics.median(latencies),
+        'p95_ms': latencies[int(len(latencies) * 0.95) - 1],
+        'comments_per_sec': stats['comments_per_sec'],
+        'scores': scores,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--comments", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--latency-samples", type=int, default=100)
+    parser.add_argument("--model", default="cardiffnlp/twitter-roberta-base-offensive")
+    parser.add_argument("--backends", nargs="+", default=["torch", "quantized", "onnx"])
+    parser.add_argument("--atol", type=float, default=0.05,
+                        help="largest score difference from the first backend that still passes")
+    parser.add_argument("--backend-dir", nargs="*", default=[], metavar="BACKEND=DIR",
+                        help="exported model directory per backend")
+    args = parser.parse_args()
+
+    dirs = dict(item.split("=", 1) for item in args.backend_dir)
+    comments = synthetic_comments(args.comments)
+
+    # spawn keeps every backend in a clean interpreter
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for backend in args.backends:
+        with context.Pool(1) as pool:
+            results.append(pool.apply(measure, (backend, dirs.get(backend), args.model, comments,
+                                                args.batch_size, args.latency_samples)))
+
+    # Imported here: spawned workers re-import this module, and torch would inflate their baseline RSS
+    from analysis.src.analysis.toxicity_backends import check_parity
+
+    reference = results[0]['scores']
+    print(f"⏳ {len(comments)} comments, batch size {args.batch_size}\n")
+    print(f"{'backend':>10} {'load s':>7} {'model MB':>9} {'peak MB':>8} {'p50 ms':>7} "
+          f"{'p95 ms':>7} {'comments/s':>11} {'max |Δ|':>8} {'mean |Δ|':>9} {'labels':>7}")
+    failed = []
+    for result in results:
+        parity = check_parity(reference, result['scores'], atol=args.atol)
+        if not parity['passed']:
+            failed.append(result['backend'])
+        print(f"{result['backend']:>10} {result['load_seconds']:>7.2f} {result['model_rss_mb']:>9.0f} "
+              f"{result['peak_rss_mb']:>8.0f} {result['p50_ms']:>7.2f} {result['p95_ms']:>7.2f} "
+              f"{result['comments_per_sec']:>11.1f} {parity['max_abs_diff']:>8.4f} "
+              f"{parity['mean_abs_diff']:>9.4f} {parity['label_agreement']:>7.1%}")
+    print(f"\n|Δ| and label agreement are measured against the '{results[0]['backend']}' backend.")
+    if failed:
+        print(f"❌ Scores of {', '.join(failed)} differ by more than {args.atol}")
+    else:
+        print(f"✅ Every backend is within {args.atol} of the reference")
+
+
+if __name__ == "__main__":
+    main()
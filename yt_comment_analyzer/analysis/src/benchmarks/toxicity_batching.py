@@ -0,0 +1,47 @@
+"""
+Measures BertToxicityAnalyzer throughput for a range of batch sizes.
+
+Run from the `yt_comment_analyzer` directory:
+    python -m analysis.src.benchmarks.toxicity_batching --comments 2000 --batch-sizes 1 8 16 32 64
+"""
+import argparse
+
+import torch
+
+from analysis.src.analysis.ToxicityAnalyzer import BertToxicityAnalyzer
+from analysis.src.benchmarks.corpus import synthetic_comments
+
+
+def run(comments, batch_sizes, model_name):
+    analyzer = BertToxicityAnalyzer(model_name=model_name)
+    analyzer.score(comments[:16])  # warm-up
+    results = []
+    for batch_size in batch_sizes:
+        analyzer.score(comments, batch_size=batch_size)
+        results.append(analyzer.last_run_stats)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--comments", type=int, default=1000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 16, 32, 64])
+    parser.add_argument("--model", default="cardiffnlp/twitter-roberta-base-offensive")
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    comments = synthetic_comments(args.comments)
+    print(f"⏳ Scoring {len(comments)} comments on {torch.get_num_threads()} threads\n")
+    print(f"{'batch':>6} {'seconds':>9} {'comments/s':>11} {'tokens/s':>10} {'padding eff.':>13}")
+    for stats in run(comments, args.batch_sizes, args.model):
+        print(
+            f"{stats['batch_size']:>6} {stats['seconds']:>9.3f} {stats['comments_per_sec']:>11.1f} "
+            f"{stats['tokens_per_sec']:>10.0f} {stats['padding_efficiency']:>13.2%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
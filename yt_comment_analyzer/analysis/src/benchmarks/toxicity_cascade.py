@@ -0,0 +1,65 @@
+"""
+Measures cascade toxicity scoring against the full model: escalation rate,
+precision and recall per prefilter threshold, and the resulting speed-up.
+
+The full model labels the sample (score > 0.5). With --fit, the prefilter is
+first trained on half of it and evaluated on the other half. Run from the
+`yt_comment_analyzer` directory:
+    python -m analysis.src.benchmarks.toxicity_cascade --comments 2000 --fit --save prefilter.npz
+"""
+import argparse
+import time
+
+from analysis.src.analysis.ToxicityAnalyzer import BertToxicityAnalyzer
+from analysis.src.analysis.toxicity_prefilter import ToxicityPrefilter, evaluate_cascade
+from analysis.src.benchmarks.corpus import synthetic_comments
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--comments", type=int, default=2000)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.1, 0.2, 0.3, 0.4, 0.5])
+    parser.add_argument("--model", default="cardiffnlp/twitter-roberta-base-offensive")
+    parser.add_argument("--fit", action="store_true", help="train the prefilter on half of the sample")
+    parser.add_argument("--save", help="write the prefilter weights here (.npz)")
+    args = parser.parse_args()
+
+    comments = synthetic_comments(args.comments, duplicate_rate=0)
+    analyzer = BertToxicityAnalyzer(model_name=args.model)
+    prefilter = ToxicityPrefilter()
+
+    print(f"⏳ Labelling {len(comments)} comments with the full model")
+    start = time.perf_counter()
+    reference = analyzer.score(comments)
+    full_seconds = time.perf_counter() - start
+
+    if args.fit:
+        half = len(comments) // 2
+        prefilter.fit(comments[:half], reference[:half])
+        comments, reference = comments[half:], reference[half:]
+        full_seconds *= len(comments) / args.comments
+        print(f"🧠 Fitted the prefilter on {half} comments, evaluating on {len(comments)}")
+    if args.save:
+        prefilter.save(args.save)
+        print(f"💾 Saved prefilter weights to {args.save}")
+
+    start = time.perf_counter()
+    suspicion = prefilter.suspicion(comments)
+    prefilter_seconds = time.perf_counter() - start
+    toxic = sum(score > 0.5 for score in reference)
+    print(f"☣️  {toxic} of {len(comments)} comments are toxic per the full model; "
+          f"prefilter takes {prefilter_seconds * 1000:.1f} ms\n")
+
+    print(f"{'threshold':>9} {'escalated':>10} {'precision':>10} {'recall':>7} {'seconds':>8} {'speed-up':>9}")
+    for row in evaluate_cascade(suspicion, reference, args.thresholds):
+        analyzer.prefilter, analyzer.cascade_threshold = prefilter, row['threshold']
+        start = time.perf_counter()
+        analyzer.analyze(comments)
+        seconds = time.perf_counter() - start
+        print(f"{row['threshold']:>9.2f} {row['escalation_rate']:>10.1%} {row['precision']:>10.1%} "
+              f"{row['recall']:>7.1%} {seconds:>8.2f} {full_seconds / seconds:>8.1f}x")
+    print(f"\n   full model alone: {full_seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
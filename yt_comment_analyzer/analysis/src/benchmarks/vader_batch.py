@@ -0,0 +1,51 @@
+"""
+Compares NLTK's per-comment VADER scoring with the NumPy batch scorer.
+
+Run from the `yt_comment_analyzer` directory:
+    python -m analysis.src.benchmarks.vader_batch --comments 100000
+"""
+import argparse
+import time
+
+from nltk.sentiment import SentimentIntensityAnalyzer
+
+from analysis.src.analysis.sentiment import SentimentAnalyzer
+from analysis.src.analysis.vader_batch import TOLERANCE, VaderBatchScorer
+from analysis.src.benchmarks.corpus import synthetic_comments
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--comments", type=int, default=100000)
+    args = parser.parse_args()
+
+    comments = synthetic_comments(args.comments)
+    sid = SentimentIntensityAnalyzer()
+    batch = VaderBatchScorer(sid.lexicon)
+    print(f"⏳ Scoring {len(comments)} comments\n")
+
+    start = time.perf_counter()
+    reference = [sid.polarity_scores(comment)['compound'] for comment in comments]
+    nltk_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scores = batch.score(comments)
+    batch_seconds = time.perf_counter() - start
+
+    print(f"{'engine':>7} {'seconds':>8} {'comments/s':>11}")
+    print(f"{'nltk':>7} {nltk_seconds:>8.2f} {len(comments) / nltk_seconds:>11.0f}")
+    print(f"{'batch':>7} {batch_seconds:>8.2f} {len(comments) / batch_seconds:>11.0f}")
+    print(f"\n⚡ Speed-up: {nltk_seconds / batch_seconds:.1f}x")
+
+    max_diff = max(abs(a - b) for a, b in zip(reference, scores))
+    analyzer = SentimentAnalyzer(vader_engine='nltk')
+    reference_buckets, buckets = analyzer.accumulator(), analyzer.accumulator()
+    reference_buckets.update(reference)
+    buckets.update(scores)
+    same_buckets = reference_buckets.results == buckets.results
+    print(f"📏 Max |compound difference|: {max_diff:.2e} (tolerance {TOLERANCE:.0e})")
+    print(f"{'✅' if same_buckets and max_diff <= TOLERANCE else '❌'} Sentiment breakdown identical: {same_buckets}")
+
+
+if __name__ == "__main__":
+    main()
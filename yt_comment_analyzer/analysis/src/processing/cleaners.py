@@ -1,10 +1,9 @@
-import re
 import emoji
+from .preprocess import preprocess
 
 def remove_emojis(text):
     return emoji.replace_emoji(text, replace='')
 
 def clean_text(text):
-    text = remove_emojis(text)
-    text = re.sub(r'http\S+', '', text)  # Remove URLs
-    return text.strip()
\ No newline at end of file
+    # Emoji and URLs are stripped in the same single pass that extracts them
+    return preprocess(text).cleaned
@@ -0,0 +1,155 @@
+"""
+Near-duplicate comment clustering with MinHash and LSH.
+
+Bot waves and copypasta produce thousands of comments that differ by a word,
+an emoji or punctuation. `NearDuplicateIndex.add(text)` assigns each comment
+to a cluster: it is compared, through LSH buckets, only with the
+representatives (first members) of existing clusters, and joins the most
+similar one if their estimated Jaccard similarity over character shingles
+reaches `threshold`; otherwise it starts a new cluster. Analyzers then score
+one representative per cluster and weight aggregates by cluster size.
+"""
+import re
+from collections import namedtuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+Cluster = namedtuple('Cluster', ['representative', 'size'])
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(text):
+    """Case, punctuation and spacing are not what makes two comments different."""
+    return _SPACES.sub(" ", _NON_WORD.sub("", text.lower())).strip()
+
+
+class MinHasher:
+    def __init__(self, num_perm=64, shingle_size=5, seed=1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        # Multiply-shift hashing: (a * x + b) mod 2**64, keeping the well-mixed high bits
+        self.a = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+        # Polynomial weights for hashing each window of code points (wraps mod 2**64)
+        self.powers = np.uint64(1_000_003) ** np.arange(shingle_size, dtype=np.uint64)
+
+    def shingle_hashes(self, text):
+        """Hashes of every `shingle_size`-character window, computed without a Python loop."""
+        points = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        if len(points) < self.shingle_size:
+            points = np.concatenate([points, np.zeros(self.shingle_size - len(points), dtype=np.uint64)])
+        windows = sliding_window_view(points, self.shingle_size)
+        return (windows * self.powers).sum(axis=1)
+
+    def signature(self, text):
+        hashes = self.shingle_hashes(text)
+        return ((np.outer(self.a, hashes) + self.b[:, None]) >> np.uint64(32)).min(axis=1).astype(np.uint32)
+
+
+class NearDuplicateIndex:
+    def __init__(self, threshold=0.8, num_perm=64, bands=16, shingle_size=5, seed=1, max_clusters=None):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm, shingle_size, seed)
+        # Band rows are folded into one int key; bucket values are a cluster id, or a list once shared
+        self.band_mix = np.random.default_rng(seed + 1).integers(1, 1 << 63, size=self.rows, dtype=np.uint64) | np.uint64(1)
+        self.buckets = [{} for _ in range(bands)]
+        self.exact = {}
+        # Representative signatures, one row per cluster; grown by doubling
+        self.signatures = np.zeros((64, num_perm), dtype=np.uint32)
+        self.representatives = []
+        self.sizes = []
+        # Bounded memory: past `max_clusters`, unmatched comments stay unclustered
+        self.max_clusters = max_clusters
+        self.unclustered = 0
+
+    def add(self, text):
+        """
+        Returns (cluster id, is_new); `is_new` means `text` is the cluster's
+        representative. Once `max_clusters` is reached, a comment matching no
+        cluster gets (None, True) and is not remembered. So does a comment
+        with no words left (emoji or punctuation only): there is nothing to
+        compare, and lumping them all together would make one fake cluster.
+        """
+        key = normalize(text)
+        if not key:
+            return None, True
+        cluster_id = self.exact.get(key)
+        if cluster_id is None:
+            signature = self.hasher.signature(key)
+            cluster_id = self._nearest(signature)
+            if cluster_id is None and self.max_clusters is not None and len(self.sizes) >= self.max_clusters:
+                self.unclustered += 1
+                return None, True
+            if cluster_id is None:
+                cluster_id = len(self.representatives)
+                if cluster_id == len(self.signatures):
+                    self.signatures = np.concatenate([self.signatures, np.zeros_like(self.signatures)])
+                self.signatures[cluster_id] = signature
+                self.representatives.append(text)
+                self.sizes.append(0)
+                for band, bucket in zip(self._bands(signature), self.buckets):
+                    members = bucket.get(band)
+                    if members is None:
+                        bucket[band] = cluster_id
+                    elif isinstance(members, list):
+                        members.append(cluster_id)
+                    else:
+                        bucket[band] = [members, cluster_id]
+            if self.max_clusters is None or len(self.exact) < 4 * self.max_clusters:
+                self.exact[key] = cluster_id
+        self.sizes[cluster_id] += 1
+        return cluster_id, self.sizes[cluster_id] == 1
+
+    def add_many(self, texts):
+        return [self.add(text) for text in texts]
+
+    def largest(self, n=5):
+        """The `n` biggest clusters that actually collapsed something."""
+        order = sorted(range(len(self.sizes)), key=lambda i: (-self.sizes[i], i))
+        return [
+            Cluster(self.representatives[i], self.sizes[i])._asdict()
+            for i in order[:n] if self.sizes[i] > 1
+        ]
+
+    def summary(self, top=5):
+        total = sum(self.sizes)
+        return {
+            'clusters': len(self.sizes) + self.unclustered,
+            'collapsed': total - len(self.sizes),
+            'largest': self.largest(top),
+        }
+
+    def _bands(self, signature):
+        return (signature.reshape(self.bands, self.rows).astype(np.uint64) * self.band_mix).sum(axis=1).tolist()
+
+    def _nearest(self, signature):
+        candidates = set()
+        for band, bucket in zip(self._bands(signature), self.buckets):
+            members = bucket.get(band)
+            if isinstance(members, list):
+                candidates.update(members)
+            elif members is not None:
+                candidates.add(members)
+        if not candidates:
+            return None
+        candidates = np.array(sorted(candidates))
+        similarity = (self.signatures[candidates] == signature).mean(axis=1)
+        best = int(np.argmax(similarity))  # first of the most similar
+        return int(candidates[best]) if similarity[best] >= self.threshold else None
+
+
+def collapse(texts, threshold=0.8):
+    """
+    One-shot clustering of a comment list: returns the index plus, per
+    comment, its cluster id.
+    """
+    index = NearDuplicateIndex(threshold)
+    return index, [cluster_id for cluster_id, _ in index.add_many(texts)]
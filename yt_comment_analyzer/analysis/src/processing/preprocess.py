@@ -0,0 +1,145 @@
+"""
+Single-pass comment preprocessing.
+
+`preprocess(text)` scans a comment once with one compiled pattern that
+matches URLs, @mentions and emoji, and returns the cleaned text (emoji and
+URLs removed, as `clean_text` always did), the emoji found, and the URL and
+mention counts. The emoji part of the pattern is a trie of every sequence in
+`emoji.EMOJI_DATA`, so ZWJ families, skin tones, flags and keycaps are
+matched whole, longest first, instead of code point by code point. URLs win
+over mentions they are glued to, and leftover ZWJs and variation selectors
+are dropped the way `emoji.replace_emoji` drops them, so the cleaned text is
+what `clean_text` produced.
+"""
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+import emoji
+
+Preprocessed = namedtuple('Preprocessed', ['cleaned', 'emojis', 'urls', 'mentions'])
+
+# clean_text removed emoji before applying http\S+, so {removed} (emoji and
+# selectors) may follow "http" but does not count as the URL's \S+: a bare
+# "http" followed only by emoji is text. Emoji inside the letters of "http"
+# are not bridged, so "ht😂tp://x" keeps "http://x" where clean_text dropped it
+URL_PATTERN = r'http(?:{removed})*+\S+'
+# {stop} is filled in with what a mention must not run into: "http", so a URL
+# glued to a mention is still removed as a URL, and emoji that begin with a
+# word character (keycaps, ℹ), which clean_text always removed first
+MENTION_PATTERN = r'@(?!{stop})\w(?:(?!{stop})[\w.-])*'
+ZWJ = '\u200d'
+JOINERS = ZWJ + '\ufe0e\ufe0f'
+
+
+def _trie_pattern(words, walk=False):
+    """
+    Regex for `words` with shared prefixes factored out, so matching never
+    backtracks across them. With `walk`, a match must follow the trie as far
+    as the text allows, like emoji's tokenizer: a word whose continuation
+    starts but then breaks off does not match.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        terminal = '' in node
+        children = [(char, child) for char, child in node.items() if char]
+        if not children:
+            return ''
+        leaves = sorted(re.escape(char) for char, child in children if list(child) == [''])
+        branches = [re.escape(char) + build(child) for char, child in children if list(child) != ['']]
+        # Longer branches first, then single-character leaves as one class
+        alternatives = sorted(branches, key=len, reverse=True)
+        if leaves:
+            alternatives.append(leaves[0] if len(leaves) == 1 else f"[{''.join(leaves)}]")
+        pattern = alternatives[0] if len(alternatives) == 1 else f"(?:{'|'.join(alternatives)})"
+        if not terminal:
+            return pattern
+        if walk:
+            return f"(?:{pattern}|(?![{''.join(sorted(re.escape(char) for char, _ in children))}]))"
+        return f"(?:{pattern})?"
+
+    return build(trie)
+
+
+def _char_ranges(chars):
+    """Character class body with consecutive code points merged into ranges, which sre tests far faster."""
+    points = sorted(map(ord, chars))
+    ranges, start, end = [], points[0], points[0]
+    for point in points[1:]:
+        if point != end + 1:
+            ranges.append((start, end))
+            start = point
+        end = point
+    ranges.append((start, end))
+    return ''.join(
+        re.escape(chr(a)) if a == b else f'{re.escape(chr(a))}-{re.escape(chr(b))}'
+        for a, b in ranges
+    )
+
+
+@lru_cache(maxsize=None)
+def _pattern():
+    # Compiled on first use: ~5k emoji sequences take a moment
+    emoji_pattern = _trie_pattern(emoji.EMOJI_DATA, walk=True)
+    stop_pattern = _trie_pattern(emoji.EMOJI_DATA)
+    # A one-character-class lookahead skips ordinary characters before the trie is tried
+    first_chars = _char_ranges({key[0] for key in emoji.EMOJI_DATA})
+    word_emoji = _trie_pattern([key for key in emoji.EMOJI_DATA if re.match(r'\w', key[0])])
+    mention_pattern = MENTION_PATTERN.format(stop=f'http|{word_emoji}')
+    # What the emoji and selector alternatives below remove, without their group names
+    removed = (
+        f'(?=[{first_chars}])(?:{emoji_pattern}(?:(?<=[{first_chars}]){ZWJ})?'
+        f'|{stop_pattern}(?<=[{first_chars}]){ZWJ})|[\ufe0e\ufe0f]'
+    )
+    return re.compile(
+        f'(?P<url>{URL_PATTERN.format(removed=removed)})|(?P<mention>{mention_pattern})'
+        # Like emoji's tokenizer, a ZWJ right after an emoji whose last character
+        # can start an emoji is part of a (non-RGI) ZWJ sequence and is dropped
+        f'|(?=[{first_chars}])(?:(?P<emoji>{emoji_pattern})(?P<zwj>(?<=[{first_chars}]){ZWJ})?'
+        f'|(?P<stop>{stop_pattern})(?<=[{first_chars}])(?P<stop_zwj>{ZWJ}))'
+        # Stray variation selectors, which emoji.replace_emoji also dropped
+        f'|(?P<selector>[\ufe0e\ufe0f])'
+    )
+
+
+@lru_cache(maxsize=65536)
+def preprocess(text):
+    pieces, emojis = [], []
+    urls = mentions = 0
+    last = 0
+    # End of the previous emoji, while only joiners and selectors may follow it
+    emoji_end = None
+    for match in _pattern().finditer(text):
+        kind = match.lastgroup
+        if kind == 'mention':
+            mentions += 1
+            continue
+        if kind == 'url':
+            urls += 1
+            emoji_end = None
+            if not match.group().isascii():
+                # Emoji glued to a URL go with it from the text but are still counted
+                emojis.extend(preprocess(match.group()[4:]).emojis)
+        elif kind in ('emoji', 'zwj', 'stop_zwj'):
+            sequence = match.group('emoji') or match.group('stop')
+            gap = text[emoji_end:match.start()] if emoji_end is not None else ''
+            if ZWJ in gap and not gap.strip(JOINERS):
+                # Emoji separated only by ZWJs count as one sequence, as emoji.analyze reports them
+                emojis[-1] += ZWJ + sequence
+            else:
+                emojis.append(sequence)
+            emoji_end = match.start() + len(sequence)
+        pieces.append(text[last:match.start()])
+        last = match.end()
+    pieces.append(text[last:])
+    return Preprocessed(''.join(pieces).strip(), tuple(emojis), urls, mentions)
+
+
+def preprocess_many(texts):
+    return [preprocess(text) for text in texts]
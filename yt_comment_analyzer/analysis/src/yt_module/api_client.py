@@ -1,76 +1,294 @@
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+import httplib2
+import json
 import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
 from dotenv import load_dotenv
 import time
 from googleapiclient.errors import HttpError
+from .rate_limit import QUOTA_REASONS, QuotaLimiter
+from .records import CommentColumns
 
 # Load environment variables from .env file
 load_dotenv()
 
+
+@lru_cache(maxsize=None)
+def discovery_document(api='youtube', version='v3'):
+    """The API's discovery document, bundled with google-api-python-client and parsed once per process."""
+    return json.loads(get_static_doc(api, version))
+
+
+@lru_cache(maxsize=None)
+def youtube_service(developer_key, api_endpoint=None):
+    """
+    One service object per API key and endpoint. Requests are executed on
+    pooled transports (`execute(http=...)`), so the service itself is only
+    read and can be shared between threads.
+    """
+    return build_from_document(
+        discovery_document(),
+        developerKey=developer_key,
+        client_options={'api_endpoint': api_endpoint} if api_endpoint else None,
+    )
+
+
+def api_keys():
+    """YOUTUBE_API_KEYS (comma-separated) if set, else YOUTUBE_API_KEY."""
+    keys = [key.strip() for key in os.getenv('YOUTUBE_API_KEYS', '').split(',') if key.strip()]
+    return keys or [os.getenv('YOUTUBE_API_KEY')]
+
+
+def error_reasons(error):
+    """The `reason` codes of an HttpError's JSON body, e.g. {'quotaExceeded'}."""
+    try:
+        body = json.loads(error.content.decode('utf-8'))
+        return {detail.get('reason') for detail in body['error'].get('errors', [])}
+    except (ValueError, KeyError, AttributeError, TypeError):
+        return set()
+
+
+# Worth retrying: rate limiting and server-side failures
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+RETRY_REASONS = frozenset(("rateLimitExceeded", "userRateLimitExceeded", "backendError"))
+
+
+class HttpPool:
+    """
+    Keep-alive httplib2 transports shared by all threads. httplib2.Http is
+    not thread-safe, so each transport is lent to one thread at a time; at
+    most `size` exist, and callers beyond that wait for one to be returned.
+    """
+
+    def __init__(self, size=8, timeout=30):
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self):
+        http = self._checkout()
+        try:
+            yield http
+        finally:
+            self._idle.put(http)
+
+    def stats(self):
+        return {'size': self.size, 'created': self._created, 'idle': self._idle.qsize()}
+
+    def _checkout(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return httplib2.Http(timeout=self.timeout)
+        return self._idle.get()
+
+
 class YouTubeClient:
-    def __init__(self):
-        self.service = build(
-            'youtube',  # API service name
-            'v3',      # API version
-            developerKey=os.getenv('YOUTUBE_API_KEY')  # Load API key from .env
-        )
+    """
+    Every call first takes a slot from `rate_limiter` (a QuotaLimiter over
+    one or more API keys, possibly shared with other clients), which picks
+    the key to use. A quota error retires that key and retries on another
+    at once; when none is left QuotaExceeded propagates. Rate limiting,
+    server errors and connection failures are retried with jittered
+    backoff; other errors (bad request, comments disabled...) fail at once.
+    Calls block, throttling and backoff included: run them on worker threads.
+    """
+
+    def __init__(self, developer_key=None, http_pool=None, api_endpoint=None, rate_limiter=None):
+        # Load API key(s) from .env
+        self.rate_limiter = rate_limiter or QuotaLimiter([developer_key] if developer_key else api_keys())
+        self.api_endpoint = api_endpoint
+        self.http_pool = http_pool or HttpPool()
     
     def get_comment_threads(self, video_id, limit=100, page_token=None, max_retries=3):
-        for attempt in range(max_retries):
+        return self._execute(lambda service: service.commentThreads().list(
+            part="snippet",
+            maxResults=limit,
+            videoId=video_id,
+            textFormat="plainText",
+            pageToken=page_token
+        ), max_retries)
+    
+    def get_comment_replies(self, parent_id, limit=100, page_token=None, max_retries=3):
+        """One page of replies to a top-level comment (comments.list with parentId)."""
+        return self._execute(lambda service: service.comments().list(
+            part="snippet",
+            maxResults=limit,
+            parentId=parent_id,
+            textFormat="plainText",
+            pageToken=page_token
+        ), max_retries)
+    
+    def service(self, key):
+        return youtube_service(key, self.api_endpoint)
+    
+    def _execute(self, make_request, max_retries, cost=1):
+        attempt = 0
+        while True:
+            key = self.rate_limiter.acquire(cost)
             try:
-                return self.service.commentThreads().list(
-                    part="snippet",
-                    maxResults=limit,
-                    videoId=video_id,
-                    textFormat="plainText",
-                    pageToken=page_token
-                ).execute()
+                request = make_request(self.service(key))
+                with self.http_pool.connection() as http:
+                    return request.execute(http=http)
             except HttpError as e:
+                reasons = error_reasons(e)
+                if reasons & QUOTA_REASONS:
+                    # Not transient: switch keys without using up an attempt
+                    self.rate_limiter.exhaust(key)
+                    continue
+                if e.resp.status not in RETRY_STATUSES and not reasons & RETRY_REASONS:
+                    raise
                 if attempt == max_retries - 1:
                     raise
-                time.sleep(2 ** attempt)  # Exponential backoff
             except Exception as e:
                 if attempt == max_retries - 1:
                     raise
-                time.sleep(2 ** attempt)
+            time.sleep(self.rate_limiter.backoff(attempt))  # Jittered exponential backoff
+            attempt += 1
 
 class CommentFetcher:
-    def __init__(self, client):
+    """Stateless between calls: every fetch keeps its comments in locals, so threads can share one fetcher."""
+
+    def __init__(self, client, reply_workers=8):
         self.client = client
-        self.comments = []
+        # Concurrent comments.list calls per fetch when replies are included
+        self.reply_workers = reply_workers
     
-    def fetch_comments(self, video_id, limit=100):
+    def fetch_comments(self, video_id, limit=100, replies=False):
+        comments = []
         try:
-            remaining = limit
-            page_token = None
-            
-            while remaining > 0:
-                batch_size = min(remaining, 100)
-                results = self.client.get_comment_threads(
-                    video_id, 
-                    batch_size, 
-                    page_token
-                )
-                
-                if not results or "items" not in results:
-                    break
-                    
-                self._process_batch(results)
-                remaining -= batch_size
-                page_token = results.get("nextPageToken")
-                
-                if not page_token:
-                    break
+            for page in self.iter_pages(video_id, limit, replies):
+                comments.extend(page)
             
-            return self.comments
+            return comments
         except Exception as e:
             print(f"Error fetching comments: {str(e)}")
             raise
+    
+    def iter_pages(self, video_id, limit=100, replies=False):
+        """
+        Yields the comment texts of each page (up to 100) as soon as it arrives.
+        With `replies`, reply threads are fetched too and `limit` caps
+        top-level comments and replies together.
+        """
+        if replies:
+            yield from self._iter_with_replies(video_id, limit)
+            return
+        for results in self.iter_results(video_id, limit):
+            yield self._page_texts(results)
+    
+    def _iter_with_replies(self, video_id, limit):
+        """
+        Thread pages are still fetched one after another, but as each arrives
+        the replies of its threads are requested on a pool of `reply_workers`
+        threads. Budget is reserved when a reply fetch is submitted, using the
+        thread's totalReplyCount, so no call fetches replies that will be
+        dropped. Reply pages are yielded as they complete, in thread order.
+        """
+        budget = limit
+        pending = deque()
+        pool = ThreadPoolExecutor(max_workers=self.reply_workers, thread_name_prefix='reply-fetch')
+        try:
+            for results in self.iter_results(video_id, limit):
+                items = results.get("items", [])[:budget]
+                budget -= len(items)
+                yield self._page_texts({"items": items})
+                for item in items:
+                    wanted = min(item["snippet"].get("totalReplyCount", 0), budget)
+                    if wanted > 0:
+                        budget -= wanted
+                        pending.append(pool.submit(self.fetch_replies, item["id"], wanted))
+                while pending and pending[0].done():
+                    yield pending.popleft().result()
+                if budget <= 0:
+                    break
+            while pending:
+                yield pending.popleft().result()
         finally:
-            self.comments = []  # Reset comments for next fetch
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    def fetch_replies(self, parent_id, limit=100):
+        """Texts of up to `limit` replies to one top-level comment, in API order."""
+        texts = []
+        page_token = None
+        while len(texts) < limit:
+            results = self.client.get_comment_replies(parent_id, min(limit - len(texts), 100), page_token)
+            texts.extend(item["snippet"]["textDisplay"] for item in results.get("items", []))
+            page_token = results.get("nextPageToken")
+            if not page_token or not results.get("items"):
+                break
+        return texts[:limit]
+    
+    def iter_records(self, video_id, limit=100):
+        """Like `iter_pages`, but yields dicts with the comment id, text, publish time, author and like count."""
+        for results in self.iter_results(video_id, limit):
+            yield self._page_records(results)
+    
+    def iter_columns(self, video_id, limit=100):
+        """Like `iter_records`, but yields a CommentColumns (with like counts and authors) per page."""
+        for results in self.iter_results(video_id, limit):
+            yield CommentColumns.from_results(results)
+    
+    def fetch_columns(self, video_id, limit=100):
+        """Top-level comments as one CommentColumns, newest first."""
+        return CommentColumns.concat(self.iter_columns(video_id, limit))
+    
+    def iter_results(self, video_id, limit=100):
+        """Yields raw commentThreads.list responses, newest threads first."""
+        remaining = limit
+        page_token = None
+        
+        while remaining > 0:
+            batch_size = min(remaining, 100)
+            results = self.client.get_comment_threads(
+                video_id, 
+                batch_size, 
+                page_token
+            )
+            
+            if not results or "items" not in results:
+                break
+                
+            yield results
+            remaining -= batch_size
+            page_token = results.get("nextPageToken")
+            
+            if not page_token:
+                break
+    
+    @staticmethod
+    def _page_texts(results):
+        texts = []
+        for item in results.get("items", []):
+            comment = item["snippet"]["topLevelComment"]
+            texts.append(comment["snippet"]["textDisplay"])
+        return texts
     
-    def _process_batch(self, results):
+    @staticmethod
+    def _page_records(results):
+        records = []
         for item in results.get("items", []):
             comment = item["snippet"]["topLevelComment"]
-            text = comment["snippet"]["textDisplay"]
-            self.comments.append(text)
\ No newline at end of file
+            snippet = comment["snippet"]
+            records.append({
+                'id': comment.get("id") or item.get("id"),
+                'text': snippet["textDisplay"],
+                'published_at': snippet.get("publishedAt"),
+                'author': snippet.get("authorDisplayName") or '',
+                'author_channel_id': snippet.get("authorChannelId", {}).get("value") or '',
+                'like_count': snippet.get("likeCount", 0),
+            })
+        return records
\ No newline at end of file
@@ -0,0 +1,190 @@
+"""
+Quota-aware rate limiting for the YouTube Data API.
+
+Every API key has a daily quota (10,000 units by default; commentThreads.list
+and comments.list cost 1 unit each) that resets at midnight Pacific time,
+and a token bucket capping its request rate. `QuotaLimiter.reserve(cost)`
+picks the key that can send soonest, charges its quota and returns how long
+the caller must wait - the limiter's lock is never held while waiting, so one
+throttled thread does not stall the others. With several keys, requests
+rotate across them and throughput grows with the number of keys.
+
+A key the API reports as out of quota is retired until the next reset; when
+every key is out, `QuotaExceeded` is raised at once instead of retrying.
+With no key configured at all the limiter still builds, and every request
+raises `MissingAPIKey` (a QuotaExceeded), so the service starts and reports
+the problem per request.
+
+Waiting (throttling and retry backoff) sleeps the calling thread. Fetches run
+on worker threads (`asyncio.to_thread`, the reply pool), never on an event
+loop, so a throttled fetch holds only its own thread.
+"""
+import datetime
+import random
+import threading
+import time
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+    try:
+        QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+    except ZoneInfoNotFoundError:
+        QUOTA_TIMEZONE = datetime.timezone(datetime.timedelta(hours=-8))
+except ImportError:
+    QUOTA_TIMEZONE = datetime.timezone(datetime.timedelta(hours=-8))
+
+DEFAULT_DAILY_QUOTA = 10_000
+# API error reasons meaning the key's quota is spent for the day
+QUOTA_REASONS = frozenset(("quotaExceeded", "dailyLimitExceeded"))
+
+
+class QuotaExceeded(Exception):
+    """Raised when no configured API key has quota left for the day."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        # Seconds until the quota resets
+        self.retry_after = retry_after
+
+
+class MissingAPIKey(QuotaExceeded):
+    """Raised on every request when no YouTube API key is configured."""
+
+
+class TokenBucket:
+    """
+    `rate` requests per second with bursts of up to `burst`. Tokens may be
+    taken ahead of time (the balance goes negative); the returned delay is
+    when the borrowed token would have been available.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def delay(self, now):
+        """Seconds until a token is free, without taking it."""
+        tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        return max(0.0, (1 - tokens) / self.rate)
+
+    def take(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate) - 1
+        self.updated = now
+        return max(0.0, -self.tokens / self.rate)
+
+
+class _KeyState:
+    def __init__(self, key, bucket):
+        self.key = key
+        self.bucket = bucket
+        self.used = 0
+        self.requests = 0
+        self.exhausted = False
+
+
+class QuotaLimiter:
+    def __init__(self, keys, daily_quota=DEFAULT_DAILY_QUOTA, rate=None, burst=10, seed=None):
+        keys = [key for key in dict.fromkeys(keys) if key]
+        self.daily_quota = daily_quota
+        # `rate` is requests per second per key; None leaves only the quota
+        self.rate = rate
+        self.keys = [_KeyState(key, TokenBucket(rate, burst) if rate else None) for key in keys]
+        self.throttled = 0
+        self.throttled_seconds = 0.0
+        self.retries = 0
+        self.quota_errors = 0
+        self._day = self._quota_day()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def reserve(self, cost=1):
+        """(key, seconds to wait before sending); raises QuotaExceeded when no key has `cost` units left."""
+        if not self.keys:
+            raise MissingAPIKey("No YouTube API key configured: set YOUTUBE_API_KEY or YOUTUBE_API_KEYS")
+        with self._lock:
+            self._roll_day()
+            now = time.monotonic()
+            available = [
+                state for state in self.keys
+                if not state.exhausted and state.used + cost <= self.daily_quota
+            ]
+            if not available:
+                raise QuotaExceeded(
+                    f"Daily YouTube quota spent on all {len(self.keys)} API key(s)",
+                    retry_after=self.seconds_until_reset(),
+                )
+            # Soonest free token first, then the least used key
+            state = min(available, key=lambda s: (s.bucket.delay(now) if s.bucket else 0.0, s.used))
+            delay = state.bucket.take(now) if state.bucket else 0.0
+            state.used += cost
+            state.requests += 1
+            if delay:
+                self.throttled += 1
+                self.throttled_seconds += delay
+            return state.key, delay
+
+    def acquire(self, cost=1):
+        key, delay = self.reserve(cost)
+        if delay:
+            time.sleep(delay)
+        return key
+
+    def exhaust(self, key):
+        """Retires `key` until the next quota reset, after the API reported it out of quota."""
+        with self._lock:
+            self.quota_errors += 1
+            for state in self.keys:
+                if state.key == key:
+                    state.exhausted = True
+
+    def backoff(self, attempt, base=1.0, cap=32.0):
+        """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+        with self._lock:
+            self.retries += 1
+            return self._rng.uniform(0, min(cap, base * 2 ** attempt))
+
+    def seconds_until_reset(self):
+        now = datetime.datetime.now(QUOTA_TIMEZONE)
+        midnight = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time(), now.tzinfo)
+        return (midnight - now).total_seconds()
+
+    def stats(self):
+        """Quota and throttling metrics; keys are shown by their last four characters only."""
+        with self._lock:
+            self._roll_day()
+            keys = [
+                {
+                    'key': f"...{state.key[-4:]}",
+                    'used': state.used,
+                    'remaining': 0 if state.exhausted else max(self.daily_quota - state.used, 0),
+                    'requests': state.requests,
+                    'exhausted': state.exhausted,
+                }
+                for state in self.keys
+            ]
+            return {
+                'configured': bool(keys),
+                'keys': keys,
+                'daily_quota': self.daily_quota,
+                'remaining': sum(key['remaining'] for key in keys),
+                'rate_per_key': self.rate,
+                'throttled': self.throttled,
+                'throttled_seconds': round(self.throttled_seconds, 3),
+                'retries': self.retries,
+                'quota_errors': self.quota_errors,
+                'resets_in_seconds': round(self.seconds_until_reset()),
+            }
+
+    def _roll_day(self):
+        day = self._quota_day()
+        if day != self._day:
+            self._day = day
+            for state in self.keys:
+                state.used = 0
+                state.exhausted = False
+
+    @staticmethod
+    def _quota_day():
+        return datetime.datetime.now(QUOTA_TIMEZONE).date()
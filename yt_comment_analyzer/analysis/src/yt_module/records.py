@@ -0,0 +1,56 @@
+"""
+Columnar comment records.
+
+One `CommentColumns` holds a page (or a whole fetch) of top-level comments
+as parallel columns: ids, texts and authors as lists, publish times as a
+`datetime64[s]` array and like counts as an `int64` array. Numeric columns
+cost 8 bytes a comment and feed NumPy aggregations without a per-comment
+Python object.
+"""
+import numpy as np
+
+
+class CommentColumns:
+    def __init__(self, ids, texts, authors, author_channel_ids, published, likes):
+        self.ids = ids
+        self.texts = texts
+        self.authors = authors
+        self.author_channel_ids = author_channel_ids
+        # UTC; NaT where the API gave no publishedAt
+        self.published = published
+        self.likes = likes
+
+    def __len__(self):
+        return len(self.texts)
+
+    @classmethod
+    def from_results(cls, results):
+        """Columns of one commentThreads.list response."""
+        snippets = []
+        ids = []
+        for item in results.get("items", []):
+            comment = item["snippet"]["topLevelComment"]
+            ids.append(comment.get("id") or item.get("id"))
+            snippets.append(comment["snippet"])
+        return cls(
+            ids,
+            [snippet["textDisplay"] for snippet in snippets],
+            [snippet.get("authorDisplayName") for snippet in snippets],
+            [snippet.get("authorChannelId", {}).get("value") for snippet in snippets],
+            # publishedAt is always UTC ("...Z"); NumPy parses it without the suffix
+            np.array([(snippet.get("publishedAt") or "NaT").rstrip("Z") for snippet in snippets],
+                     dtype="datetime64[s]"),
+            np.array([snippet.get("likeCount", 0) for snippet in snippets], dtype=np.int64),
+        )
+
+    @classmethod
+    def concat(cls, pages):
+        pages = list(pages)
+        return cls(
+            [i for page in pages for i in page.ids],
+            [text for page in pages for text in page.texts],
+            [author for page in pages for author in page.authors],
+            [channel for page in pages for channel in page.author_channel_ids],
+            np.concatenate([page.published for page in pages]) if pages else np.array([], dtype="datetime64[s]"),
+            np.concatenate([page.likes for page in pages]) if pages else np.array([], dtype=np.int64),
+        )
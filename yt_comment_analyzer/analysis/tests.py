@@ -1,3 +1,904 @@
-from django.test import TestCase
+import io
+import json
+import math
+import os
+import subprocess
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from unittest import mock
 
-# Create your tests here.
+import emoji
+import numpy as np
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.utils import timezone as django_timezone
+from nltk.sentiment import SentimentIntensityAnalyzer
+from textblob import TextBlob
+
+from analysis.comment_store import CommentStore
+from analysis.history import TOXIC_TOP_K, AnalysisHistory
+from analysis.jobs import JobManager, JobQueueFull
+from analysis.models import AnalysisJob, AnalysisRun, Comment, Video
+from analysis.pipeline import PipelineState, StreamingAnalysisPipeline
+from analysis.src.analysis.aggregates import ExactSum
+from analysis.src.analysis.batch import score_comment_sets
+from analysis.src.analysis.sampling import margin, mean_interval, sample_size, wilson_interval
+from analysis.src.analysis.cache import ResponseCache, ScoreCache, score_unique, text_key
+from analysis.src.analysis.emojis import EmojiAnalyzer
+from analysis.src.analysis.geminiAnalyzer import YouTubeCommentAnalyzerWithAI, format_comments
+from analysis.src.analysis.local_model import LocalResponse
+from analysis.src.analysis.sentiment import BUCKETS, SentimentAnalyzer
+from analysis.src.analysis.textblob_batch import TextBlobBatchScorer
+from analysis.src.analysis.timeline import TimelineAccumulator, sentiment_timeline
+from analysis.src.analysis.vader_batch import VaderBatchScorer
+from analysis.src.benchmarks.corpus import synthetic_comments
+from analysis.src.processing.dedup import MinHasher, NearDuplicateIndex, collapse, normalize
+from analysis.src.processing.preprocess import preprocess
+from analysis.src.yt_module.rate_limit import MissingAPIKey, QuotaExceeded, QuotaLimiter
+
+# Negation, boosters, caps, punctuation runs, emoticons, contractions and
+# "but" clauses: the rules the batch engines re-implement
+TRICKY_COMMENTS = [
+    "",
+    "   ",
+    "good",
+    "not good",
+    "not bad at all",
+    "never so good",
+    "GOOD",
+    "GOOD movie, bad ending",
+    "good!!!",
+    "good!!!!!!",
+    "good?",
+    "good??? really?",
+    "very good",
+    "kind of good",
+    "extremely bad",
+    "it was good but the ending was terrible",
+    "the ending was terrible, but it was good",
+    "I don't like it :(",
+    "love it :) <3",
+    "xD lol",
+    "isn't it great",
+    "without doubt the best",
+    "least helpful video",
+    "(!) sure",
+    "great (!)",
+    "U.S. etc. Mr. Smith was ok...",
+    "“quoted” 'good' \"bad\"",
+    "ÉCOLE ΣΑΣ 很好",
+    "no no no no",
+    "nice\n\nnot nice",
+    "really!! really?? REALLY",
+]
+
+
+class EngineParityTests(SimpleTestCase):
+    """The NumPy/lexicon batch engines must give exactly the library scores."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.comments = TRICKY_COMMENTS + synthetic_comments(200, seed=11)
+
+    def test_vader_batch_matches_nltk(self):
+        sid = SentimentIntensityAnalyzer()
+        scores = VaderBatchScorer(sid.lexicon).score(self.comments)
+        for comment, score in zip(self.comments, scores):
+            with self.subTest(comment=comment):
+                self.assertEqual(score, sid.polarity_scores(comment)['compound'])
+
+    def test_textblob_batch_matches_textblob(self):
+        scores = TextBlobBatchScorer().score(self.comments)
+        for comment, score in zip(self.comments, scores):
+            with self.subTest(comment=comment):
+                self.assertEqual(score, TextBlob(comment).sentiment.polarity)
+
+
+def categorize(score):
+    """The per-score if/elif chain `_bucket_counts` replaced."""
+    if score == 0:
+        return 'neutral'
+    elif 0 < score <= 0.3:
+        return 'wpositive'
+    elif 0.3 < score <= 0.6:
+        return 'positive'
+    elif 0.6 < score <= 1:
+        return 'spositive'
+    elif -0.3 < score <= 0:
+        return 'wnegative'
+    elif -0.6 < score <= -0.3:
+        return 'negative'
+    elif -1 <= score <= -0.6:
+        return 'snegative'
+    return None
+
+
+class BucketCountTests(SimpleTestCase):
+    EDGES = [
+        -1.5, -1.0, -0.6000001, -0.6, -0.5999999, -0.3000001, -0.3, -0.2999999, -1e-12, -0.0,
+        0.0, 1e-12, 0.2999999, 0.3, 0.3000001, 0.5999999, 0.6, 0.6000001, 1.0, 1.5, math.nan,
+    ]
+
+    def test_edges_match_the_if_chain(self):
+        for score in self.EDGES:
+            with self.subTest(score=score):
+                counts = dict(zip(BUCKETS, SentimentAnalyzer._bucket_counts(np.array([score])).tolist()))
+                expected = categorize(score)
+                self.assertEqual(counts, {bucket: int(bucket == expected) for bucket in BUCKETS})
+
+    def test_counts_of_many_scores(self):
+        scores = np.array(self.EDGES * 3 + np.random.default_rng(0).uniform(-1.2, 1.2, 1000).round(1).tolist())
+        counts = dict(zip(BUCKETS, SentimentAnalyzer._bucket_counts(scores).tolist()))
+        expected = {bucket: 0 for bucket in BUCKETS}
+        for score in scores.tolist():
+            if categorize(score) is not None:
+                expected[categorize(score)] += 1
+        self.assertEqual(counts, expected)
+
+
+class KeywordToxicity:
+    def analyze(self, comments):
+        return [(comment, 0.9) for comment in comments if "idiot" in comment]
+
+    def analyze_many(self, comment_lists):
+        return [self.analyze(comments) for comments in comment_lists]
+
+
+class PipelineStateTests(SimpleTestCase):
+    """Merged, restored and truncated states must equal one pass over the same comments."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.sentiment = SentimentAnalyzer()
+        cls.pipeline = StreamingAnalysisPipeline(None, cls.sentiment, KeywordToxicity(), EmojiAnalyzer())
+        extras = [
+            "you idiot 😡", "🔥🔥 http://x.y @bob", "😀", "idiot", "@a @b 👍🏽 nice", "👨‍👩‍👧 family", "",
+        ]
+        cls.comments = [
+            text if i % 3 else f"{text} {extras[i % len(extras)]}"
+            for i, text in enumerate(synthetic_comments(900, seed=5))
+        ]
+
+    def run_state(self, comments, bounded=False, removable=False):
+        state = PipelineState(self.sentiment, bounded=bounded, removable=removable)
+        for start in range(0, len(comments), 100):
+            self.pipeline.process_page(comments[start:start + 100], state)
+        return state
+
+    @staticmethod
+    def summary(state):
+        return {
+            'vader': state.vader.result(),
+            'textblob': state.textblob.result(),
+            'toxic': state.toxic(),
+            'toxic_count': state.toxic_count,
+            'emojis': state.emoji_counter.most_common(),
+            'urls': state.urls,
+            'mentions': state.mentions,
+            'total_comments': state.total_comments,
+        }
+
+    def test_merge_equals_single_pass(self):
+        expected = self.summary(self.run_state(self.comments))
+        for split in (0, 1, 350, 900):
+            with self.subTest(split=split):
+                state = self.run_state(self.comments[:split])
+                state.merge(self.run_state(self.comments[split:]))
+                self.assertEqual(self.summary(state), expected)
+
+    def test_bounded_merge_equals_single_pass(self):
+        expected = self.summary(self.run_state(self.comments, bounded=True))
+        state = self.run_state(self.comments[:400], bounded=True)
+        state.merge(self.run_state(self.comments[400:], bounded=True))
+        merged = self.summary(state)
+        for engine in ('vader', 'textblob'):
+            # The sum of squares is added in another order
+            self.assertAlmostEqual(merged[engine]['std'], expected[engine]['std'], places=12)
+            merged[engine]['std'] = expected[engine]['std']
+        self.assertEqual(merged, expected)
+
+    def test_from_state_round_trip(self):
+        state = self.run_state(self.comments, removable=True)
+        aggregates, arrays = state.to_state()
+        # Through JSON and .npz, as AnalysisHistory stores it
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **arrays)
+        buffer.seek(0)
+        with np.load(buffer) as loaded:
+            arrays = {name: loaded[name] for name in loaded.files}
+        restored = PipelineState.from_state(self.sentiment, json.loads(json.dumps(aggregates)), arrays)
+        self.assertEqual(self.summary(restored), self.summary(state))
+
+    def test_restored_state_merges_after_new_comments(self):
+        new, old = self.comments[:120], self.comments[120:]
+        aggregates, arrays = self.run_state(old, removable=True).to_state()
+        state = self.run_state(new, removable=True)
+        state.merge(PipelineState.from_state(self.sentiment, aggregates, arrays))
+        self.assertEqual(self.summary(state), self.summary(self.run_state(self.comments)))
+
+    def test_truncate_equals_pass_over_the_kept_comments(self):
+        for count in (0, 1, 299, 899, 900):
+            with self.subTest(count=count):
+                state = self.run_state(self.comments, removable=True)
+                state.truncate(count)
+                self.assertEqual(self.summary(state), self.summary(self.run_state(self.comments[:count])))
+
+    def test_clustered_states_cannot_merge(self):
+        clustered = PipelineState(self.sentiment, dedup_threshold=0.8)
+        with self.assertRaises(ValueError):
+            clustered.merge(PipelineState(self.sentiment, dedup_threshold=0.8))
+
+
+class BatchScoringTests(SimpleTestCase):
+    """Pooled scoring must give each video what the pipeline gives it alone."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.sentiment = SentimentAnalyzer()
+        copypasta = ["you idiot, subscribe now", "you idiot subscribe now!", "great video", "😀😀", ""]
+        cls.comment_sets = [
+            synthetic_comments(300, seed=1) + copypasta * 20,
+            [],
+            copypasta * 3 + synthetic_comments(50, seed=2),
+        ]
+
+    def expected(self, comments, dedup_threshold):
+        state = PipelineState(self.sentiment, dedup_threshold=dedup_threshold)
+        pipeline = StreamingAnalysisPipeline(None, self.sentiment, KeywordToxicity(), EmojiAnalyzer())
+        pipeline.process_page(comments, state)
+        return {
+            'sentiment': {'vader': state.vader.result(), 'textblob': state.textblob.result()},
+            'toxicity': {'bert': state.toxic(), 'toxic_count': state.toxic_count},
+            'clusters': state.dedup.summary() if state.dedup else None,
+        }
+
+    def test_matches_pipeline_per_video(self):
+        for threshold in (None, 0.8):
+            new_index = partial(NearDuplicateIndex, threshold) if threshold else None
+            # Cleaned as batch_report cleans them; the pipeline cleans its own input
+            cleaned_sets = [[preprocess(comment).cleaned for comment in comments] for comments in self.comment_sets]
+            results = score_comment_sets(cleaned_sets, self.sentiment, KeywordToxicity(), new_index)
+            for comments, result in zip(self.comment_sets, results):
+                with self.subTest(threshold=threshold, comments=len(comments)):
+                    self.assertEqual(result, self.expected(comments, threshold))
+
+
+class CommandLineAppTests(SimpleTestCase):
+    """analysis/src/app.py runs with analysis/src on sys.path, not the Django project."""
+
+    SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src')
+
+    def test_app_imports_and_clusters_like_the_api(self):
+        completed = subprocess.run(
+            [sys.executable, '-c', 'import app; print(app.NEAR_DUPLICATE_THRESHOLD)'],
+            cwd=self.SRC_DIR, capture_output=True, text=True, timeout=300,
+        )
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        self.assertEqual(float(completed.stdout.split()[-1]), settings.NEAR_DUPLICATE_THRESHOLD)
+
+
+class CommentSection:
+    """A CommentFetcher stand-in whose `post()` adds newer comments."""
+
+    def __init__(self, comments, same_minute=1):
+        self.same_minute = same_minute
+        self.records = []
+        self.fetched = 0
+        self.post(comments)
+
+    def post(self, comments):
+        start = len(self.records)
+        newest = [self.record(number) for number in range(start + comments - 1, start - 1, -1)]
+        self.records = newest + self.records
+
+    def record(self, number):
+        published = datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=number // self.same_minute)
+        return {
+            'id': f"c{number}", 'text': f"comment {number}", 'published_at': published.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'author': f"user{number % 7}", 'author_channel_id': '', 'like_count': number % 5,
+        }
+
+    def iter_records(self, video_id, limit=100):
+        records = self.records[:limit]
+        for start in range(0, len(records), 100):
+            self.fetched += len(records[start:start + 100])
+            yield records[start:start + 100]
+
+    def texts(self, limit):
+        return [record['text'] for record in self.records[:limit]]
+
+
+class CommentStoreTests(TestCase):
+    """The store must answer like a fresh fetch of the newest `limit` comments."""
+
+    def store(self, section, max_age=0, page_size=100):
+        return CommentStore(section, max_age=max_age, page_size=page_size)
+
+    def test_refresh_fetches_only_new_comments(self):
+        section = CommentSection(300)
+        self.assertEqual(self.store(section).fetch_comments('v', 300), section.texts(300))
+        section.post(50)
+        section.fetched = 0
+        self.assertEqual(self.store(section).fetch_comments('v', 300), section.texts(300))
+        self.assertEqual(section.fetched, 100)
+        self.assertEqual(Comment.objects.count(), 350)
+
+    def test_more_new_comments_than_the_limit_leave_no_gap(self):
+        # Refreshed (enough stored comments) and fetched afresh (too few)
+        for stored, limit in ((100, 80), (100, 500)):
+            with self.subTest(stored=stored, limit=limit):
+                Video.objects.all().delete()
+                section = CommentSection(stored)
+                self.store(section).fetch_comments('v', stored)
+                section.post(limit + 100)
+                self.assertEqual(self.store(section).fetch_comments('v', limit), section.texts(limit))
+                self.assertEqual(
+                    list(Comment.objects.order_by('-published_at').values_list('text', flat=True)),
+                    section.texts(limit),
+                )
+                # Served from the store alone, with nothing missing in between
+                fetched = section.fetched
+                self.assertEqual(self.store(section, max_age=600).fetch_comments('v', limit), section.texts(limit))
+                self.assertEqual(section.fetched, fetched)
+
+    def test_full_fetch_reaching_stored_comments_keeps_them(self):
+        section = CommentSection(100)
+        self.store(section).fetch_comments('v', 100)
+        section.post(150)
+        self.assertEqual(self.store(section).fetch_comments('v', 200), section.texts(200))
+        self.assertEqual(Comment.objects.count(), 250)
+        self.assertEqual(self.store(section, max_age=600).fetch_comments('v', 250), section.texts(250))
+
+    def test_keyset_pages_cover_ties_once(self):
+        # Runs of comments published in the same minute straddle page edges
+        section = CommentSection(230, same_minute=9)
+        self.store(section).fetch_comments('v', 230)
+        store = self.store(section, max_age=600, page_size=7)
+        pages = list(store.iter_pages('v', 230))
+        self.assertTrue(all(len(page) == 7 for page in pages[:-1]))
+        texts = [text for page in pages for text in page]
+        self.assertEqual(sorted(texts), sorted(section.texts(230)))
+        self.assertEqual(len(set(texts)), 230)
+        self.assertEqual(store.fetch_comments('v', 40), texts[:40])
+
+
+class VerboseModel:
+    """Answers every prompt with the same long report, and counts the prompts."""
+
+    def __init__(self, words=400):
+        self.model_name = 'verbose'
+        self.calls = 0
+        self.report = json.dumps({
+            'summary': ["word " * words], 'public_demands': ["more"], 'suggestions': ["less"],
+        })
+
+    def generate_content(self, prompt, generation_config=None):
+        self.calls += 1
+        return LocalResponse(self.report)
+
+
+class MapReduceTests(SimpleTestCase):
+    def test_reports_longer_than_half_the_budget_still_merge(self):
+        model = VerboseModel()
+        comments = synthetic_comments(200, seed=3)
+        analyzer = YouTubeCommentAnalyzerWithAI(comments, token_budget=600, max_concurrency=2, model=model)
+        self.assertEqual(analyzer.get_public_demand(), "1. more")
+        chunks = len(analyzer._chunk(format_comments(comments).splitlines()))
+        # One call per chunk, then about one merge per pair of notes
+        self.assertGreater(chunks, 2)
+        self.assertLessEqual(model.calls, 2 * chunks + 1)
+
+
+class NearDuplicateTests(SimpleTestCase):
+    COPYPASTA = [
+        "first!! who is watching in 2025",
+        "First who is watching in 2025?",
+        "FIRST!!! who is watching in 2025 😂",
+        "first who is watching in 2025 lol",
+    ]
+
+    def test_variants_cluster_and_distinct_comments_do_not(self):
+        comments = self.COPYPASTA + synthetic_comments(200, seed=4)
+        index, cluster_ids = collapse(comments, 0.8)
+        self.assertEqual(len(set(cluster_ids[:4])), 1)
+        self.assertEqual(index.representatives[cluster_ids[0]], self.COPYPASTA[0])
+        self.assertNotIn(cluster_ids[0], cluster_ids[4:])
+        self.assertIn({'representative': self.COPYPASTA[0], 'size': 4}, index.largest(len(comments)))
+
+    def test_signatures_estimate_jaccard(self):
+        hasher = MinHasher(num_perm=256)
+        pairs = [("the quick brown fox jumps", "the quick brown fox leaps"), ("good video", "terrible audio mix")]
+        for a, b in pairs:
+            with self.subTest(a=a, b=b):
+                shingles_a, shingles_b = set(hasher.shingle_hashes(a).tolist()), set(hasher.shingle_hashes(b).tolist())
+                jaccard = len(shingles_a & shingles_b) / len(shingles_a | shingles_b)
+                estimate = (hasher.signature(a) == hasher.signature(b)).mean()
+                self.assertAlmostEqual(estimate, jaccard, delta=0.1)
+
+    def test_wordless_comments_are_left_unclustered(self):
+        index = NearDuplicateIndex(0.8)
+        self.assertEqual(index.add_many(["😂😂", "!!!", "😂😂"]), [(None, True)] * 3)
+        self.assertEqual(index.summary()['clusters'], 0)
+
+    def test_max_clusters_bounds_memory(self):
+        index = NearDuplicateIndex(0.8, max_clusters=10)
+        comments = self.COPYPASTA + synthetic_comments(100, seed=6)
+        results = index.add_many(comments + self.COPYPASTA)
+        self.assertEqual(len(index.sizes), 10)
+        self.assertEqual(index.sizes[0], 8)
+        self.assertEqual(results[-4:], [(0, False)] * 4)
+        self.assertEqual(index.summary()['clusters'], 10 + index.unclustered)
+        # Every comment with words is in a cluster or counted as unclustered
+        with_words = sum(1 for comment in comments + self.COPYPASTA if normalize(comment))
+        self.assertEqual(sum(index.sizes) + index.unclustered, with_words)
+
+
+class ToxicityBackendTests(SimpleTestCase):
+    def test_quantized_weights_load_as_a_plain_state_dict(self):
+        import torch
+        from transformers import AutoModelForSequenceClassification, RobertaConfig
+
+        from analysis.src.analysis.toxicity_backends import QUANTIZED_WEIGHTS, QuantizedTorchBackend
+
+        config = RobertaConfig(
+            vocab_size=50, hidden_size=16, num_hidden_layers=1, num_attention_heads=2, intermediate_size=32,
+        )
+        torch.manual_seed(0)
+        exported = QuantizedTorchBackend._quantize(AutoModelForSequenceClassification.from_config(config))
+        inputs = {
+            'input_ids': torch.tensor([[0, 5, 7, 2], [0, 9, 2, 1]]),
+            'attention_mask': torch.tensor([[1, 1, 1, 1], [1, 1, 1, 0]]),
+        }
+        with tempfile.TemporaryDirectory() as model_dir:
+            config.save_pretrained(model_dir)
+            torch.save(exported.state_dict(), os.path.join(model_dir, QUANTIZED_WEIGHTS))
+            backend = QuantizedTorchBackend('not-downloaded', model_dir)
+        with torch.inference_mode():
+            expected = torch.softmax(exported(**inputs).logits, dim=-1)[:, 1].tolist()
+        self.assertEqual(backend.predict(inputs), expected)
+
+    def test_check_parity(self):
+        from analysis.src.analysis.toxicity_backends import check_parity
+
+        parity = check_parity([0.1, 0.6, 0.9], [0.12, 0.45, 0.9], atol=0.05)
+        self.assertFalse(parity['passed'])
+        self.assertAlmostEqual(parity['max_abs_diff'], 0.15)
+        self.assertAlmostEqual(parity['label_agreement'], 2 / 3)
+        self.assertTrue(check_parity([0.1, 0.6], [0.12, 0.61])['passed'])
+        self.assertTrue(check_parity([], [])['passed'])
+
+
+def old_clean_text(text):
+    """clean_text before the single-pass preprocess: emoji out, then URLs."""
+    return re.sub(r'http\S+', '', emoji.replace_emoji(text, replace='')).strip()
+
+
+class PreprocessTests(SimpleTestCase):
+    """preprocess must clean and find emoji exactly as clean_text and emoji.analyze did."""
+
+    COMMENTS = TRICKY_COMMENTS + [
+        "go to http😂", "go to http\ufe0f now", "http😂x y", "https://a.b/c😂 nice", "see http", "http:",
+        "@bob http://x.y/z", "@bobhttp://x.y", "hi @a.b-c!", "@", "email a@b.c", "1️⃣ #️⃣ #1 ℹ️ info",
+        "👨‍👩‍👧‍👦 family 👍🏽👍", "🇫🇷🇩🇪 flags", "❤\ufe0f\ufe0f", "😂\u200d", "😂\u200d\u200d😂", "a\u200db",
+        "🏳️‍🌈", "\u263a plain", "😀😀😀 http://x.io?q=😀 end",
+    ]
+
+    def test_matches_clean_text_and_emoji_analyze(self):
+        for comment in self.COMMENTS + synthetic_comments(300, seed=8):
+            with self.subTest(comment=comment):
+                processed = preprocess(comment)
+                self.assertEqual(processed.cleaned, old_clean_text(comment))
+                self.assertEqual(list(processed.emojis), EmojiAnalyzer.extract_emojis(comment))
+
+    def test_counts_urls_and_mentions(self):
+        self.assertEqual(preprocess("@a @b.c http://x https://y @bobhttp://z").mentions, 3)
+        self.assertEqual(preprocess("@a @b.c http://x https://y @bobhttp://z").urls, 3)
+        self.assertEqual(preprocess("go to http😂").urls, 0)
+
+    def test_emoji_inside_http_are_not_bridged(self):
+        # The one known difference: clean_text removed the emoji, then the URL
+        self.assertEqual(old_clean_text("ht😂tp://x"), "")
+        self.assertEqual(preprocess("ht😂tp://x").cleaned, "http://x")
+
+
+class ExactSumTests(SimpleTestCase):
+    # Huge, subnormal and signed-zero values next to ordinary scores
+    VALUES = (
+        [0.1] * 10 + [1e308, -1e308, 5e-324, -0.0, 2.5e-320, 1 / 3, -2 / 3]
+        + np.random.default_rng(2).uniform(-1, 1, 5000).tolist()
+    )
+
+    def test_mean_is_correctly_rounded_however_batched(self):
+        expected = statistics.mean(self.VALUES)
+        for size in (1, 7, 1000, len(self.VALUES)):
+            with self.subTest(size=size):
+                total = ExactSum()
+                for start in range(0, len(self.VALUES), size):
+                    total.add(np.array(self.VALUES[start:start + size]))
+                self.assertEqual(total.mean(len(self.VALUES)), expected)
+
+    def test_adding_negated_values_subtracts_exactly(self):
+        total = ExactSum()
+        total.add(self.VALUES)
+        total.add([-value for value in self.VALUES[100:]])
+        self.assertEqual(total.mean(100), statistics.mean(self.VALUES[:100]))
+
+    def test_nan_is_refused(self):
+        with self.assertRaises(ValueError):
+            ExactSum().add([0.5, math.nan])
+
+
+class ScoreCacheTests(SimpleTestCase):
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = ScoreCache(max_entries=3)
+        cache.put_many('vader', [('a', 0.1), ('b', 0.2), ('c', 0.3)])
+        cache.get_many('vader', ['a'])
+        cache.put_many('vader', [('d', 0.4)])
+        self.assertEqual(cache.get_many('vader', ['a', 'b', 'c', 'd']), {'a': 0.1, 'c': 0.3, 'd': 0.4})
+        self.assertEqual(cache.hit_rates()['entries'], 3)
+
+    def test_namespaces_hold_separate_scores(self):
+        cache = ScoreCache()
+        cache.put_many('vader', [('a', 0.1)])
+        cache.put_many('textblob', [('a', -0.5)])
+        self.assertEqual(cache.get_many('textblob', ['a']), {'a': -0.5})
+        self.assertEqual(cache.get_many('bert', ['a']), {})
+
+    def test_score_unique_scores_each_text_once(self):
+        cache = ScoreCache()
+        calls = []
+
+        def scorer(texts):
+            calls.append(list(texts))
+            return [len(text) for text in texts]
+
+        texts = ["good", "good ", "bad", "Good", "good"]
+        self.assertEqual(score_unique(texts, scorer, cache, 'len'), [4, 4, 3, 4, 4])
+        self.assertEqual(calls, [["good", "bad", "Good"]])
+        self.assertEqual(score_unique(["bad", "new"], scorer, cache, 'len'), [3, 3])
+        self.assertEqual(calls[-1], ["new"])
+        stats = cache.hit_rates()['namespaces']['len']
+        self.assertEqual((stats['hits'], stats['misses'], stats['duplicates']), (1, 4, 2))
+
+    def test_saved_cache_reloads_its_newest_entries(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'scores.pickle')
+            cache = ScoreCache(max_entries=10)
+            cache.path = path
+            cache.put_many('vader', [(text_key(str(i)), i / 10) for i in range(10)])
+            cache.save()
+            reloaded = ScoreCache(max_entries=4)
+            reloaded.path = path
+            reloaded.load()
+        keys = [text_key(str(i)) for i in range(10)]
+        self.assertEqual(reloaded.get_many('vader', keys), {key: i / 10 for i, key in enumerate(keys) if i >= 6})
+
+
+class ResponseCacheTests(SimpleTestCase):
+    REPORT = {'summary': ["fine"], 'public_demands': [], 'suggestions': []}
+
+    def test_entry_and_byte_bounds_evict_least_recently_used(self):
+        size = len(json.dumps(self.REPORT).encode())
+        cache = ResponseCache(max_entries=3, max_bytes=10 * size)
+        for key in 'abc':
+            cache.put(key, self.REPORT)
+        cache.get('a')
+        cache.put('d', self.REPORT)
+        self.assertEqual([cache.get(key) is not None for key in 'abcd'], [True, False, True, True])
+
+        cache = ResponseCache(max_entries=10, max_bytes=2 * size)
+        for key in 'abc':
+            cache.put(key, self.REPORT)
+        self.assertEqual(cache.stats()['entries'], 2)
+        self.assertEqual(cache.stats()['bytes'], 2 * size)
+        self.assertIsNone(cache.get('a'))
+        # Larger than the whole cache: not stored at all
+        cache.put('huge', {'summary': ["x" * 3 * size]})
+        self.assertIsNone(cache.get('huge'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_entries_expire(self):
+        cache = ResponseCache(ttl=60)
+        with mock.patch('analysis.src.analysis.cache.time.monotonic', return_value=1000.0):
+            cache.put('a', self.REPORT)
+        with mock.patch('analysis.src.analysis.cache.time.monotonic', return_value=1059.0):
+            self.assertEqual(cache.get('a'), self.REPORT)
+        with mock.patch('analysis.src.analysis.cache.time.monotonic', return_value=1060.0):
+            self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['expirations'], 1)
+        self.assertEqual(cache.stats()['bytes'], 0)
+
+    def test_same_comments_in_another_order_hit(self):
+        cache = ResponseCache()
+        model = VerboseModel(words=3)
+        comments = synthetic_comments(50, seed=12)
+        first = YouTubeCommentAnalyzerWithAI(comments, model=model, cache=cache).analyze()
+        again = YouTubeCommentAnalyzerWithAI(comments[::-1], model=model, cache=cache).analyze()
+        self.assertEqual(again, first)
+        self.assertEqual(model.calls, 1)
+        YouTubeCommentAnalyzerWithAI(comments[1:], model=model, cache=cache).analyze()
+        self.assertEqual(model.calls, 2)
+        self.assertNotEqual(ResponseCache.make_key('m', 'p', comments), ResponseCache.make_key('n', 'p', comments))
+
+
+class JobManagerTests(TransactionTestCase):
+    """Committed rows: job state is read back from worker threads."""
+
+    def setUp(self):
+        self.manager = JobManager(workers=1, max_queued=1)
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def blocked(self, value):
+        self.release.wait(10)
+        return {'value': value}
+
+    def wait_until_running(self, job):
+        deadline = time.monotonic() + 10
+        while self.manager.get(job.id).status == AnalysisJob.QUEUED and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_identical_jobs_are_deduplicated_while_in_flight(self):
+        job, created = self.manager.submit('sentiment', ('sentiment', 'v', 100), self.blocked, 1)
+        again, created_again = self.manager.submit('sentiment', ('sentiment', 'v', 100), self.blocked, 2)
+        self.assertEqual((created, created_again, again.id), (True, False, job.id))
+        self.release.set()
+        job = self.manager.wait(job, timeout=10)
+        self.assertEqual((job.status, job.result), (AnalysisJob.SUCCEEDED, {'value': 1}))
+        # Finished jobs no longer absorb new submissions
+        _, created = self.manager.submit('sentiment', ('sentiment', 'v', 100), self.blocked, 3)
+        self.assertTrue(created)
+
+    def test_full_queue_refuses_new_jobs(self):
+        running, _ = self.manager.submit('sentiment', ('sentiment', 'a', 100), self.blocked, 1)
+        self.wait_until_running(running)
+        queued, _ = self.manager.submit('sentiment', ('sentiment', 'b', 100), self.blocked, 2)
+        with self.assertRaises(JobQueueFull):
+            self.manager.submit('sentiment', ('sentiment', 'c', 100), self.blocked, 3)
+        # A duplicate of a waiting job is still answered
+        self.assertEqual(self.manager.submit('sentiment', ('sentiment', 'b', 100), self.blocked, 2)[0].id, queued.id)
+        self.release.set()
+        self.assertEqual(self.manager.wait(queued, timeout=10).result, {'value': 2})
+
+    def test_failures_are_recorded(self):
+        def fail():
+            raise RuntimeError("quota exceeded")
+
+        job, _ = self.manager.submit('sentiment', ('sentiment', 'v', 100), fail)
+        job = self.manager.wait(job, timeout=10)
+        self.assertEqual((job.status, job.error), (AnalysisJob.FAILED, "quota exceeded"))
+
+
+class QuotaLimiterTests(SimpleTestCase):
+    def test_requests_rotate_across_keys(self):
+        limiter = QuotaLimiter(['k1', 'k2', 'k1', '', 'k3'], daily_quota=100)
+        keys = [limiter.reserve()[0] for _ in range(9)]
+        self.assertEqual(sorted(keys), ['k1'] * 3 + ['k2'] * 3 + ['k3'] * 3)
+        self.assertEqual(limiter.stats()['remaining'], 291)
+
+    def test_spent_and_exhausted_keys_are_skipped_until_reset(self):
+        limiter = QuotaLimiter(['k1', 'k2'], daily_quota=3)
+        limiter.exhaust('k2')
+        self.assertEqual([limiter.reserve()[0] for _ in range(3)], ['k1'] * 3)
+        with self.assertRaises(QuotaExceeded) as raised:
+            limiter.reserve()
+        self.assertGreater(raised.exception.retry_after, 0)
+        self.assertNotIsInstance(raised.exception, MissingAPIKey)
+
+        tomorrow = limiter._day + timedelta(days=1)
+        with mock.patch.object(QuotaLimiter, '_quota_day', return_value=tomorrow):
+            self.assertEqual(limiter.stats()['remaining'], 6)
+            self.assertEqual(sorted(limiter.reserve(cost=3)[0] for _ in range(2)), ['k1', 'k2'])
+
+    def test_token_bucket_spaces_requests(self):
+        limiter = QuotaLimiter(['k1'], rate=2, burst=2)
+        # Every request at the same instant
+        now = limiter.keys[0].bucket.updated
+        with mock.patch('analysis.src.yt_module.rate_limit.time.monotonic', return_value=now):
+            delays = [limiter.reserve()[1] for _ in range(4)]
+        self.assertEqual(delays, [0.0, 0.0, 0.5, 1.0])
+        self.assertEqual((limiter.throttled, limiter.throttled_seconds), (2, 1.5))
+
+    def test_missing_key_is_reported_per_request(self):
+        limiter = QuotaLimiter(['', None])
+        with self.assertRaises(MissingAPIKey):
+            limiter.reserve()
+        self.assertFalse(limiter.stats()['configured'])
+
+
+class SamplingTests(SimpleTestCase):
+    def test_sample_sizes(self):
+        # The textbook figures: 385 for ±5% at 95%, fewer from a finite section
+        self.assertEqual(sample_size(0.05), 385)
+        self.assertEqual(sample_size(0.03, confidence=0.99), 1844)
+        self.assertEqual(sample_size(0.05, population=1000), 278)
+        self.assertEqual(sample_size(0.05, population=50), 45)
+        for error_bound, population in ((0.05, None), (0.02, None), (0.05, 1000), (0.01, 20000)):
+            with self.subTest(error_bound=error_bound, population=population):
+                n = sample_size(error_bound, population=population)
+                self.assertLessEqual(margin(n, population=population), error_bound)
+                self.assertGreater(margin(n - 1, population=population), error_bound)
+
+    def test_census_has_no_sampling_error(self):
+        self.assertEqual(margin(500, population=500), 0.0)
+        self.assertEqual(wilson_interval(30, 30, population=30), (1.0, 1.0))
+        self.assertEqual(mean_interval(0.2, 0.5, 100, population=100), (0.2, 0.2))
+
+    def test_wilson_interval(self):
+        low, high = wilson_interval(0, 10)
+        self.assertAlmostEqual(low, 0.0)
+        self.assertAlmostEqual(high, 0.2775, places=4)
+        low, high = wilson_interval(5, 10)
+        self.assertAlmostEqual(low + high, 1.0)
+        self.assertAlmostEqual(high - low, 0.5268, places=4)
+        self.assertEqual(wilson_interval(0, 0), (0.0, 1.0))
+
+    def test_intervals_cover_the_population_share(self):
+        # Samples of 40% of a known section, drawn without replacement: without
+        # the finite population correction the intervals would cover ~99%
+        rng = np.random.default_rng(7)
+        population = np.zeros(2000, dtype=bool)
+        population[:300] = True
+        trials, covered = 2000, 0
+        for _ in range(trials):
+            sample = rng.choice(population, size=800, replace=False)
+            low, high = wilson_interval(int(sample.sum()), len(sample), population=len(population))
+            covered += low <= 0.15 <= high
+        self.assertAlmostEqual(covered / trials, 0.95, delta=0.02)
+
+
+class TimelineTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        rng = np.random.default_rng(3)
+        start = np.datetime64('2025-01-01T00:00:00', 's')
+        # Some comments exactly on day and hour edges, and some without a publish time
+        offsets = np.concatenate([[0, 3599, 3600, 86399, 86400], rng.integers(0, 5 * 86400, 400)])
+        cls.published = start + offsets.astype('timedelta64[s]')
+        cls.published[[7, 50]] = np.datetime64('NaT')
+        # Multiples of 1/8 add up exactly in any order
+        cls.scores = {'vader': rng.integers(-8, 9, len(offsets)) / 8, 'textblob': rng.integers(-8, 9, len(offsets)) / 8}
+        cls.toxic = rng.random(len(offsets)) < 0.2
+        cls.likes = rng.integers(0, 30, len(offsets))
+
+    def expected_rows(self, width, like_weighted):
+        """One comment at a time, in plain Python."""
+        buckets = {}
+        for i, when in enumerate(self.published.tolist()):
+            if when is None:
+                continue
+            key = int(when.replace(tzinfo=timezone.utc).timestamp()) // width
+            buckets.setdefault(key, []).append(i)
+        rows = []
+        for key in sorted(buckets):
+            members = buckets[key]
+            start = datetime.fromtimestamp(key * width, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+            row = {'start': start, 'comments': len(members), 'likes': int(sum(self.likes[members]))}
+            for name, scores in self.scores.items():
+                values = [scores[i] for i in members]
+                row[name] = {
+                    'mean': round(sum(values) / len(values), 4),
+                    'negative_share': round(sum(v < 0 for v in values) / len(values), 4),
+                }
+                if like_weighted:
+                    weights = [self.likes[i] + 1 for i in members]
+                    weighted = sum(v * w for v, w in zip(values, weights)) / sum(weights)
+                    row[name]['weighted_mean'] = round(weighted, 4)
+            row['toxic'] = int(sum(self.toxic[members]))
+            row['toxic_share'] = round(row['toxic'] / len(members), 4)
+            rows.append(row)
+        return rows
+
+    def test_rows_match_per_comment_bucketing(self):
+        for bucket, width in (('hour', 3600), ('day', 86400)):
+            for like_weighted in (False, True):
+                with self.subTest(bucket=bucket, like_weighted=like_weighted):
+                    rows = sentiment_timeline(
+                        self.published, self.scores, toxic=self.toxic, likes=self.likes,
+                        bucket=bucket, like_weighted=like_weighted,
+                    )
+                    self.assertEqual(rows, self.expected_rows(width, like_weighted))
+
+    def test_pages_in_any_order_equal_one_pass(self):
+        expected = sentiment_timeline(
+            self.published, self.scores, toxic=self.toxic, likes=self.likes, like_weighted=True,
+        )
+        timeline = TimelineAccumulator(like_weighted=True)
+        # Newest-first pages, as the comment store reads them, of uneven sizes
+        edges = [0, 1, 90, 91, 300, len(self.published)]
+        for start, end in reversed(list(zip(edges, edges[1:]))):
+            timeline.update(
+                self.published[start:end], {name: scores[start:end] for name, scores in self.scores.items()},
+                toxic=self.toxic[start:end], likes=self.likes[start:end],
+            )
+        self.assertEqual(timeline.rows(), expected)
+
+    def test_arguments_are_checked(self):
+        with self.assertRaises(ValueError):
+            TimelineAccumulator('week')
+        with self.assertRaises(ValueError):
+            TimelineAccumulator(like_weighted=True).update(self.published, self.scores)
+        self.assertEqual(TimelineAccumulator().rows(), [])
+
+
+class StoredTimelineTests(TestCase):
+    def test_store_columns_give_the_fetched_timeline(self):
+        section = CommentSection(450, same_minute=20)
+        store = CommentStore(section, max_age=600, page_size=64)
+        store.fetch_comments('v', 450)
+        records = section.records
+        published = np.array([record['published_at'].rstrip('Z') for record in records], dtype='datetime64[s]')
+        scores = {'len': [len(record['text']) % 7 / 8 for record in records]}
+        likes = [record['like_count'] for record in records]
+        expected = sentiment_timeline(published, scores, likes=likes, bucket='hour', like_weighted=True)
+
+        timeline = TimelineAccumulator('hour', like_weighted=True)
+        for columns in store.iter_columns('v', 450):
+            scores = {'len': [len(text) % 7 / 8 for text in columns.texts]}
+            timeline.update(columns.published, scores, likes=columns.likes)
+        self.assertEqual(section.fetched, 450)
+        self.assertEqual(timeline.rows(), expected)
+
+
+def analysis_result(overall=0.5, toxic=30):
+    breakdown = {bucket: 1 for bucket in BUCKETS}
+    return {
+        'sentiment': {
+            engine: {'overall': overall, 'breakdown': breakdown} for engine in ('vader', 'textblob')
+        },
+        'toxicity': {'bert': [(f"toxic {i}", i / 100) for i in range(toxic)]},
+        'emojis': [("😂", 3)],
+        'total_comments': 100,
+    }
+
+
+class AnalysisHistoryTests(TestCase):
+    def age(self, runs, days):
+        AnalysisRun.objects.filter(id__in=[run.id for run in runs]).update(
+            created_at=django_timezone.now() - timedelta(days=days)
+        )
+
+    def test_stored_run_reads_back_with_top_toxic_comments(self):
+        history = AnalysisHistory()
+        run = history.record('v', 'sentiment', 100, analysis_result())
+        stored = history.get(run.id)
+        self.assertEqual(stored['sentiment'], analysis_result()['sentiment'])
+        self.assertEqual(stored['toxicity']['toxic_count'], 30)
+        self.assertEqual(stored['toxicity']['bert'][0], ["toxic 29", 0.29])
+        self.assertEqual(len(stored['toxicity']['bert']), TOXIC_TOP_K)
+        self.assertEqual((stored['emojis'], stored['video_id']), ([["😂", 3]], 'v'))
+
+    def test_each_video_keeps_its_newest_runs(self):
+        history = AnalysisHistory(max_runs_per_video=3)
+        runs = [history.record('v', 'sentiment', 100, analysis_result(overall=i / 10)) for i in range(5)]
+        history.record('other', 'sentiment', 100, analysis_result())
+        kept = AnalysisRun.objects.filter(video__video_id='v').values_list('id', flat=True)
+        self.assertEqual(sorted(kept), [run.id for run in runs[2:]])
+        self.assertEqual([run['vader_overall'] for run in history.trend('v')], [0.2, 0.3, 0.4])
+
+    def test_old_runs_are_pruned(self):
+        history = AnalysisHistory(retention_days=90, sweep_interval=3600)
+        old = [history.record(video_id, 'sentiment', 100, analysis_result()) for video_id in ('a', 'b')]
+        self.age(old, 91)
+        # The video's own old runs go at once; other videos' wait for the sweep
+        history.record('a', 'sentiment', 100, analysis_result())
+        self.assertEqual(sorted(AnalysisRun.objects.values_list('video__video_id', flat=True)), ['a', 'b'])
+        self.assertEqual(history.prune(), 1)
+        self.assertEqual(list(AnalysisRun.objects.values_list('video__video_id', flat=True)), ['a'])
+
+    def test_trend_covers_the_requested_days(self):
+        history = AnalysisHistory()
+        recent = history.record('v', 'sentiment', 100, analysis_result(overall=0.1))
+        self.age([history.record('v', 'sentiment', 100, analysis_result(overall=0.9))], 40)
+        self.assertEqual([run['run_id'] for run in history.trend('v', days=30)], [recent.id])
+        self.assertEqual(len(history.trend('v', days=60)), 2)
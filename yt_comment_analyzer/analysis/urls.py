@@ -1,9 +1,28 @@
 from django.urls import path
 from django.conf import settings
 from django.conf.urls.static import static
-from .views import YouTubeCommentAnalysis, GeminiReportAnalysis
+from .views import (
+    YouTubeCommentAnalysis,
+    BatchCommentAnalysis,
+    GeminiReportAnalysis,
+    SentimentTimeline,
+    ScoreCacheStats,
+    AnalysisJobs,
+    AnalysisJobStatus,
+    YouTubeQuotaStats,
+    AnalysisHistoryView,
+    AnalysisRunDetail,
+)
 
 urlpatterns = [
     path('api/sentiment/', YouTubeCommentAnalysis.as_view(), name='youtube_comment_analysis'),
+    path('api/sentiment/batch/', BatchCommentAnalysis.as_view(), name='batch_comment_analysis'),
     path('api/aireport/', GeminiReportAnalysis.as_view(), name='report'),
+    path('api/timeline/', SentimentTimeline.as_view(), name='sentiment_timeline'),
+    path('api/cache/', ScoreCacheStats.as_view(), name='score_cache_stats'),
+    path('api/youtube/quota/', YouTubeQuotaStats.as_view(), name='youtube_quota_stats'),
+    path('api/history/', AnalysisHistoryView.as_view(), name='analysis_history'),
+    path('api/history/<int:run_id>/', AnalysisRunDetail.as_view(), name='analysis_run_detail'),
+    path('api/jobs/', AnalysisJobs.as_view(), name='analysis_jobs'),
+    path('api/jobs/<str:job_id>/', AnalysisJobStatus.as_view(), name='analysis_job_status'),
 ] 
@@ -1,14 +1,25 @@
+from django.conf import settings
 from django.http import JsonResponse
+from django.urls import reverse
 from django.views.decorators.csrf import csrf_exempt
 import json
 import asyncio
-from analysis.src.yt_module.api_client import YouTubeClient, CommentFetcher
+import logging
+import zlib
+from functools import partial
+import numpy as np
+from analysis.src.analysis.aggregates import Reservoir
+from analysis.src.analysis.batch import score_comment_sets
+from analysis.src.analysis.sampling import margin, mean_interval, sample_size, wilson_interval
+from analysis.src.analysis.timeline import BUCKET_SECONDS, TimelineAccumulator
 from analysis.src.yt_module.parser import YouTubeURLParser
+from analysis.src.yt_module.rate_limit import QuotaExceeded
+from analysis.src.yt_module.records import CommentColumns
 from analysis.src.processing.cleaners import clean_text
-from analysis.src.analysis.sentiment import SentimentAnalyzer
-from analysis.src.analysis.emojis import EmojiAnalyzer
-from analysis.src.analysis.ToxicityAnalyzer import BertToxicityAnalyzer
-from analysis.src.analysis.geminiAnalyzer import YouTubeCommentAnalyzerWithAI
+from analysis.src.processing.dedup import NearDuplicateIndex, collapse
+from analysis.src.processing.preprocess import preprocess
+from analysis.components import components
+from analysis.jobs import JobQueueFull
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
@@ -18,12 +29,18 @@ from rest_framework.authentication import BasicAuthentication
 from rest_framework.permissions import AllowAny
 from rest_framework.decorators import authentication_classes, permission_classes
 
-# Initialize components once to avoid re-instantiating them in each request
-client = YouTubeClient()
-fetcher = CommentFetcher(client)
-sentiment = SentimentAnalyzer()
-emoji_analyzer = EmojiAnalyzer()
-toxicity_bert = BertToxicityAnalyzer()
+# Components (YouTube client, models, caches) are built on first use by
+# analysis.components, so importing this module stays cheap
+
+logger = logging.getLogger(__name__)
+
+def save_run(video_id, kind, comment_limit, result):
+    """Stores a finished analysis in the history and adds its `run_id`; never fails the analysis."""
+    try:
+        result['run_id'] = components.get('analysis_history').record(video_id, kind, comment_limit, result).id
+    except Exception:
+        logger.exception("Could not store the analysis of %s", video_id)
+    return result
 
 async def analyze_comments(video_url, comment_limit):
     """Fetch and analyze YouTube comments asynchronously."""
@@ -31,52 +48,312 @@ async def analyze_comments(video_url, comment_limit):
     if not video_id:
         return {'error': 'Invalid YouTube URL'}
 
-    # Reset comments list before fetching new comments
-    fetcher.comments = []
-    raw_comments = fetcher.fetch_comments(video_id, comment_limit)
-    cleaned_comments = [clean_text(c) for c in raw_comments]
+    # Pages are cleaned and scored while the next one is being fetched
+    result = await components.get('pipeline').run(video_id, comment_limit)
+    # The history is in the database, which Django only allows outside the event loop
+    return await asyncio.to_thread(save_run, video_id, 'sentiment', comment_limit, result)
+
+async def analyze_with_gemini(video_url, comment_limit):
+    """Fetch and analyze YouTube comments using Gemini AI only."""
+    video_id = YouTubeURLParser().extract_video_id(video_url)
+    if not video_id:
+        return {'error': 'Invalid YouTube URL'}
+
+    # Pages are cleaned into a fixed-size uniform sample, so memory and prompt
+    # size stay flat however many comments are requested. Seeding by video keeps
+    # the sample, and so the Gemini cache key, stable across requests.
+    sample = Reservoir(settings.GEMINI_SAMPLE_SIZE, seed=zlib.crc32(video_id.encode('utf-8')))
+    comment_store = components.get('comment_store')
+
+    def read_sample():
+        for page in comment_store.iter_pages(video_id, comment_limit):
+            sample.extend(clean_text(c) for c in page)
+
+    # The store hits the database, which Django only allows outside the event loop
+    await asyncio.to_thread(read_sample)
+    cleaned_comments = sample.items
+    if settings.NEAR_DUPLICATE_THRESHOLD:
+        # Copypasta goes into the prompt once, with how often it was posted
+        index, _ = collapse(cleaned_comments, settings.NEAR_DUPLICATE_THRESHOLD)
+        cleaned_comments = [
+            text if size == 1 else f"{text} (posted {size} times)"
+            for text, size in zip(index.representatives, index.sizes)
+        ]
 
-    sentiment_vader = sentiment.analyze_vader(cleaned_comments)
-    sentiment_textblob = sentiment.analyze_textblob(cleaned_comments)
-    toxic_comments = toxicity_bert.analyze(cleaned_comments)
-    top_emojis = emoji_analyzer.top_emojis(raw_comments)
+    from analysis.src.analysis.geminiAnalyzer import YouTubeCommentAnalyzerWithAI
+
+    gemini_analyzer = YouTubeCommentAnalyzerWithAI(
+        cleaned_comments,
+        token_budget=settings.GEMINI_TOKEN_BUDGET,
+        model=components.get('gemini_model'),
+        cache=components.get('gemini_cache'),
+    )
+    # One structured request (or a chunked map-reduce) yields all three sections
+    report = await asyncio.to_thread(gemini_analyzer.analyze)
 
+    return {
+        'gemini_analysis': {
+            'summary': report['summary'],
+            'public_demands': report['public_demands'],
+            'suggestions': report['suggestions']
+        },
+        'total_comments': sample.seen,
+        'sampled_comments': len(sample.items),
+    }
+
+async def analyze_sample(video_url, comment_limit, error_bound=0.02, confidence=0.95):
+    """
+    Fast mode: sentiment breakdowns and toxicity rate from a uniform random
+    sample sized so every percentage is within ±`error_bound` (a proportion)
+    at `confidence`. Intervals are in percent, like the breakdowns.
+    """
+    video_id = YouTubeURLParser().extract_video_id(video_url)
+    if not video_id:
+        return {'error': 'Invalid YouTube URL'}
+
+    # Sized for the requested limit; a smaller section only narrows the intervals' FPC
+    sample = Reservoir(sample_size(error_bound, confidence, comment_limit), seed=zlib.crc32(video_id.encode('utf-8')))
+    comment_store = components.get('comment_store')
+
+    def read_sample():
+        # Pages still arrive in order, but only the sampled comments are cleaned and scored
+        for page in comment_store.iter_pages(video_id, comment_limit):
+            sample.extend(page)
+
+    await asyncio.to_thread(read_sample)
+    result = await asyncio.to_thread(sample_report, sample, error_bound, confidence)
+    return await asyncio.to_thread(save_run, video_id, 'sample', comment_limit, result)
+
+def sample_report(sample, error_bound, confidence):
+    sentiment = components.get('sentiment')
+    cleaned_comments = [preprocess(c).cleaned for c in sample.items]
+    n, population = len(cleaned_comments), sample.seen
+
+    def percent(interval):
+        return [round(bound * 100, 2) for bound in interval]
+
+    def estimate(scores):
+        accumulator = sentiment.accumulator()
+        accumulator.update(scores)
+        result = accumulator.result()
+        result['intervals'] = {
+            category: percent(wilson_interval(count, n, confidence, population))
+            for category, count in accumulator.results.items()
+        }
+        result['overall_interval'] = list(mean_interval(result['overall'], result['std'], n, confidence, population))
+        return result
+
+    toxic_comments = components.get('toxicity').analyze(cleaned_comments)
     return {
         'sentiment': {
-            'vader': sentiment_vader,
-            'textblob': sentiment_textblob
+            'vader': estimate(sentiment.score_vader(cleaned_comments)),
+            'textblob': estimate(sentiment.score_textblob(cleaned_comments)),
         },
         'toxicity': {
             'bert': toxic_comments,
+            'rate': round(len(toxic_comments) / n * 100, 2) if n else 0.0,
+            'interval': percent(wilson_interval(len(toxic_comments), n, confidence, population)),
+        },
+        'sampling': {
+            'sample_size': n,
+            'error_bound': error_bound,
+            'confidence': confidence,
+            # Worst-case half-width actually achieved, as a proportion
+            'margin': margin(n, confidence, population),
         },
-        'emojis': top_emojis,
-        'total_comments': len(cleaned_comments),
+        'total_comments': population,
     }
 
-async def analyze_with_gemini(video_url, comment_limit):
-    """Fetch and analyze YouTube comments using Gemini AI only."""
+async def analyze_batch(video_urls, comment_limit):
+    """
+    Analyzes several videos at once: comments are fetched concurrently and
+    scored in shared model batches, then reported per video. A video that
+    fails (bad URL, fetch error) gets an 'error' entry; the others still run.
+    Near-duplicates are collapsed per video as /api/sentiment/ does; there is
+    no bounded-memory mode, so `comment_limit` is capped at BATCH_COMMENT_LIMIT_MAX.
+    """
+    comment_store = components.get('comment_store')
+    semaphore = asyncio.Semaphore(settings.BATCH_FETCH_CONCURRENCY)
+    # Repeated URLs are fetched and scored once
+    video_urls = list(dict.fromkeys(video_urls))
+
+    async def fetch(video_url):
+        video_id = YouTubeURLParser().extract_video_id(video_url)
+        if not video_id:
+            raise ValueError('Invalid YouTube URL')
+        async with semaphore:
+            return await asyncio.to_thread(comment_store.fetch_comments, video_id, comment_limit)
+
+    fetched = await asyncio.gather(*(fetch(url) for url in video_urls), return_exceptions=True)
+    return await asyncio.to_thread(batch_report, video_urls, fetched, comment_limit)
+
+def batch_report(video_urls, fetched, comment_limit):
+    ok = [i for i, comments in enumerate(fetched) if not isinstance(comments, BaseException)]
+    processed = {i: [preprocess(c) for c in fetched[i]] for i in ok}
+    scored = dict(zip(ok, score_comment_sets(
+        [[p.cleaned for p in processed[i]] for i in ok],
+        components.get('sentiment'),
+        components.get('toxicity'),
+        partial(NearDuplicateIndex, settings.NEAR_DUPLICATE_THRESHOLD) if settings.NEAR_DUPLICATE_THRESHOLD else None,
+    )))
+    emoji_analyzer = components.get('emoji_analyzer')
+
+    videos = []
+    for i, video_url in enumerate(video_urls):
+        if i not in processed:
+            videos.append({'video_url': video_url, 'error': str(fetched[i])})
+            continue
+        result = save_run(YouTubeURLParser().extract_video_id(video_url), 'sentiment', comment_limit, {
+            **scored[i],
+            'emojis': emoji_analyzer.count_extracted(p.emojis for p in processed[i]).most_common(5),
+            'links': {
+                'urls': sum(p.urls for p in processed[i]),
+                'mentions': sum(p.mentions for p in processed[i]),
+            },
+            'total_comments': len(processed[i]),
+        })
+        videos.append({'video_url': video_url, **result})
+    return {
+        'videos': videos,
+        'succeeded': len(ok),
+        'failed': len(video_urls) - len(ok),
+        'total_comments': sum(len(processed[i]) for i in ok),
+    }
+
+async def analyze_timeline(video_url, comment_limit, bucket='day', like_weighted=False):
+    """Sentiment and toxicity per hour or day of publishing, optionally like-weighted."""
     video_id = YouTubeURLParser().extract_video_id(video_url)
     if not video_id:
         return {'error': 'Invalid YouTube URL'}
 
-    # Reset comments list before fetching new comments
-    fetcher.comments = []
-    raw_comments = fetcher.fetch_comments(video_id, comment_limit)
-    cleaned_comments = [clean_text(c) for c in raw_comments]
+    # Pages from the comment store are scored in batches and folded into
+    # per-bucket sums, so memory stays flat however many comments are read
+    timeline = TimelineAccumulator(bucket, like_weighted)
+    comment_store = components.get('comment_store')
 
-    gemini_analyzer = YouTubeCommentAnalyzerWithAI(cleaned_comments)
-    gemini_summary = gemini_analyzer.get_summary()
-    public_demands = gemini_analyzer.get_public_demand()
-    suggestions = gemini_analyzer.get_suggestions()
+    def read_timeline():
+        total, batch, batched = 0, [], 0
+        for columns in comment_store.iter_columns(video_id, comment_limit):
+            batch.append(columns)
+            batched += len(columns)
+            total += len(columns)
+            if batched >= settings.SENTIMENT_POOL_BATCH:
+                add_timeline_batch(timeline, CommentColumns.concat(batch))
+                batch, batched = [], 0
+        if batch:
+            add_timeline_batch(timeline, CommentColumns.concat(batch))
+        return total
 
+    # The store hits the database, which Django only allows outside the event loop
+    total = await asyncio.to_thread(read_timeline)
     return {
-        'gemini_analysis': {
-            'summary': gemini_summary,
-            'public_demands': public_demands,
-            'suggestions': suggestions
-        },
-        'total_comments': len(cleaned_comments)
+        'bucket': bucket,
+        'like_weighted': like_weighted,
+        'timeline': timeline.rows(),
+        'total_comments': total,
     }
+
+def add_timeline_batch(timeline, columns):
+    sentiment = components.get('sentiment')
+    cleaned_comments = [preprocess(c).cleaned for c in columns.texts]
+    toxic = np.zeros(len(columns), dtype=bool)
+    toxic[components.get('toxicity').toxic_indices(cleaned_comments)] = True
+    timeline.update(
+        columns.published,
+        {
+            'vader': sentiment.score_vader(cleaned_comments),
+            'textblob': sentiment.score_textblob(cleaned_comments),
+        },
+        toxic=toxic,
+        likes=columns.likes,
+    )
+
+JOB_RUNNERS = {
+    'sentiment': analyze_comments,
+    'aireport': analyze_with_gemini,
+    'sample': analyze_sample,
+    'timeline': analyze_timeline,
+    # Takes a list of video URLs in place of one
+    'batch': analyze_batch,
+}
+
+def run_analysis_job(kind, video_url, comment_limit, *options):
+    """Runs on a job worker thread, which has no event loop of its own."""
+    return asyncio.run(JOB_RUNNERS[kind](video_url, comment_limit, *options))
+
+def read_comment_limit(request):
+    """`comment_limit` from the request body; ValueError unless it is an integer in 1..COMMENT_LIMIT_MAX."""
+    try:
+        comment_limit = int(request.data.get('comment_limit', 100))
+    except (ValueError, TypeError):
+        comment_limit = None
+    if comment_limit is None or not 1 <= comment_limit <= settings.COMMENT_LIMIT_MAX:
+        raise ValueError(f'comment_limit must be an integer between 1 and {settings.COMMENT_LIMIT_MAX}')
+    return comment_limit
+
+def read_sampling_options(request):
+    """
+    (error_bound, confidence) when the request asks for fast mode (`sample`
+    or `error_bound` in the body), else None; ValueError if they are out of range.
+    """
+    if 'error_bound' not in request.data and str(request.data.get('sample', '')).lower() not in ('1', 'true', 'yes'):
+        return None
+    try:
+        error_bound = float(request.data.get('error_bound', 0.02))
+        confidence = float(request.data.get('confidence', 0.95))
+    except (ValueError, TypeError):
+        raise ValueError('error_bound and confidence must be numbers')
+    if not 0 < error_bound <= 0.5:
+        raise ValueError('error_bound must be a proportion in (0, 0.5], e.g. 0.02 for ±2%')
+    if not 0.5 <= confidence < 1:
+        raise ValueError('confidence must be in [0.5, 1), e.g. 0.95')
+    return error_bound, confidence
+
+def read_timeline_options(request):
+    """(bucket, like_weighted); ValueError for an unknown bucket."""
+    bucket = request.data.get('bucket', 'day')
+    if bucket not in BUCKET_SECONDS:
+        raise ValueError(f"bucket must be one of: {', '.join(BUCKET_SECONDS)}")
+    return bucket, str(request.data.get('like_weighted', '')).lower() in ('1', 'true', 'yes')
+
+def quota_exceeded_response(error):
+    # No Retry-After without a reset time: a missing API key will not fix itself
+    return Response(
+        {'error': str(error)},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={'Retry-After': str(round(error.retry_after))} if error.retry_after is not None else None,
+    )
+
+def wants_async(request):
+    return str(request.data.get('async', '')).lower() in ('1', 'true', 'yes')
+
+def submit_analysis_job(kind, video_url, comment_limit, *options):
+    """
+    Queues an analysis and returns a 202 response pointing at its status
+    endpoint. `options` are passed on to the runner after `comment_limit`.
+    """
+    video_id = YouTubeURLParser().extract_video_id(video_url)
+    if not video_id:
+        return Response({'error': 'Invalid YouTube URL'}, status=status.HTTP_400_BAD_REQUEST)
+    return queue_analysis_job(kind, (kind, video_id, comment_limit, *options), video_url, comment_limit, *options)
+
+def queue_analysis_job(kind, key, *args):
+    """Queues `JOB_RUNNERS[kind](*args)`, deduplicated on `key`; returns the 202 response."""
+    try:
+        job, created = components.get('job_manager').submit(kind, key, run_analysis_job, kind, *args)
+    except JobQueueFull as e:
+        return Response(
+            {'error': f'Analysis queue is full: {e}'},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={'Retry-After': '30'},
+        )
+
+    return Response({
+        **job.to_dict(),
+        'deduplicated': not created,
+        'status_url': reverse('analysis_job_status', args=[job.id]),
+    }, status=status.HTTP_202_ACCEPTED)
+
 @authentication_classes([BasicAuthentication])  # disables session-based CSRF checks
 @permission_classes([AllowAny])
 @method_decorator(csrf_exempt, name='dispatch')
@@ -84,14 +361,11 @@ class YouTubeCommentAnalysis(APIView):
     """DRF API view to analyze YouTube comments."""
     
     def post(self, request, *args, **kwargs):
+        video_url = request.data.get('video_url')
         try:
-            video_url = request.data.get('video_url')
-            comment_limit = int(request.data.get('comment_limit', 100))
-        except (ValueError, TypeError):
-            return Response(
-                {'error': 'Invalid comment_limit must be an integer'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+            comment_limit = read_comment_limit(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         if not video_url:
             return Response(
@@ -99,10 +373,68 @@ class YouTubeCommentAnalysis(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        results = asyncio.run(analyze_comments(video_url, comment_limit))
+        try:
+            sampling = read_sampling_options(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if sampling is not None:
+            if wants_async(request):
+                return submit_analysis_job('sample', video_url, comment_limit, *sampling)
+            try:
+                results = asyncio.run(analyze_sample(video_url, comment_limit, *sampling))
+            except QuotaExceeded as e:
+                return quota_exceeded_response(e)
+            return Response(results, status=status.HTTP_200_OK)
+
+        if wants_async(request):
+            return submit_analysis_job('sentiment', video_url, comment_limit)
+
+        try:
+            results = asyncio.run(analyze_comments(video_url, comment_limit))
+        except QuotaExceeded as e:
+            return quota_exceeded_response(e)
         return Response(results, status=status.HTTP_200_OK)
     
     
+@authentication_classes([BasicAuthentication])  # disables session-based CSRF checks
+@permission_classes([AllowAny])
+@method_decorator(csrf_exempt, name='dispatch')
+class BatchCommentAnalysis(APIView):
+    """DRF API view analyzing the comments of several videos in one request."""
+
+    def post(self, request, *args, **kwargs):
+        video_urls = request.data.get('video_urls')
+        try:
+            comment_limit = read_comment_limit(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not isinstance(video_urls, list) or not video_urls or not all(isinstance(u, str) for u in video_urls):
+            return Response(
+                {'error': 'video_urls must be a non-empty list of YouTube URLs'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(video_urls) > settings.BATCH_MAX_VIDEOS:
+            return Response(
+                {'error': f'At most {settings.BATCH_MAX_VIDEOS} videos per batch'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if comment_limit > settings.BATCH_COMMENT_LIMIT_MAX:
+            return Response(
+                {'error': f'comment_limit is at most {settings.BATCH_COMMENT_LIMIT_MAX} per video in a batch; '
+                          'analyse larger videos one at a time with /api/sentiment/'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if wants_async(request):
+            video_urls = list(dict.fromkeys(video_urls))
+            return queue_analysis_job('batch', ('batch', video_urls, comment_limit), video_urls, comment_limit)
+
+        results = asyncio.run(analyze_batch(video_urls, comment_limit))
+        return Response(results, status=status.HTTP_200_OK)
+
+
 @authentication_classes([BasicAuthentication])  # disables session-based CSRF checks
 @permission_classes([AllowAny])
 @method_decorator(csrf_exempt, name='dispatch')
@@ -110,21 +442,186 @@ class GeminiReportAnalysis(APIView):
     """DRF API view to analyze YouTube comments using Gemini AI only."""
     
     def post(self, request, *args, **kwargs):
+        video_url = request.data.get('video_url')
         try:
-            video_url = request.data.get('video_url')
-            comment_limit = int(request.data.get('comment_limit', 100))
-        except (ValueError, TypeError):
+            comment_limit = read_comment_limit(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not video_url:
             return Response(
-                {'error': 'Invalid comment_limit must be an integer'},
+                {'error': 'YouTube video URL is required'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        if wants_async(request):
+            return submit_analysis_job('aireport', video_url, comment_limit)
+
+        try:
+            results = asyncio.run(analyze_with_gemini(video_url, comment_limit))
+        except QuotaExceeded as e:
+            return quota_exceeded_response(e)
+        response = Response(results, status=status.HTTP_200_OK)
+        return response
+
+
+@authentication_classes([BasicAuthentication])  # disables session-based CSRF checks
+@permission_classes([AllowAny])
+@method_decorator(csrf_exempt, name='dispatch')
+class SentimentTimeline(APIView):
+    """DRF API view bucketing sentiment and toxicity by comment publish hour or day."""
+
+    def post(self, request, *args, **kwargs):
+        video_url = request.data.get('video_url')
+        try:
+            comment_limit = read_comment_limit(request)
+            bucket, like_weighted = read_timeline_options(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         if not video_url:
             return Response(
                 {'error': 'YouTube video URL is required'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        results = asyncio.run(analyze_with_gemini(video_url, comment_limit))
-        response = Response(results, status=status.HTTP_200_OK)
-        return response
+        if wants_async(request):
+            return submit_analysis_job('timeline', video_url, comment_limit, bucket, like_weighted)
+
+        try:
+            results = asyncio.run(analyze_timeline(video_url, comment_limit, bucket, like_weighted))
+        except QuotaExceeded as e:
+            return quota_exceeded_response(e)
+        return Response(results, status=status.HTTP_200_OK)
+
+
+@authentication_classes([BasicAuthentication])  # disables session-based CSRF checks
+@permission_classes([AllowAny])
+@method_decorator(csrf_exempt, name='dispatch')
+class ScoreCacheStats(APIView):
+    """DRF API view reporting hit rates of the score, preprocessing and Gemini response caches."""
+
+    def get(self, request, *args, **kwargs):
+        cleaner = preprocess.cache_info()
+        gemini_cache = components.get('gemini_cache')
+        return Response({
+            'scores': components.get('score_cache').hit_rates(),
+            'gemini': gemini_cache.stats() if gemini_cache is not None else None,
+            'preprocess': {
+                'hits': cleaner.hits,
+                'misses': cleaner.misses,
+                'entries': cleaner.currsize,
+                'max_entries': cleaner.maxsize,
+            },
+        }, status=status.HTTP_200_OK)
+
+
+@authentication_classes([BasicAuthentication])  # disables session-based CSRF checks
+@permission_classes([AllowAny])
+@method_decorator(csrf_exempt, name='dispatch')
+class AnalysisJobs(APIView):
+    """DRF API view queuing an analysis job; returns its id without waiting for the result."""
+
+    def post(self, request, *args, **kwargs):
+        video_url = request.data.get('video_url')
+        try:
+            comment_limit = read_comment_limit(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        kind = request.data.get('kind', 'sentiment')
+        # Batches take a list of URLs: POST them to /api/sentiment/batch/ with `async`
+        kinds = sorted(kind for kind in JOB_RUNNERS if kind != 'batch')
+        if kind not in kinds:
+            return Response(
+                {'error': f'kind must be one of {kinds}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if not video_url:
+            return Response(
+                {'error': 'YouTube video URL is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return submit_analysis_job(kind, video_url, comment_limit)
+
+    def get(self, request, *args, **kwargs):
+        return Response(components.get('job_manager').stats(), status=status.HTTP_200_OK)
+
+
+@authentication_classes([BasicAuthentication])  # disables session-based CSRF checks
+@permission_classes([AllowAny])
+@method_decorator(csrf_exempt, name='dispatch')
+class AnalysisJobStatus(APIView):
+    """
+    DRF API view returning a job's status, and its result once finished.
+    `?wait=<seconds>` long-polls until the job finishes or the wait runs out.
+    """
+
+    def get(self, request, job_id, *args, **kwargs):
+        job_manager = components.get('job_manager')
+        job = job_manager.get(job_id)
+        if job is None:
+            return Response({'error': 'Unknown or expired job'}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            wait = float(request.query_params.get('wait', 0))
+        except ValueError:
+            return Response({'error': 'wait must be a number of seconds'}, status=status.HTTP_400_BAD_REQUEST)
+        if wait > 0:
+            job_manager.wait(job, min(wait, settings.ANALYSIS_JOB_MAX_WAIT))
+
+        return Response(job.to_dict(), status=status.HTTP_200_OK)
+
+
+@authentication_classes([BasicAuthentication])  # disables session-based CSRF checks
+@permission_classes([AllowAny])
+@method_decorator(csrf_exempt, name='dispatch')
+class YouTubeQuotaStats(APIView):
+    """DRF API view reporting remaining YouTube API quota per key and rate-limiter metrics."""
+
+    def get(self, request, *args, **kwargs):
+        return Response(components.get('youtube_client').rate_limiter.stats(), status=status.HTTP_200_OK)
+
+
+@authentication_classes([BasicAuthentication])  # disables session-based CSRF checks
+@permission_classes([AllowAny])
+@method_decorator(csrf_exempt, name='dispatch')
+class AnalysisHistoryView(APIView):
+    """
+    DRF API view returning a video's stored sentiment trend, oldest run
+    first: `?video_url=...&days=30&limit=100`. Nothing is recomputed.
+    """
+
+    def get(self, request, *args, **kwargs):
+        video_url = request.query_params.get('video_url', '')
+        video_id = YouTubeURLParser().extract_video_id(video_url)
+        if not video_id:
+            return Response({'error': 'A valid YouTube video_url is required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            days = int(request.query_params.get('days', 30))
+            limit = int(request.query_params.get('limit', 100))
+        except ValueError:
+            return Response({'error': 'days and limit must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        if days < 1 or not 1 <= limit <= 1000:
+            return Response(
+                {'error': 'days must be positive and limit between 1 and 1000'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        runs = components.get('analysis_history').trend(video_id, days, limit)
+        return Response({'video_id': video_id, 'runs': runs}, status=status.HTTP_200_OK)
+
+
+@authentication_classes([BasicAuthentication])  # disables session-based CSRF checks
+@permission_classes([AllowAny])
+@method_decorator(csrf_exempt, name='dispatch')
+class AnalysisRunDetail(APIView):
+    """DRF API view returning one stored analysis run in full."""
+
+    def get(self, request, run_id, *args, **kwargs):
+        run = components.get('analysis_history').get(run_id)
+        if run is None:
+            return Response({'error': 'Unknown or pruned analysis run'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(run, status=status.HTTP_200_OK)
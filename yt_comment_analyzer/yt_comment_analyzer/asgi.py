@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yt_comment_analyzer.settings')
 
 application = get_asgi_application()
+
+if settings.ANALYSIS_PREWARM:
+    # Load the models now instead of on the first request
+    from analysis.components import warm_up
+    warm_up()
@@ -10,7 +10,10 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
+
+from django.core.exceptions import ImproperlyConfigured
 from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -182,4 +185,99 @@ if DEBUG:
 # Replace with your API key
 
 
-
+# Comment analysis pipeline
+# Number of comments per RoBERTa forward pass; tune per CPU with
+# `python -m analysis.src.benchmarks.toxicity_batching`.
+TOXICITY_BATCH_SIZE = int(os.getenv('TOXICITY_BATCH_SIZE', 32))
+# 'torch' (fp32), 'quantized' (int8 dynamic) or 'onnx' (ONNX Runtime, needs
+# onnxruntime); export the latter two with analysis/src/analysis/toxicity_backends.py
+TOXICITY_BACKEND = os.getenv('TOXICITY_BACKEND', 'torch')
+TOXICITY_BACKEND_DIR = os.getenv('TOXICITY_BACKEND_DIR') or None
+# Cascade mode: a hashed n-gram prefilter scores every comment and only those at
+# or above the threshold reach RoBERTa. Pick the threshold (and optionally fit
+# and save weights) with `python -m analysis.src.benchmarks.toxicity_cascade`.
+TOXICITY_CASCADE = os.getenv('TOXICITY_CASCADE', 'false').lower() in ('1', 'true', 'yes')
+TOXICITY_CASCADE_THRESHOLD = float(os.getenv('TOXICITY_CASCADE_THRESHOLD', 0.3))
+TOXICITY_PREFILTER_PATH = os.getenv('TOXICITY_PREFILTER_PATH') or None
+# Per-comment score cache shared by the VADER, TextBlob and toxicity scorers;
+# set SCORE_CACHE_PATH to keep it across restarts.
+SCORE_CACHE_SIZE = int(os.getenv('SCORE_CACHE_SIZE', 200_000))
+SCORE_CACHE_PATH = os.getenv('SCORE_CACHE_PATH') or None
+# Seconds a video's stored comments are served as-is before the next request
+# fetches the comments posted since; 0 refreshes on every request.
+COMMENT_STORE_MAX_AGE = int(os.getenv('COMMENT_STORE_MAX_AGE', 600))
+# Estimated prompt tokens per Gemini request; larger comment sets are
+# summarized in concurrent chunks and merged.
+GEMINI_TOKEN_BUDGET = int(os.getenv('GEMINI_TOKEN_BUDGET', 100_000))
+# 'gemini' calls the API; 'local' uses an offline stand-in with simulated
+# latency for load tests and benchmarks.
+GEMINI_BACKEND = os.getenv('GEMINI_BACKEND', 'gemini')
+# Cached AI reports, keyed by model, prompt and comment set
+GEMINI_CACHE_TTL = int(os.getenv('GEMINI_CACHE_TTL', 6 * 3600))
+GEMINI_CACHE_ENTRIES = int(os.getenv('GEMINI_CACHE_ENTRIES', 256))
+GEMINI_CACHE_BYTES = int(os.getenv('GEMINI_CACHE_BYTES', 16 * 2 ** 20))
+# Background analysis jobs (POST /api/jobs/, or "async": true on the
+# analysis endpoints): worker threads per server process, waiting-job limit
+# (across processes; job state is in the database), how long finished
+# results stay pollable, the longest long-poll a client may request, and
+# after how long a job still in flight counts as lost with its process.
+ANALYSIS_JOB_WORKERS = int(os.getenv('ANALYSIS_JOB_WORKERS', 2))
+ANALYSIS_JOB_QUEUE_SIZE = int(os.getenv('ANALYSIS_JOB_QUEUE_SIZE', 32))
+ANALYSIS_JOB_RESULT_TTL = int(os.getenv('ANALYSIS_JOB_RESULT_TTL', 3600))
+ANALYSIS_JOB_MAX_WAIT = int(os.getenv('ANALYSIS_JOB_MAX_WAIT', 30))
+ANALYSIS_JOB_STALE_AFTER = int(os.getenv('ANALYSIS_JOB_STALE_AFTER', 6 * 3600))
+# Analysis components load on first use; set ANALYSIS_PREWARM=1 for server
+# workers to load them when the WSGI/ASGI application starts instead.
+ANALYSIS_PREWARM = os.getenv('ANALYSIS_PREWARM', '').lower() in ('1', 'true', 'yes')
+# Worker processes for VADER/TextBlob scoring of large comment lists;
+# 1 keeps scoring in-process.
+SENTIMENT_WORKERS = int(os.getenv('SENTIMENT_WORKERS', 1))
+# With several workers, the streaming pipeline scores pages in batches of
+# this many comments. Lists only go to the pool from 200 uncached comments
+# on, and one API page holds at most 100.
+SENTIMENT_POOL_BATCH = int(os.getenv('SENTIMENT_POOL_BATCH', 1000))
+# 'batch' (NumPy, same scores) or 'nltk' (polarity_scores per comment)
+SENTIMENT_VADER_ENGINE = os.getenv('SENTIMENT_VADER_ENGINE', 'batch')
+# 'batch' (compact pattern lexicon, same scores) or 'textblob' (TextBlob object per comment)
+SENTIMENT_TEXTBLOB_ENGINE = os.getenv('SENTIMENT_TEXTBLOB_ENGINE', 'batch')
+# Opt-in: comments at least this similar (estimated Jaccard over character
+# shingles, e.g. 0.8) are analysed once and counted by cluster size, which
+# changes /api/sentiment/ scores and adds a "clusters" entry; 0 disables it.
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv('NEAR_DUPLICATE_THRESHOLD', 0))
+# Largest comment_limit a request may ask for. Above BOUNDED_MEMORY_ABOVE the
+# pipeline keeps histograms, top-k lists and capped counters instead of every
+# score, and the AI report reads a uniform sample of GEMINI_SAMPLE_SIZE
+# comments rather than all of them.
+COMMENT_LIMIT_MAX = int(os.getenv('COMMENT_LIMIT_MAX', 1_000_000))
+BOUNDED_MEMORY_ABOVE = int(os.getenv('BOUNDED_MEMORY_ABOVE', 20_000))
+GEMINI_SAMPLE_SIZE = int(os.getenv('GEMINI_SAMPLE_SIZE', 5_000))
+# POST /api/sentiment/batch/: most videos per request, how many of them are
+# fetched at the same time, and the largest comment_limit per video. Batches
+# hold every video's comments in memory to score them together, so they
+# never run in bounded-memory mode: the per-video limit is capped at
+# BOUNDED_MEMORY_ABOVE, and larger analyses go through /api/sentiment/.
+BATCH_MAX_VIDEOS = int(os.getenv('BATCH_MAX_VIDEOS', 50))
+BATCH_COMMENT_LIMIT_MAX = min(int(os.getenv('BATCH_COMMENT_LIMIT_MAX', 5_000)), BOUNDED_MEMORY_ABOVE)
+BATCH_FETCH_CONCURRENCY = int(os.getenv('BATCH_FETCH_CONCURRENCY', 8))
+# Keep-alive HTTP connections to the YouTube API shared by all request
+# threads; more concurrent fetches than this wait for a free connection.
+YOUTUBE_HTTP_POOL_SIZE = int(os.getenv('YOUTUBE_HTTP_POOL_SIZE', 16))
+# YouTube Data API limits, per API key (several keys can be given as
+# YOUTUBE_API_KEYS=key1,key2 and are rotated): daily quota units, and the
+# request rate and burst allowed; YOUTUBE_RATE_LIMIT=0 disables rate limiting.
+YOUTUBE_DAILY_QUOTA = int(os.getenv('YOUTUBE_DAILY_QUOTA', 10_000))
+YOUTUBE_RATE_LIMIT = float(os.getenv('YOUTUBE_RATE_LIMIT', 10))
+YOUTUBE_RATE_BURST = int(os.getenv('YOUTUBE_RATE_BURST', 20))
+# Stored analysis runs (GET /api/history/): days kept, and runs kept per video.
+ANALYSIS_RUN_RETENTION_DAYS = int(os.getenv('ANALYSIS_RUN_RETENTION_DAYS', 90))
+ANALYSIS_RUNS_PER_VIDEO = int(os.getenv('ANALYSIS_RUNS_PER_VIDEO', 200))
+# Save each full analysis's aggregates and, on the next analysis of the same
+# video and comment_limit, score only comments posted since (old comments they
+# push out of the window are subtracted). Clustering depends on
+# comment order and cannot be updated this way, so this needs
+# NEAR_DUPLICATE_THRESHOLD=0; it does not apply in bounded-memory mode.
+INCREMENTAL_ANALYSIS = os.getenv('INCREMENTAL_ANALYSIS', 'false').lower() in ('1', 'true', 'yes')
+if INCREMENTAL_ANALYSIS and NEAR_DUPLICATE_THRESHOLD:
+    raise ImproperlyConfigured(
+        "INCREMENTAL_ANALYSIS needs NEAR_DUPLICATE_THRESHOLD=0: near-duplicate clusters cannot be updated incrementally"
+    )
@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/5.1/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yt_comment_analyzer.settings')
 
 application = get_wsgi_application()
+
+if settings.ANALYSIS_PREWARM:
+    # Load the models now instead of on the first request
+    from analysis.components import warm_up
+    warm_up()